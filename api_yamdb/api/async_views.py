@@ -0,0 +1,61 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from api.middleware import record_queries
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+
+def render_view(view, request, **kwargs):
+    """
+    Выполняет синхронное представление в потоке пула и возвращает уже
+    отрендеренный ответ, чтобы Django не рендерил его в общем потоке.
+    """
+    close_old_connections()
+    try:
+        with record_queries(getattr(request, 'query_recorder', None)):
+            response = view(request, **kwargs)
+            if hasattr(response, 'render'):
+                started = time.perf_counter()
+                response.render()
+                request._render_duration = time.perf_counter() - started
+        rendered = HttpResponse(
+            response.content,
+            status=response.status_code,
+            content_type=response.get('Content-Type')
+        )
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+    finally:
+        close_old_connections()
+
+
+def async_read_view(viewset, action):
+    """
+    Асинхронное представление чтения для ASGI поверх действия вьюсета.
+
+    В Django 3.2 нет асинхронного ORM, а синхронные представления под ASGI
+    выполняются в одном общем потоке. Здесь работа с базой, сериализация
+    и рендеринг JSON уходят в пул потоков (thread_sensitive=False), а цикл
+    событий занят только вводом-выводом: один процесс держит много
+    медленных клиентов, а запросы к базе идут параллельно в пределах пула.
+    Права, фильтры, пагинация и условные GET-запросы — те же, что в /api/v1.
+    """
+    view = viewset.as_view({'get': action})
+    run = sync_to_async(render_view, thread_sensitive=False)
+
+    async def async_view(request, **kwargs):
+        return await run(view, request, **kwargs)
+
+    async_view.csrf_exempt = True
+    async_view.__name__ = f'{viewset.__name__}_{action}'
+    return async_view
+
+
+title_list = async_read_view(TitleViewSet, 'list')
+title_detail = async_read_view(TitleViewSet, 'retrieve')
+review_list = async_read_view(ReviewViewSet, 'list')
+comment_list = async_read_view(CommentViewSet, 'list')
@@ -0,0 +1,125 @@
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.cache import invalidate_models
+from api.permissions import IsAdmin
+
+
+class BulkCreateMixin:
+    """
+    Массовое создание объектов: POST <префикс>/bulk/ со списком объектов.
+
+    Каждый элемент проверяется bulk_serializer_class без обращений к базе,
+    связи и уникальность проверяются в validate_bulk() запросами на всю
+    пачку. Ошибочные элементы не прерывают загрузку: в ответе возвращаются
+    созданные объекты и ошибки с индексами элементов запроса.
+    """
+    bulk_serializer_class = None
+    bulk_max_items = 1000
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        permission_classes=(IsAdmin,)
+    )
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {'non_field_errors': ['Ожидается список объектов.']}
+            )
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError({'non_field_errors': [
+                f'За один запрос можно создать не больше '
+                f'{self.bulk_max_items} объектов.'
+            ]})
+        errors = {}
+        items = []
+        for index, data in enumerate(request.data):
+            serializer = self.bulk_serializer_class(data=data)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        created = self.create_valid(self.valid_items(items, errors), errors)
+        return Response(
+            {
+                'created': created,
+                'errors': [
+                    {'index': index, 'errors': errors[index]}
+                    for index in sorted(errors)
+                ],
+            },
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST
+            )
+        )
+
+    def valid_items(self, items, errors):
+        return [
+            (index, data) for index, data in self.validate_bulk(items, errors)
+            if index not in errors
+        ]
+
+    def create_valid(self, items, errors):
+        """
+        Создаёт проверенные элементы. Если параллельный запрос успел
+        вставить конфликтующие строки после проверки, вставка откатывается,
+        элементы проверяются заново и конфликтующие попадают в errors.
+        """
+        while items:
+            try:
+                with transaction.atomic():
+                    created = self.perform_bulk_create(
+                        [data for _, data in items]
+                    )
+            except IntegrityError:
+                valid = self.valid_items(items, errors)
+                if len(valid) == len(items):
+                    raise
+                items = valid
+            else:
+                invalidate_models(self.queryset.model)
+                return created
+        return []
+
+    def validate_bulk(self, items, errors):
+        """
+        Проверки, требующие базы. Ошибки добавляются в errors по индексу
+        элемента; возвращаются элементы, которые можно создавать.
+        """
+        return items
+
+    def perform_bulk_create(self, items):
+        """Создаёт объекты и возвращает их представление для ответа."""
+        raise NotImplementedError
+
+
+class SlugBulkCreateMixin(BulkCreateMixin):
+    """Массовое создание моделей с уникальным slug: категорий и жанров."""
+
+    def validate_bulk(self, items, errors):
+        model = self.queryset.model
+        existing = set(
+            model.objects
+            .filter(slug__in=[data['slug'] for _, data in items])
+            .order_by()
+            .values_list('slug', flat=True)
+        )
+        seen = set()
+        for index, data in items:
+            if data['slug'] in existing or data['slug'] in seen:
+                errors[index] = {'slug': [
+                    f'{model._meta.verbose_name} с таким slug уже существует.'
+                ]}
+            seen.add(data['slug'])
+        return items
+
+    def perform_bulk_create(self, items):
+        model = self.queryset.model
+        model.objects.bulk_create([model(**data) for data in items])
+        return [dict(data) for data in items]
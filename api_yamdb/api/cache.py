@@ -0,0 +1,168 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.cache import CACHE_PREFIX, get_cache, get_table_versions, make_key
+
+STATS_KEYS = ('hits', 'misses')
+
+
+def record_stat(name, stat):
+    cache = get_cache()
+    key = f'{CACHE_PREFIX}:stats:{name}:{stat}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счётчик вытеснен между add и incr.
+        cache.add(key, 1, None)
+
+
+def get_cache_stats(names):
+    cache = get_cache()
+    keys = {
+        f'{CACHE_PREFIX}:stats:{name}:{stat}': (name, stat)
+        for name in names
+        for stat in STATS_KEYS
+    }
+    values = cache.get_many(keys)
+    stats = {name: dict.fromkeys(STATS_KEYS, 0) for name in names}
+    for key, value in values.items():
+        name, stat = keys[key]
+        stats[name][stat] = value
+    for counters in stats.values():
+        total = counters['hits'] + counters['misses']
+        counters['hit_ratio'] = (
+            round(counters['hits'] / total, 4) if total else None
+        )
+    return stats
+
+
+class TableVersionMixin:
+    """
+    Вьюсет, ответы которого зависят от таблиц cache_tables
+    (по умолчанию — таблица модели вьюсета).
+    """
+    cache_tables = None
+    table_versions = None
+
+    def get_cache_tables(self):
+        if self.cache_tables is not None:
+            return self.cache_tables
+        return (self.queryset.model._meta.db_table,)
+
+    def get_version_keys(self):
+        """
+        Ключи версий, от которых зависит ответ текущего действия: по
+        умолчанию таблицы cache_tables, для ответов об одном ресурсе —
+        ключи core.cache.row_key и bulk_key.
+        """
+        return self.get_cache_tables()
+
+    def get_table_versions(self):
+        """Версии читаются из базы один раз за запрос."""
+        if self.table_versions is None:
+            self.table_versions = get_table_versions(self.get_version_keys())
+        return self.table_versions
+
+    def get_count_versions(self):
+        """
+        Версии, от которых зависит COUNT(*) списка; None — версии таблиц
+        запроса.
+        """
+        return None
+
+
+class NotModified(Exception):
+    """Прерывает обработку запроса готовым ответом 304."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin(TableVersionMixin):
+    """
+    Условные GET-запросы для действий из conditional_actions.
+
+    ETag и Last-Modified вычисляются по версиям из get_version_keys:
+    номер версии и время последней записи общие для всех процессов и
+    читаются одним запросом. Ответ 304 на If-None-Match или
+    If-Modified-Since отдаётся сразу после проверки прав, до выполнения
+    основного запроса.
+    """
+    conditional_actions = ('list', 'retrieve')
+    validators = None
+
+    def get_validators(self, request):
+        versions = self.get_table_versions()
+        digest = make_key(
+            request.get_full_path(),
+            request.accepted_media_type,
+            sorted(versions.items())
+        ).rsplit(':', 1)[1]
+        return f'"{digest}"', max(
+            modified for _, modified in versions.values()
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or self.action not in self.conditional_actions
+        ):
+            return
+        self.validators = self.get_validators(request)
+        etag, last_modified = self.validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if self.validators and response.status_code in (200, 304):
+            etag, last_modified = self.validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class CachedListMixin(TableVersionMixin):
+    """
+    Кэширует ответы list() с учётом параметров запроса.
+
+    Ключ включает версии таблиц из cache_tables, поэтому любое изменение
+    этих таблиц делает сохранённые ответы недоступными.
+    """
+    list_cache_timeout = 60 * 15
+
+    def list(self, request, *args, **kwargs):
+        versions = self.get_table_versions()
+        key = make_key(
+            'list',
+            self.basename,
+            sorted(versions.items()),
+            sorted(request.query_params.lists())
+        )
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            record_stat(self.basename, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        record_stat(self.basename, 'misses')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.list_cache_timeout)
+        response['X-Cache'] = 'MISS'
+        return response
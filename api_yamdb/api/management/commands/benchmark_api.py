@@ -0,0 +1,422 @@
+import json
+import math
+import time
+from itertools import count
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (CaptureQueriesContext,
+                               setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.urls_v1 import urlpatterns
+from reviews.bulk_import import reset_sequences
+from reviews.csv_layout import IMPORT_FILES
+from reviews.fake_data import (WORDS, DatabaseWriter, FakeDataGenerator,
+                               first_free_ids)
+from reviews.models import Category, Comments, Genre, Review, Title
+from reviews.search import get_search_backend
+from users.models import User
+
+BENCH_ADMIN = 'bench_admin'
+BENCH_TOKEN_USER = 'bench_token'
+BENCH_CONFIRMATION_CODE = 'bench-code'
+BENCH_WRITER = 'bench_writer'
+
+
+def seed_dataset(titles, genres, categories, users, reviews_per_title,
+                 comments_per_review, seed=0):
+    """
+    Заполняет базу синтетическими данными генератора generate_fake_data
+    и возвращает идентификаторы объектов, на которых измеряются детальные
+    эндпоинты. Отзывов в среднем reviews_per_title на произведение,
+    распределены они по Ципфу.
+    """
+    admin = User.objects.create_user(
+        username=BENCH_ADMIN,
+        email=f'{BENCH_ADMIN}@yamdb.fake',
+        role=User.ADMIN
+    )
+    User.objects.create_user(
+        username=BENCH_TOKEN_USER,
+        email=f'{BENCH_TOKEN_USER}@yamdb.fake',
+        confirmation_code=BENCH_CONFIRMATION_CODE
+    )
+    generator = FakeDataGenerator(
+        users=users,
+        titles=titles,
+        reviews=titles * reviews_per_title,
+        genres=genres,
+        categories=categories,
+        comments_per_review=comments_per_review,
+        seed=seed,
+        first_ids=first_free_ids(),
+    )
+    with get_search_backend().deferred(), DatabaseWriter() as writer:
+        for filename, row in generator.rows():
+            writer.write(filename, row)
+    reset_sequences([model for _, model, _, _ in IMPORT_FILES])
+
+    from reviews.ratings import rebuild_ratings, rebuild_title_stats
+    rebuild_ratings()
+    rebuild_title_stats()
+
+    comment = Comments.objects.select_related('review').first()
+    review = comment.review if comment else Review.objects.first()
+    return admin, {
+        'title_id': (
+            review.title_id if review
+            else Title.objects.values_list('pk', flat=True).first()
+        ),
+        'review_id': review.pk if review else None,
+        'comment_id': comment.pk if comment else None,
+        'slug': Category.objects.values_list('slug', flat=True).first(),
+        'username': BENCH_ADMIN,
+        'table': 'review',
+        'extension': 'csv',
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+class WriteRequests:
+    """
+    Запросы записи: итерация даёт (имя маршрута, метод, prepare).
+    prepare() вызывается вне замера перед каждым запросом и возвращает
+    (клиент, url, данные): отзывы и комментарии пишет новый автор, поэтому
+    уникальность отзыва не мешает повторам, а удаляется объект, созданный
+    для этого запроса.
+    """
+
+    # Маршруты, для которых готовятся запросы записи.
+    ROUTES = (
+        'titles-list', 'titles-detail', 'titles-bulk',
+        'categories-list', 'categories-detail', 'categories-bulk',
+        'genres-list', 'genres-detail', 'genres-bulk',
+        'reviews-list', 'reviews-detail',
+        'comments-list', 'comments-detail',
+    )
+
+    def __init__(self, admin, ids):
+        self.ids = ids
+        self.admin_client = get_client(admin)
+        self.numbers = count()
+        self.genre = Genre.objects.values_list('slug', flat=True).first()
+        self.title_kwargs = {'title_id': ids['title_id']}
+        self.review_kwargs = {
+            **self.title_kwargs, 'review_id': ids['review_id']
+        }
+
+    def new_author(self):
+        number = next(self.numbers)
+        return User.objects.create_user(
+            username=f'{BENCH_WRITER}_{number}',
+            email=f'{BENCH_WRITER}_{number}@yamdb.fake'
+        )
+
+    def title_data(self):
+        return {
+            'name': f'Произведение {next(self.numbers)}',
+            'year': 2000,
+            'category': self.ids['slug'],
+            'genre': [self.genre],
+        }
+
+    def slug_data(self, size=10):
+        number = next(self.numbers)
+        return [
+            {'name': f'Раздел {number}-{index}',
+             'slug': f'bench-{number}-{index}'}
+            for index in range(size)
+        ]
+
+    def admin_request(self, name, data=None, **kwargs):
+        return self.admin_client, reverse(name, kwargs=kwargs), data
+
+    def author_request(self, name, data, **kwargs):
+        client = get_client(self.new_author())
+        return client, reverse(name, kwargs=kwargs), data
+
+    def __iter__(self):
+        ids = self.ids
+        if None in (ids['title_id'], ids['review_id'], ids['comment_id']):
+            return
+        yield from self.title_requests()
+        for basename, model in (('categories', Category), ('genres', Genre)):
+            yield from self.slug_requests(basename, model)
+        yield from self.review_requests()
+        yield from self.comment_requests()
+
+    def title_requests(self):
+        yield 'titles-list', 'post', lambda: self.admin_request(
+            'titles-list', self.title_data()
+        )
+        yield 'titles-detail', 'patch', lambda: self.admin_request(
+            'titles-detail', {'description': f'Описание {next(self.numbers)}'},
+            pk=self.ids['title_id']
+        )
+        yield 'titles-detail', 'delete', lambda: self.admin_request(
+            'titles-detail',
+            pk=Title.objects.create(name='Удаляемое', year=2000).pk
+        )
+        yield 'titles-bulk', 'post', lambda: self.admin_request(
+            'titles-bulk', [self.title_data() for _ in range(10)]
+        )
+
+    def slug_requests(self, basename, model):
+        yield f'{basename}-list', 'post', lambda: self.admin_request(
+            f'{basename}-list', self.slug_data(1)[0]
+        )
+        yield f'{basename}-detail', 'delete', lambda: self.admin_request(
+            f'{basename}-detail',
+            slug=model.objects.create(**self.slug_data(1)[0]).slug
+        )
+        yield f'{basename}-bulk', 'post', lambda: self.admin_request(
+            f'{basename}-bulk', self.slug_data()
+        )
+
+    def review_requests(self):
+        yield 'reviews-list', 'post', lambda: self.author_request(
+            'reviews-list', {'text': 'Новый отзыв', 'score': 7},
+            **self.title_kwargs
+        )
+        yield 'reviews-detail', 'patch', lambda: self.admin_request(
+            'reviews-detail', {'text': f'Правка {next(self.numbers)}'},
+            pk=self.ids['review_id'], **self.title_kwargs
+        )
+        yield 'reviews-detail', 'delete', lambda: self.admin_request(
+            'reviews-detail',
+            pk=Review.objects.create(
+                title_id=self.ids['title_id'], author=self.new_author(),
+                text='Удаляемый отзыв', score=5
+            ).pk,
+            **self.title_kwargs
+        )
+
+    def comment_requests(self):
+        yield 'comments-list', 'post', lambda: self.author_request(
+            'comments-list', {'text': 'Новый комментарий'},
+            **self.review_kwargs
+        )
+        yield 'comments-detail', 'patch', lambda: self.admin_request(
+            'comments-detail', {'text': f'Правка {next(self.numbers)}'},
+            pk=self.ids['comment_id'], **self.review_kwargs
+        )
+        yield 'comments-detail', 'delete', lambda: self.admin_request(
+            'comments-detail',
+            pk=Comments.objects.create(
+                review_id=self.ids['review_id'], author=self.new_author(),
+                text='Удаляемый комментарий'
+            ).pk,
+            **self.review_kwargs
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер задержки, количества SQL-запросов и объёма ответа '
+        'для всех эндпоинтов /api/v1 на синтетических данных'
+    )
+
+    # Параметр `pk` у детальных маршрутов зависит от ресурса.
+    DETAIL_PK = {
+        'titles': 'title_id',
+        'reviews': 'review_id',
+        'comments': 'comment_id',
+    }
+
+    # Параметры для эндпоинтов, которые без них не работают. Слова поиска
+    # берутся из словаря генератора, чтобы поиск находил тексты.
+    QUERY_PARAMS = {
+        'search-reviews-list': {'q': WORDS[0]},
+        'search-comments-list': {'q': WORDS[1]},
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--reviews-per-title', type=int, default=10)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество замеров на каждый эндпоинт'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default='benchmark.json',
+            help='Файл, в который записываются результаты'
+        )
+        parser.add_argument(
+            '--thresholds',
+            help=(
+                'JSON-файл с порогами вида {"titles-list": {"p95_ms": 50, '
+                '"queries": 3}}; ключ "*" задаёт пороги для всех эндпоинтов'
+            )
+        )
+
+    def handle(self, *args, **options):
+        thresholds = {}
+        if options['thresholds']:
+            with open(options['thresholds'], encoding='utf-8') as file:
+                thresholds = json.load(file)
+
+        dataset = {
+            key: options[key]
+            for key in (
+                'titles', 'genres', 'categories', 'users',
+                'reviews_per_title', 'comments_per_review'
+            )
+        }
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            admin, ids = seed_dataset(seed=options['seed'], **dataset)
+            results = self.run_endpoints(admin, ids, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'dataset': dataset,
+            'repeat': options['repeat'],
+            'endpoints': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2,
+                      sort_keys=True)
+            file.write('\n')
+
+        for name, result in sorted(results.items()):
+            if 'skipped' in result:
+                self.stdout.write(f'{name}: пропущен ({result["skipped"]})')
+                continue
+            self.stdout.write(
+                f'{name}: {result["method"]} {result["status"]} '
+                f'p50={result["p50_ms"]}мс p95={result["p95_ms"]}мс '
+                f'queries={result["queries"]} bytes={result["bytes"]}'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты записаны в {options["output"]}')
+        )
+
+        violations = self.check_thresholds(results, thresholds)
+        if violations:
+            raise CommandError(
+                'Превышены пороги: ' + '; '.join(violations)
+            )
+
+    def get_requests(self, ids):
+        """Возвращает (имя маршрута, метод, url, данные) для замеров."""
+        payloads = {
+            'signup': {
+                'username': BENCH_ADMIN,
+                'email': f'{BENCH_ADMIN}@yamdb.fake',
+            },
+            'token': {
+                'username': BENCH_TOKEN_USER,
+                'confirmation_code': BENCH_CONFIRMATION_CODE,
+            },
+        }
+        for pattern in urlpatterns:
+            groups = pattern.pattern.regex.groupindex
+            if 'format' in groups:
+                continue
+            name = pattern.name
+            if name in payloads:
+                yield name, 'post', reverse(name), payloads[name]
+                continue
+            actions = getattr(pattern.callback, 'actions', None)
+            if actions is not None and 'get' not in actions:
+                if name not in WriteRequests.ROUTES:
+                    yield name, None, None, 'нет GET-метода'
+                continue
+            basename = name.split('-')[0]
+            kwargs = {}
+            for group in groups:
+                key = self.DETAIL_PK.get(basename) if group == 'pk' else None
+                kwargs[group] = ids.get(key or group)
+            if None in kwargs.values():
+                yield name, None, None, 'нет данных для маршрута'
+                continue
+            yield name, 'get', reverse(name, kwargs=kwargs), (
+                self.QUERY_PARAMS.get(name)
+            )
+
+    def run_endpoints(self, admin, ids, repeat):
+        client = get_client(admin)
+        results = {}
+        for name, method, url, data in self.get_requests(ids):
+            if method is None:
+                results[name] = {'skipped': data}
+                continue
+            results[name] = self.measure(
+                method, lambda: (client, url, data), repeat
+            )
+        for name, method, prepare in WriteRequests(admin, ids):
+            results[f'{name} {method.upper()}'] = self.measure(
+                method, prepare, repeat
+            )
+        return results
+
+    def measure(self, method, prepare, repeat):
+        """
+        Прогревочный запрос и repeat замеров; prepare() готовит каждый
+        запрос вне замера.
+        """
+        # Тело запросов записи — JSON: массовые маршруты принимают список.
+        options = {} if method == 'get' else {'format': 'json'}
+        client, url, data = prepare()
+        getattr(client, method)(url, data=data, **options)
+        timings = []
+        for _ in range(repeat):
+            client, url, data = prepare()
+            send = getattr(client, method)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = send(url, data=data, **options)
+                # Потоковый ответ читается целиком внутри замера.
+                content = (
+                    b''.join(response.streaming_content)
+                    if response.streaming else response.content
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'queries': len(queries),
+            'bytes': len(content),
+        }
+
+    def check_thresholds(self, results, thresholds):
+        violations = []
+        for name, result in sorted(results.items()):
+            if 'skipped' in result:
+                continue
+            limits = {**thresholds.get('*', {}), **thresholds.get(name, {})}
+            for metric, limit in sorted(limits.items()):
+                if metric in result and result[metric] > limit:
+                    violations.append(
+                        f'{name}.{metric}={result[metric]} > {limit}'
+                    )
+        return violations
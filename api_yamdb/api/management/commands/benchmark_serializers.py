@@ -0,0 +1,152 @@
+import json
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.management.commands.benchmark_api import percentile, seed_dataset
+from api.renderers import FastJSONRenderer
+from api.serializers import (CommentListSerializer, CommentSerializer,
+                             ReviewListSerializer, ReviewSerializer,
+                             TitleListSerializer, TitleReadSerializer)
+from reviews.models import Comments, Review, Title
+
+# Список: запрос, сериализатор до изменений и облегчённый сериализатор.
+LISTS = {
+    'titles': (
+        lambda: (
+            Title.objects.select_related('category')
+            .prefetch_related('genre').order_by('name')
+        ),
+        TitleReadSerializer,
+        TitleListSerializer,
+    ),
+    'reviews': (
+        lambda: Review.objects.select_related('author').order_by('id'),
+        ReviewSerializer,
+        ReviewListSerializer,
+    ),
+    'comments': (
+        lambda: Comments.objects.select_related('author').order_by('id'),
+        CommentSerializer,
+        CommentListSerializer,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер сериализации и рендеринга списков произведений, отзывов и '
+        'комментариев: сериализаторы DRF и JSONRenderer против облегчённых '
+        'сериализаторов и FastJSONRenderer на одинаковом выводе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items', type=int, default=100,
+            help='Количество объектов в сериализуемом списке'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество замеров на каждый вариант'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл, в который записываются результаты в JSON'
+        )
+
+    def handle(self, *args, **options):
+        items = options['items']
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            seed_dataset(
+                titles=items, genres=10, categories=5, users=20,
+                reviews_per_title=1, comments_per_review=1,
+                seed=options['seed']
+            )
+            results = {
+                name: self.measure(
+                    list(queryset()[:items]), full, lean, options['repeat']
+                )
+                for name, (queryset, full, lean) in LISTS.items()
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, result in results.items():
+            variants = ', '.join(
+                f'{variant} p50={timing["p50_ms"]}мс'
+                for variant, timing in result['variants'].items()
+            )
+            self.stdout.write(
+                f'{name} ({result["items"]} шт., {result["bytes"]} байт): '
+                f'{variants}; ускорение x{result["speedup"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+                file.write('\n')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Результаты записаны в {options["output"]}'
+                )
+            )
+
+    def measure(self, objects, full, lean, repeat):
+        """
+        Сериализация и рендеринг уже загруженных объектов: запросы к базе
+        в замер не входят. Варианты должны давать одинаковые байты.
+        """
+        variants = {
+            'drf': lambda: JSONRenderer().render(
+                full(objects, many=True).data
+            ),
+            'lean_stdlib': lambda: self.without_orjson(
+                lambda: FastJSONRenderer().render(
+                    lean(objects, many=True).data
+                )
+            ),
+        }
+        if renderers.orjson is not None:
+            variants['lean_orjson'] = lambda: FastJSONRenderer().render(
+                lean(objects, many=True).data
+            )
+
+        expected = variants['drf']()
+        timings = {}
+        for variant, render in variants.items():
+            if render() != expected:
+                raise CommandError(
+                    f'Вывод варианта {variant} отличается от drf'
+                )
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[variant] = {
+                'p50_ms': round(percentile(samples, 0.5), 3),
+                'p95_ms': round(percentile(samples, 0.95), 3),
+            }
+        fastest = min(timing['p50_ms'] for timing in timings.values())
+        return {
+            'items': len(objects),
+            'bytes': len(expected),
+            'variants': timings,
+            'speedup': round(timings['drf']['p50_ms'] / fastest, 2),
+        }
+
+    @staticmethod
+    def without_orjson(render):
+        with mock.patch.object(renderers, 'orjson', None):
+            return render()
@@ -0,0 +1,210 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.management.commands.benchmark_api import percentile, seed_dataset
+from reviews.models import Review, Title
+from users.models import User
+
+# Настройки SQLite для сравнения: стандартные для Django и бэкенда проекта.
+SQLITE_MODES = {
+    'default': {
+        'PRAGMAS': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'busy_timeout': 5000,
+            'mmap_size': 0,
+        },
+        'TRANSACTION_MODE': '',
+    },
+    'tuned': {
+        'PRAGMAS': {},
+        'TRANSACTION_MODE': 'IMMEDIATE',
+    },
+}
+
+
+class Worker(threading.Thread):
+    """Поток, выполняющий operation до дедлайна и собирающий замеры."""
+
+    def __init__(self, operation, deadline):
+        super().__init__(daemon=True)
+        self.operation = operation
+        self.deadline = deadline
+        self.timings = []
+        self.errors = 0
+
+    def run(self):
+        try:
+            while time.monotonic() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    if self.operation() is False:
+                        return
+                except OperationalError:
+                    self.errors += 1
+                    continue
+                self.timings.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер пропускной способности записи отзывов при параллельных '
+        'читателях: стандартная настройка SQLite против WAL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность замера каждого режима, секунды'
+        )
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл, в который записываются результаты в JSON'
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        modes = {'current': {}}
+        tmpdir = None
+        if connection.vendor == 'sqlite':
+            modes = SQLITE_MODES
+            # WAL не работает с базой в памяти, поэтому тестовая база
+            # создаётся во временном файле.
+            tmpdir = tempfile.mkdtemp()
+            old_test_name = settings_dict['TEST'].get('NAME')
+            settings_dict['TEST']['NAME'] = os.path.join(
+                tmpdir, 'benchmark.sqlite3'
+            )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        saved = {key: settings_dict.get(key) for key in SQLITE_MODES['tuned']}
+        try:
+            seed_dataset(
+                titles=options['titles'], genres=5, categories=3, users=0,
+                reviews_per_title=0, comments_per_review=0,
+                seed=options['seed']
+            )
+            title_ids = list(Title.objects.values_list('pk', flat=True))
+            results = {}
+            for mode, overrides in modes.items():
+                connection.close()
+                settings_dict.update(overrides)
+                results[mode] = self.run_mode(mode, title_ids, options)
+        finally:
+            settings_dict.update(saved)
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if tmpdir:
+                settings_dict['TEST']['NAME'] = old_test_name
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode}: запись {result["writes_per_s"]}/с '
+                f'(p95={result["write_p95_ms"]}мс, '
+                f'ошибок {result["write_errors"]}), '
+                f'чтение {result["reads_per_s"]}/с '
+                f'(ошибок {result["read_errors"]})'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+                file.write('\n')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Результаты записаны в {options["output"]}'
+                )
+            )
+
+    def run_mode(self, mode, title_ids, options):
+        authors = User.objects.bulk_create(
+            User(username=f'writer_{mode}_{idx}',
+                 email=f'writer_{mode}_{idx}@yamdb.fake')
+            for idx in range(options['writers'])
+        )
+        authors = User.objects.filter(
+            username__in=[author.username for author in authors]
+        )
+        connection.close()
+        deadline = time.monotonic() + options['duration']
+        workers = [
+            Worker(self.writer(author, title_ids), deadline)
+            for author in authors
+        ]
+        readers = [
+            Worker(self.reader(title_ids, options['seed'] + idx), deadline)
+            for idx in range(options['readers'])
+        ]
+        started = time.monotonic()
+        for worker in workers + readers:
+            worker.start()
+        for worker in workers + readers:
+            worker.join()
+        elapsed = time.monotonic() - started
+
+        writes = [t for worker in workers for t in worker.timings]
+        reads = [t for worker in readers for t in worker.timings]
+        return {
+            'writes': len(writes),
+            'writes_per_s': round(len(writes) / elapsed, 1),
+            'write_p95_ms': (
+                round(percentile(writes, 0.95) * 1000, 2) if writes else None
+            ),
+            'write_errors': sum(worker.errors for worker in workers),
+            'reads': len(reads),
+            'reads_per_s': round(len(reads) / elapsed, 1),
+            'read_errors': sum(worker.errors for worker in readers),
+        }
+
+    @staticmethod
+    def writer(author, title_ids):
+        """Отзывы автора по очереди на каждое произведение, как POST."""
+        titles = iter(title_ids)
+
+        def write():
+            title_id = next(titles, None)
+            if title_id is None:
+                return False
+            with transaction.atomic():
+                Review.objects.create(
+                    title_id=title_id,
+                    author=author,
+                    text='Отзыв для замера',
+                    score=title_id % 10 + 1
+                )
+        return write
+
+    @staticmethod
+    def reader(title_ids, seed):
+        """Страница списка произведений и страница отзывов произведения."""
+        rnd = random.Random(seed)
+
+        def read():
+            list(
+                Title.objects.select_related('category').order_by('name')[:10]
+            )
+            list(
+                Review.objects
+                .filter(title_id=rnd.choice(title_ids))
+                .order_by('-pub_date', '-id')[:10]
+            )
+        return read
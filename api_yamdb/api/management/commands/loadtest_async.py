@@ -0,0 +1,246 @@
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from api.management.commands.benchmark_api import percentile, seed_dataset
+
+# Пути относительно /api/v1/ и /api/async/v1/.
+PATHS = (
+    'titles/',
+    'titles/{title_id}/',
+    'titles/{title_id}/reviews/',
+    'titles/{title_id}/reviews/{review_id}/comments/',
+)
+
+
+class ThreadCounter:
+    """Следит за максимальным числом потоков процесса во время замера."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест асинхронных эндпоинтов /api/async/v1 под ASGI '
+        'против /api/v1 под WSGI с медленными клиентами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clients', type=int, default=200,
+            help='Количество одновременных клиентов'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5,
+            help='Длительность замера каждого режима, секунды'
+        )
+        parser.add_argument(
+            '--client-delay', type=float, default=0.2,
+            help=(
+                'Сколько секунд клиент читает ответ: WSGI-поток всё это '
+                'время занят, ASGI-корутина — нет'
+            )
+        )
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл, в который записываются результаты в JSON'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            _, ids = seed_dataset(
+                titles=options['titles'], genres=10, categories=3,
+                users=20, reviews_per_title=5, comments_per_review=2,
+                seed=options['seed']
+            )
+            paths = [path.format(**ids) for path in PATHS]
+            results = {
+                'wsgi': self.measure(self.run_wsgi, paths, options),
+                'asgi': self.measure(self.run_asgi, paths, options),
+            }
+        finally:
+            connection.close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode}: {result["rps"]} запросов/с, '
+                f'p95={result["p95_ms"]}мс, ошибок {result["errors"]}, '
+                f'потоков {result["peak_threads"]}, '
+                f'память {result["peak_memory_kb"]} КБ'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+                file.write('\n')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Результаты записаны в {options["output"]}'
+                )
+            )
+
+    def measure(self, run, paths, options):
+        tracemalloc.start()
+        started = time.monotonic()
+        with ThreadCounter() as threads:
+            timings, errors = run(paths, options)
+        elapsed = time.monotonic() - started
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'requests': len(timings),
+            'rps': round(len(timings) / elapsed, 1),
+            'p95_ms': (
+                round(percentile(timings, 0.95) * 1000, 2)
+                if timings else None
+            ),
+            'errors': errors,
+            'peak_threads': threads.peak,
+            'peak_memory_kb': peak_memory // 1024,
+        }
+
+    @staticmethod
+    def run_wsgi(paths, options):
+        """Поток на клиента, как у синхронного сервера."""
+        application = get_wsgi_application()
+        deadline = time.monotonic() + options['duration']
+
+        def client(offset):
+            timings, errors = [], 0
+            index = offset
+            while time.monotonic() < deadline:
+                path = f'/api/v1/{paths[index % len(paths)]}'
+                index += 1
+                status = []
+                environ = {
+                    'REQUEST_METHOD': 'GET',
+                    'PATH_INFO': path,
+                    'QUERY_STRING': '',
+                    'SERVER_NAME': 'testserver',
+                    'SERVER_PORT': '80',
+                    'SERVER_PROTOCOL': 'HTTP/1.1',
+                    'wsgi.version': (1, 0),
+                    'wsgi.url_scheme': 'http',
+                    'wsgi.input': io.BytesIO(),
+                    'wsgi.errors': sys.stderr,
+                    'wsgi.multithread': True,
+                    'wsgi.multiprocess': False,
+                    'wsgi.run_once': False,
+                }
+                started = time.perf_counter()
+                result = application(
+                    environ, lambda code, headers: status.append(code)
+                )
+                try:
+                    b''.join(result)
+                finally:
+                    result.close()
+                time.sleep(options['client_delay'])
+                timings.append(time.perf_counter() - started)
+                if not status[0].startswith('200'):
+                    errors += 1
+            return timings, errors
+
+        with ThreadPoolExecutor(max_workers=options['clients']) as pool:
+            results = list(pool.map(client, range(options['clients'])))
+        return (
+            [t for timings, _ in results for t in timings],
+            sum(errors for _, errors in results),
+        )
+
+    @staticmethod
+    def run_asgi(paths, options):
+        """Корутина на клиента в одном цикле событий."""
+        application = get_asgi_application()
+        delay = options['client_delay']
+
+        async def request(path):
+            status = []
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [(b'host', b'testserver')],
+                'client': ('127.0.0.1', 0),
+                'server': ('testserver', 80),
+            }
+
+            async def receive():
+                return {
+                    'type': 'http.request', 'body': b'', 'more_body': False
+                }
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+                elif not message.get('more_body'):
+                    await asyncio.sleep(delay)
+
+            await application(scope, receive, send)
+            return status[0]
+
+        async def client(offset, deadline):
+            timings, errors = [], 0
+            index = offset
+            while time.monotonic() < deadline:
+                path = f'/api/async/v1/{paths[index % len(paths)]}'
+                index += 1
+                started = time.perf_counter()
+                status = await request(path)
+                timings.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+            return timings, errors
+
+        async def main():
+            deadline = time.monotonic() + options['duration']
+            return await asyncio.gather(*(
+                client(offset, deadline)
+                for offset in range(options['clients'])
+            ))
+
+        results = asyncio.run(main())
+        return (
+            [t for timings, _ in results for t in timings],
+            sum(errors for _, errors in results),
+        )
@@ -0,0 +1,119 @@
+import threading
+
+# Верхние границы корзин гистограмм длительности, в миллисекундах.
+DURATION_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+DURATION_METRICS = ('total_ms', 'sql_ms', 'serializer_ms', 'render_ms')
+COUNTER_METRICS = ('queries', 'duplicates')
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, суммой и максимумом."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Верхняя граница корзины, в которую попадает перцентиль."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        buckets = {
+            f'le_{bound}': count
+            for bound, count in zip(self.buckets, self.counts)
+        }
+        buckets['inf'] = self.counts[-1]
+        return {
+            'sum': round(self.sum, 3),
+            'max': round(self.max, 3),
+            'avg': round(self.sum / self.count, 3) if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': buckets,
+        }
+
+
+class Counter:
+    def __init__(self):
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        return {'sum': self.sum, 'max': self.max}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.metrics = {name: Histogram() for name in DURATION_METRICS}
+        self.metrics.update({name: Counter() for name in COUNTER_METRICS})
+
+    def observe(self, sample):
+        self.count += 1
+        for name, metric in self.metrics.items():
+            metric.observe(sample[name])
+
+    def as_dict(self):
+        data = {'count': self.count}
+        data.update(
+            (name, metric.as_dict()) for name, metric in self.metrics.items()
+        )
+        return data
+
+
+class RequestMetrics:
+    """
+    Агрегаты замеров запросов по эндпоинтам в памяти процесса.
+
+    Запись и чтение защищены блокировкой, поэтому хранилище можно
+    использовать из нескольких потоков одного процесса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, sample):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.observe(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: stats.as_dict()
+                for endpoint, stats in sorted(self._endpoints.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+request_metrics = RequestMetrics()
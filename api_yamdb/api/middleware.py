@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+from api.metrics import request_metrics
+
+logger = logging.getLogger('api.requests')
+
+
+class QueryRecorder:
+    """
+    Обёртка выполнения SQL: считает запросы, их суммарное время и
+    повторы одного и того же запроса с теми же параметрами.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duplicates = 0
+        self.duration = 0
+        self._seen = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        key = (sql, repr(params))
+        if key in self._seen:
+            self.duplicates += 1
+        else:
+            self._seen.add(key)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+@contextmanager
+def record_queries(recorder):
+    """Подключает recorder ко всем соединениям текущего потока."""
+    with ExitStack() as stack:
+        if recorder is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+def time_serializer_data(data):
+    """
+    Обёртка BaseSerializer.data: время сериализации без SQL-запросов,
+    выполненных по ходу (ленивые связи), добавляется к запросу из
+    context['request']. Вложенные вызовы .data учитываются внешним.
+    """
+    @functools.wraps(data)
+    def timed(serializer):
+        request = getattr(serializer.context.get('request'), '_request', None)
+        recorder = getattr(request, 'query_recorder', None)
+        if recorder is None or request._serializing:
+            return data(serializer)
+        request._serializing = True
+        sql_before = recorder.duration
+        started = time.perf_counter()
+        try:
+            return data(serializer)
+        finally:
+            request._serializing = False
+            request._serializer_duration += (
+                time.perf_counter() - started
+                - (recorder.duration - sql_before)
+            )
+
+    return timed
+
+
+def install_serializer_timing():
+    """
+    Подключает замер сериализации ко всем сериализаторам DRF: data у
+    Serializer и ListSerializer вызывает BaseSerializer.data.
+    """
+    data = BaseSerializer.data.fget
+    if not hasattr(data, '__wrapped__'):
+        BaseSerializer.data = property(time_serializer_data(data))
+
+
+def get_endpoint(request):
+    """
+    Имя эндпоинта: вьюсет и действие для маршрутов роутера,
+    имя маршрута для остальных представлений.
+    """
+    match = request.resolver_match
+    if match is None:
+        return None
+    view = match.func
+    actions = getattr(view, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view.cls.__name__}.{action}'
+    return match.view_name
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет каждый запрос: общее время, время и количество SQL-запросов,
+    число повторных запросов, время сериализации (без SQL, см.
+    install_serializer_timing) и время рендеринга ответа.
+
+    Результаты отдаются в заголовке Server-Timing, пишутся в лог
+    api.requests одной JSON-строкой и накапливаются в гистограммах
+    api.metrics.request_metrics по эндпоинтам.
+
+    Работает и в синхронной, и в асинхронной цепочке. В асинхронной
+    запросы к базе выполняются в других потоках, поэтому регистратор
+    запросов передаётся в request.query_recorder и подключается там
+    (см. api.async_views).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Отмечает экземпляр как корутинную функцию для Django.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = self.start(request)
+        with record_queries(request.query_recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        started = self.start(request)
+        response = await self.get_response(request)
+        return self.finish(request, response, started)
+
+    @staticmethod
+    def start(request):
+        request.query_recorder = QueryRecorder()
+        request._serializing = False
+        request._serializer_duration = 0
+        request._render_duration = 0
+        return time.perf_counter()
+
+    def finish(self, request, response, started):
+        total = time.perf_counter() - started
+        recorder = request.query_recorder
+        sample = {
+            'total_ms': total * 1000,
+            'sql_ms': recorder.duration * 1000,
+            'serializer_ms': request._serializer_duration * 1000,
+            'render_ms': request._render_duration * 1000,
+            'queries': recorder.count,
+            'duplicates': recorder.duplicates,
+        }
+        response['Server-Timing'] = ', '.join((
+            f'sql;dur={sample["sql_ms"]:.2f};'
+            f'desc="{recorder.count} queries, '
+            f'{recorder.duplicates} duplicates"',
+            f'serializer;dur={sample["serializer_ms"]:.2f}',
+            f'render;dur={sample["render_ms"]:.2f}',
+            f'total;dur={sample["total_ms"]:.2f}',
+        ))
+
+        endpoint = get_endpoint(request)
+        if endpoint is not None:
+            request_metrics.record(endpoint, sample)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            **{name: round(value, 3) for name, value in sample.items()},
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся после всех process_template_response;
+        # время рендеринга замеряется от этого момента до колбэка.
+        render_started = time.perf_counter()
+
+        def finish_render(rendered):
+            request._render_duration = time.perf_counter() - render_started
+
+        response.add_post_render_callback(finish_render)
+        return response
@@ -0,0 +1,97 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from core.paginator import CachedCountPaginator
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    PageNumberPagination с кэшированным или оценочным COUNT(*).
+
+    Настраивается атрибутами вьюсета count_cache_timeout (0 отключает
+    кэш) и count_estimate_threshold (None отключает оценку).
+    """
+    count_cache_timeout = 60 * 5
+    count_estimate_threshold = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        # Вызывается из PageNumberPagination.paginate_queryset вместо
+        # класса Paginator, чтобы передать настройки вьюсета.
+        return CachedCountPaginator(
+            queryset,
+            page_size,
+            count_timeout=getattr(
+                self.view, 'count_cache_timeout', self.count_cache_timeout
+            ),
+            estimate_threshold=getattr(
+                self.view,
+                'count_estimate_threshold',
+                self.count_estimate_threshold
+            ),
+            # Версии, уже прочитанные вьюсетом для ETag или кэша списка.
+            table_versions=getattr(self.view, 'table_versions', None),
+            count_versions=(
+                self.view.get_count_versions()
+                if hasattr(self.view, 'get_count_versions') else None
+            )
+        )
+
+
+class OptionalCursorPagination(CachedCountPagination):
+    """
+    Постраничная пагинация с курсорным режимом по запросу клиента.
+
+    По умолчанию ответ совпадает с CachedCountPagination. Параметр
+    `?pagination=cursor` (или переданный `cursor`) включает курсорный
+    режим: без OFFSET и COUNT(*), с сортировкой по cursor_ordering, которая
+    должна заканчиваться уникальным полем и совпадать с индексом.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_ordering = None
+
+    def get_cursor_paginator(self, request):
+        if (
+            request.query_params.get(self.mode_query_param)
+            != self.cursor_mode
+            and CursorPagination.cursor_query_param
+            not in request.query_params
+        ):
+            return None
+        paginator = CursorPagination()
+        paginator.ordering = self.cursor_ordering
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = self.get_cursor_paginator(request)
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ReviewPagination(OptionalCursorPagination):
+    cursor_ordering = ('-pub_date', '-id')
+
+
+class CommentPagination(OptionalCursorPagination):
+    cursor_ordering = ('pub_date', 'id')
+
+
+class RankingPagination(CursorPagination):
+    """
+    Курсорная пагинация рейтингов по аннотации ranking_score.
+
+    Позиция в курсоре — значение счёта, поэтому глубокие страницы читаются
+    по индексу счёта без OFFSET.
+    """
+    ordering = ('-ranking_score', '-id')
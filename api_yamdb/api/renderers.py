@@ -0,0 +1,87 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Экранирование как у JSONRenderer: вывод остаётся подмножеством JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+UTF8 = codecs.lookup('utf-8').name
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON-рендерер, который сериализует ответ сразу в байты через orjson,
+    если он установлен, и через стандартный json — если нет.
+
+    Формат тот же, что у JSONRenderer: компактные разделители, UTF-8 без
+    \\u-экранирования, даты, Decimal и ленивые строки — через кодировщик
+    DRF. Форматированный вывод (indent) и настройки, которые orjson не
+    поддерживает, отдаются стандартной реализации.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.can_use_orjson(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_NON_STR_KEYS
+                )
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит: стандартный json их умеет.
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+    def can_use_orjson(self, accepted_media_type, renderer_context):
+        return (
+            self.compact
+            and self.strict
+            and not self.ensure_ascii
+            and self.encoder_class is JSONEncoder
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON-парсер, который разбирает тело запроса из байтов через orjson,
+    если он установлен. Для кодировок, отличных от UTF-8, и без orjson
+    работает стандартный JSONParser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != UTF8:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
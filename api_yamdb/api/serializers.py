@@ -1,7 +1,11 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from rest_framework import serializers
 
-from reviews.models import Category, Comments, Genre, Review, Title
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitleStats)
+
+# Формат дат из настроек DRF, общий для облегчённых сериализаторов списков.
+format_datetime = serializers.DateTimeField().to_representation
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -34,6 +38,40 @@ class TitleReadSerializer(serializers.ModelSerializer):
         )
 
 
+class TitleListSerializer(TitleReadSerializer):
+    """
+    Список произведений только для чтения: тот же вывод, что у
+    TitleReadSerializer, но словарь строится напрямую из объекта без
+    обхода полей и вложенных сериализаторов.
+    """
+
+    def to_representation(self, title):
+        rating = title.rating
+        category = title.category
+        return {
+            'id': title.id,
+            'name': title.name,
+            'year': title.year,
+            'rating': None if rating is None else int(rating),
+            'description': title.description,
+            'genre': [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in title.genre.all()
+            ],
+            'category': (
+                None if category is None
+                else {'name': category.name, 'slug': category.slug}
+            ),
+        }
+
+
+class TitleRankingSerializer(TitleReadSerializer):
+    score = serializers.FloatField(source='ranking_score', read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('score',)
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
@@ -50,6 +88,59 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    scores = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'review_count', 'rating', 'last_review_at',
+                  'scores')
+
+    def get_scores(self, obj):
+        return {str(score): count for score, count in obj.scores.items()}
+
+    def get_rating(self, obj):
+        if not obj.review_count:
+            return None
+        total = sum(score * count for score, count in obj.scores.items())
+        return total / obj.review_count
+
+
+class BulkCategorySerializer(serializers.ModelSerializer):
+    """
+    Элемент массовой загрузки категорий. Уникальность slug проверяется
+    одним запросом для всей пачки, поэтому валидатор поля отключён.
+    """
+
+    class Meta:
+        model = Category
+        fields = ('name', 'slug')
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class BulkGenreSerializer(serializers.ModelSerializer):
+    """Элемент массовой загрузки жанров."""
+
+    class Meta:
+        model = Genre
+        fields = ('name', 'slug')
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class BulkTitleSerializer(serializers.ModelSerializer):
+    """
+    Элемент массовой загрузки произведений. Категория и жанры принимаются
+    как slug и разрешаются одним запросом на тип для всей пачки.
+    """
+    category = serializers.SlugField(max_length=50)
+    genre = serializers.ListField(child=serializers.SlugField(max_length=50))
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year', 'description', 'genre', 'category')
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -90,6 +181,20 @@ class ReviewSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ReviewListSerializer(ReviewSerializer):
+    """Список отзывов только для чтения без обхода полей."""
+
+    def to_representation(self, review):
+        return {
+            'id': review.id,
+            'text': review.text,
+            'author': review.author.username,
+            'score': review.score,
+            'pub_date': format_datetime(review.pub_date),
+            'title': review.title_id,
+        }
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -123,3 +228,16 @@ class CommentSerializer(serializers.ModelSerializer):
         validated_data['review'] = self.context['view'].get_review()
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class CommentListSerializer(CommentSerializer):
+    """Список комментариев только для чтения без обхода полей."""
+
+    def to_representation(self, comment):
+        return {
+            'id': comment.id,
+            'text': comment.text,
+            'author': comment.author.username,
+            'review': comment.review_id,
+            'pub_date': format_datetime(comment.pub_date),
+        }
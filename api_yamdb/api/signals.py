@@ -0,0 +1,66 @@
+from django.apps import apps
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from api.cache import TableVersionMixin
+from api.views import AUTHOR_NAMES_KEY
+from core.cache import bulk_key, mark_tables_changed, row_key
+from core.signals import watch_models
+from reviews.models import Comments, Review, Title
+from users.models import User
+
+
+def viewset_cache_tables(viewset=TableVersionMixin):
+    """Таблицы из cache_tables вьюсета и всех его наследников."""
+    tables = set()
+    if viewset.cache_tables is not None:
+        tables.update(viewset.cache_tables)
+    elif getattr(viewset, 'queryset', None) is not None:
+        tables.add(viewset.queryset.model._meta.db_table)
+    for subclass in viewset.__subclasses__():
+        tables |= viewset_cache_tables(subclass)
+    return tables
+
+
+def known_values(instance, attname):
+    """
+    Значения внешнего ключа до и после правки, известные без запроса к
+    базе: у удалённой строки с отложенным полем его уже не прочитать.
+    """
+    return {
+        instance.__dict__.get(attname),
+        getattr(instance, f'_loaded_{attname}', None),
+    } - {None}
+
+
+def parent_keys(model, instance, attname):
+    ids = known_values(instance, attname)
+    if not ids:
+        return [bulk_key(model)]
+    return [row_key(model, pk) for pk in ids]
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_names(sender, instance, created, raw=False,
+                            **kwargs):
+    """Отзывы и комментарии показывают только username автора."""
+    if not created and not raw and (
+        getattr(instance, '_loaded_username', None) != instance.username
+    ):
+        mark_tables_changed(AUTHOR_NAMES_KEY)
+    instance._loaded_username = instance.username
+
+
+# Версии увеличиваются только для таблиц, от которых зависят ответы API,
+# и для ресурсов, по которым строятся ETag ответов об одном объекте.
+watch_models(
+    *(
+        model for model in apps.get_models()
+        if model._meta.db_table in viewset_cache_tables()
+    ),
+    row_keys={
+        Title: lambda title: [row_key(Title, title.pk)],
+        Review: lambda review: parent_keys(Title, review, 'title_id'),
+        Comments: lambda comment: parent_keys(Review, comment, 'review_id'),
+    }
+)
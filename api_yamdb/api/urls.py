@@ -2,4 +2,5 @@ from django.urls import path, include
 
 urlpatterns = [
     path('v1/', include('api.urls_v1')),
+    path('async/v1/', include('api.urls_async_v1')),
 ]
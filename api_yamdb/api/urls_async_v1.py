@@ -0,0 +1,22 @@
+from django.urls import path
+
+from api.async_views import comment_list, review_list, title_detail, title_list
+
+urlpatterns = [
+    path('titles/', title_list, name='async-titles-list'),
+    path(
+        'titles/<int:pk>/',
+        title_detail,
+        name='async-titles-detail'
+    ),
+    path(
+        'titles/<int:title_id>/reviews/',
+        review_list,
+        name='async-reviews-list'
+    ),
+    path(
+        'titles/<int:title_id>/reviews/<int:review_id>/comments/',
+        comment_list,
+        name='async-comments-list'
+    ),
+]
@@ -1,8 +1,10 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet)
+from api.views import (CategoryViewSet, CommentSearchViewSet,
+                       CommentViewSet, ExportView, GenreViewSet,
+                       ReviewSearchViewSet, ReviewViewSet, TitleViewSet,
+                       cache_stats, request_stats)
 from users.views import signup, get_token, UserViewSet
 
 router = DefaultRouter()
@@ -19,12 +21,24 @@ router.register(
     CommentViewSet,
     basename='comments'
 )
+router.register(
+    'search/reviews', ReviewSearchViewSet, basename='search-reviews'
+)
+router.register(
+    'search/comments', CommentSearchViewSet, basename='search-comments'
+)
 
 router.register('users', UserViewSet, basename='users')
 
 urlpatterns = [
     path('auth/signup/', signup, name='signup'),
     path('auth/token/', get_token, name='token'),
+    path('stats/cache/', cache_stats, name='cache-stats'),
+    path('stats/requests/', request_stats, name='request-stats'),
+    path(
+        'export/<slug:table>.<slug:extension>', ExportView.as_view(),
+        name='export'
+    ),
 ]
 
 urlpatterns += router.urls
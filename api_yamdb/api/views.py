@@ -1,13 +1,40 @@
-from django.db.models import Avg
+from django.db import connection
+from django.db.models import F, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters import rest_framework as django_filters
-from rest_framework import filters, mixins, viewsets
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from api.permissions import IsAdminOrReadOnly, IsAdminModeratorAuthorOrReadOnly
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, ReviewSerializer,
-                             TitleReadSerializer, TitleWriteSerializer)
-from reviews.models import Category, Comments, Genre, Review, Title
+from api.bulk import BulkCreateMixin, SlugBulkCreateMixin
+from api.cache import CachedListMixin, ConditionalGetMixin, get_cache_stats
+from api.metrics import request_metrics
+from api.pagination import (CommentPagination, RankingPagination,
+                            ReviewPagination)
+from api.permissions import (IsAdmin, IsAdminOrReadOnly,
+                             IsAdminModeratorAuthorOrReadOnly)
+from api.serializers import (BulkCategorySerializer, BulkGenreSerializer,
+                             BulkTitleSerializer, CategorySerializer,
+                             CommentListSerializer, CommentSerializer,
+                             GenreSerializer, ReviewListSerializer,
+                             ReviewSerializer, TitleListSerializer,
+                             TitleRankingSerializer, TitleReadSerializer,
+                             TitleStatsSerializer, TitleWriteSerializer)
+from core.cache import bulk_key, row_key
+from reviews.export import EXPORT_FORMATS, EXPORT_TABLES, TableExport
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title, TitleStats)
+from reviews.search import get_search_backend
+from users.models import User
+
+# Версия имён пользователей: авторы в отзывах и комментариях выводятся по
+# username, остальные поля пользователя на эти ответы не влияют. Её
+# увеличивают смена username и массовые изменения пользователей.
+AUTHOR_NAMES_KEY = bulk_key(User)
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -16,13 +43,18 @@ class TitleFilter(django_filters.FilterSet):
     genre = django_filters.CharFilter(field_name='genre__slug')
     name = django_filters.CharFilter(field_name='name', lookup_expr='contains')
     year = django_filters.NumberFilter(field_name='year')
+    q = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
+        fields = ['category', 'genre', 'name', 'year', 'q']
+
+    def filter_search(self, queryset, name, value):
+        return get_search_backend().search(queryset, value)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, BulkCreateMixin,
+                   viewsets.ModelViewSet):
     """
     ViewSet для работы с произведениями.
 
@@ -31,29 +63,191 @@ class TitleViewSet(viewsets.ModelViewSet):
     retrieve() - GET /titles/{id}/ - получение произведения
     partial_update() - PATCH /titles/{id}/ - частичное обновление произведения
     destroy() - DELETE /titles/{id}/ - удаление произведения
+    bulk() - POST /titles/bulk/ - массовое создание произведений (админ)
+    stats() - GET /titles/{id}/stats/ - распределение оценок, количество
+    и дата последнего отзыва
+    top() - GET /titles/top/ - произведения по байесовскому рейтингу
+    trending() - GET /titles/trending/ - произведения по затухающей
+    со временем частоте отзывов
 
     Поддерживает фильтрацию:
     - category - фильтр по slug категории
     - genre - фильтр по slug жанра
     - name - фильтр по названию произведения
     - year - фильтр по году выпуска
+    - q - полнотекстовый поиск по названию и описанию, результаты
+      упорядочены по релевантности
+
+    GET-запросы возвращают ETag и Last-Modified и поддерживают ответ 304.
     """
     queryset = Title.objects.all()
+    lookup_value_regex = r'\d+'
+    count_estimate_threshold = 100000
+    # Рейтинг хранится в произведении, но меняется вместе с отзывами.
+    # Сводки TitleStats пишутся только вместе с отзывами или командами,
+    # которые сбрасывают версию произведений, поэтому их таблица не
+    # отслеживается: rebuild_title_stats удаляет сводки одним DELETE.
+    cache_tables = (
+        Title._meta.db_table,
+        Category._meta.db_table,
+        Genre._meta.db_table,
+        GenreTitle._meta.db_table,
+        Review._meta.db_table,
+    )
+    conditional_actions = ('list', 'retrieve', 'stats', 'top', 'trending')
     filterset_class = TitleFilter
     filter_backends = (django_filters.DjangoFilterBackend,)
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = TitleWriteSerializer
+    bulk_serializer_class = BulkTitleSerializer
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action == 'list':
+            return TitleListSerializer
+        if self.action == 'retrieve':
             return TitleReadSerializer
+        if self.action in ('top', 'trending'):
+            return TitleRankingSerializer
         return self.serializer_class
 
     def get_queryset(self):
-        return Title.objects.annotate(
-            rating=Avg('reviews__score')
-        ).order_by('name')
+        return (
+            Title.objects
+            .select_related('category')
+            .prefetch_related('genre')
+            .order_by('name')
+        )
+
+    def get_version_keys(self):
+        """
+        Ответы об одном произведении зависят от его версии, которую
+        увеличивают правки произведения, его жанров и отзывов, а не от
+        версий целых таблиц.
+        """
+        if not self.detail:
+            return super().get_version_keys()
+        return (
+            row_key(Title, self.kwargs[self.lookup_field]),
+            bulk_key(Title),
+            bulk_key(Review),
+            Category._meta.db_table,
+            Genre._meta.db_table,
+        )
+
+    def ranking_response(self, field):
+        """
+        Произведения с отзывами по убыванию поля сводки field. Сводка
+        обновляется вместе с отзывами, поэтому запрос идёт по индексу
+        счёта без агрегации отзывов.
+        """
+        queryset = self.filter_queryset(
+            self.get_queryset()
+            .filter(stats__review_count__gt=0)
+            .annotate(ranking_score=F(f'stats__{field}'))
+        )
+        paginator = RankingPagination()
+        page = paginator.paginate_queryset(queryset, self.request, self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        return self.ranking_response('bayesian_rating')
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        return self.ranking_response('trending_score')
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Сводка отзывов произведения одним чтением по ключу."""
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            # Сводка создаётся с первым отзывом.
+            title = get_object_or_404(Title.objects.only('pk'), pk=pk)
+            stats = TitleStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
+
+    def validate_bulk(self, items, errors):
+        categories = dict(
+            Category.objects
+            .filter(slug__in={data['category'] for _, data in items})
+            .values_list('slug', 'id')
+        )
+        genres = dict(
+            Genre.objects
+            .filter(slug__in={
+                slug for _, data in items for slug in data['genre']
+            })
+            .values_list('slug', 'id')
+        )
+        for index, data in items:
+            item_errors = {}
+            if data['category'] not in categories:
+                item_errors['category'] = [
+                    f'Категория «{data["category"]}» не найдена.'
+                ]
+            missing = [slug for slug in data['genre'] if slug not in genres]
+            if missing:
+                item_errors['genre'] = [
+                    f'Жанр «{slug}» не найден.' for slug in missing
+                ]
+            if item_errors:
+                errors[index] = item_errors
+                continue
+            data['category_id'] = categories[data['category']]
+            data['genre_ids'] = [
+                genres[slug] for slug in dict.fromkeys(data['genre'])
+            ]
+        return items
+
+    def perform_bulk_create(self, items):
+        titles = [
+            Title(
+                name=data['name'],
+                year=data['year'],
+                description=data.get('description'),
+                category_id=data['category_id'],
+            )
+            for data in items
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(titles)
+        elif getattr(connection, 'write_lock_on_begin', False):
+            # Без RETURNING bulk_create не заполняет id, а они нужны для
+            # строк GenreTitle, поэтому id назначаются заранее. Транзакция
+            # началась с блокировки записи (BEGIN IMMEDIATE в SQLite), так
+            # что MAX(id) не изменится до вставки.
+            first_id = (Title.objects.aggregate(last=Max('pk'))['last'] or 0)
+            for title_id, title in enumerate(titles, first_id + 1):
+                title.id = title_id
+            Title.objects.bulk_create(titles)
+        else:
+            # Параллельная транзакция может прочитать тот же MAX(id),
+            # поэтому id выдаёт база при вставке каждой строки.
+            for title in titles:
+                title.save(force_insert=True)
+        TitleStats.objects.bulk_create(
+            [TitleStats(title=title) for title in titles],
+            ignore_conflicts=True
+        )
+        GenreTitle.objects.bulk_create([
+            GenreTitle(title=title, genre_id=genre_id)
+            for title, data in zip(titles, items)
+            for genre_id in data['genre_ids']
+        ])
+        return [
+            {
+                'id': title.id,
+                'name': data['name'],
+                'year': data['year'],
+                'description': data.get('description'),
+                'genre': list(dict.fromkeys(data['genre'])),
+                'category': data['category'],
+            }
+            for title, data in zip(titles, items)
+        ]
 
 
 class ListCreateDestroyViewSet(mixins.ListModelMixin,
@@ -64,31 +258,96 @@ class ListCreateDestroyViewSet(mixins.ListModelMixin,
     pass
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedListMixin,
+                      SlugBulkCreateMixin, ListCreateDestroyViewSet):
     """
     ViewSet для работы с категориями (list, create, destroy).
+
+    Ответы list() кэшируются до изменения таблицы категорий.
+    POST /categories/bulk/ - массовое создание категорий (админ).
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = BulkCategorySerializer
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(ConditionalGetMixin, CachedListMixin,
+                   SlugBulkCreateMixin, ListCreateDestroyViewSet):
     """
     ViewSet для работы с жанрами (list, create, destroy).
+
+    Ответы list() кэшируются до изменения таблицы жанров.
+    POST /genres/bulk/ - массовое создание жанров (админ).
     """
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = BulkGenreSerializer
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    """Счётчики попаданий и промахов кэша списков."""
+    return Response(get_cache_stats(('categories', 'genres')))
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdmin])
+def request_stats(request):
+    """
+    Гистограммы замеров запросов по эндпоинтам в текущем процессе.
+    DELETE сбрасывает накопленные данные.
+    """
+    if request.method == 'DELETE':
+        request_metrics.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(request_metrics.snapshot())
+
+
+class IgnoreAcceptNegotiation(DefaultContentNegotiation):
+    """
+    Формат выгрузки задаётся расширением в адресе, поэтому заголовок
+    Accept (например, text/csv) не должен давать 406.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка таблицы в CSV (формат static/data) или NDJSON:
+    строки читаются из базы и отдаются клиенту блоками, не накапливаясь
+    в памяти.
+    """
+    permission_classes = (IsAdmin,)
+    content_negotiation_class = IgnoreAcceptNegotiation
+
+    def get(self, request, table, extension):
+        if table not in EXPORT_TABLES or extension not in EXPORT_FORMATS:
+            raise NotFound(
+                f'Доступные таблицы: {", ".join(EXPORT_TABLES)}; '
+                f'форматы: {", ".join(EXPORT_FORMATS)}.'
+            )
+        response = StreamingHttpResponse(
+            TableExport(table, extension),
+            content_type=EXPORT_FORMATS[extension]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{extension}"'
+        )
+        return response
+
+
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet для работы с отзывами.
 
@@ -99,23 +358,53 @@ class ReviewViewSet(viewsets.ModelViewSet):
     - PATCH /titles/{title_id}/reviews/{review_id}/ - частичное обновление
       отзыва
     - DELETE /titles/{title_id}/reviews/{review_id}/ - удаление отзыва
+
+    Параметр `?pagination=cursor` включает курсорную пагинацию списка.
     """
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = ReviewPagination
+    # Таблицы, версии которых отслеживаются сигналами (для кэша COUNT(*)
+    # в админке); ETag строится по get_version_keys.
+    cache_tables = (
+        Review._meta.db_table,
+        Title._meta.db_table,
+        User._meta.db_table,
+    )
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ReviewListSerializer
+        return self.serializer_class
+
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs['title_id'])
+        """Произведение из URL, загруженное один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
         title = self.get_title()
         return (
             Review.objects
             .filter(title=title)
-            .select_related('author', 'title')
-            .order_by('-pub_date')
+            .select_related('author')
+            .order_by('-pub_date', '-id')
+        )
+
+    def get_version_keys(self):
+        """Отзывы меняются вместе с версией своего произведения."""
+        return (
+            row_key(Title, self.kwargs['title_id']),
+            bulk_key(Title),
+            bulk_key(Review),
+            AUTHOR_NAMES_KEY,
         )
 
+    def get_count_versions(self):
+        return self.get_table_versions()
+
     def perform_create(self, serializer):
         title = self.get_title()
         serializer.save(
@@ -129,7 +418,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return context
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet для работы с комментариями.
 
@@ -144,28 +433,64 @@ class CommentViewSet(viewsets.ModelViewSet):
       частичное обновление комментария
     - DELETE /titles/{title_id}/reviews/{review_id}/comments/{comment_id}/ -
       удаление комментария
+
+    Параметр `?pagination=cursor` включает курсорную пагинацию списка.
     """
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = CommentPagination
+    # Таблицы, версии которых отслеживаются сигналами (для кэша COUNT(*)
+    # в админке); ETag строится по get_version_keys.
+    cache_tables = (
+        Comments._meta.db_table,
+        Review._meta.db_table,
+        User._meta.db_table,
+    )
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CommentListSerializer
+        return self.serializer_class
+
     def get_review(self):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs['review_id'],
-            title=title
-        )
+        """
+        Отзыв из URL, загруженный одним запросом один раз за запрос.
+        Отзыв к другому произведению приводит к 404.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id']
+            )
+        return self._review
 
     def get_queryset(self):
         review = self.get_review()
         return (
             Comments.objects
             .filter(review=review)
-            .select_related('author', 'review')
-            .order_by('pub_date')
+            .select_related('author')
+            .order_by('pub_date', 'id')
         )
 
+    def get_version_keys(self):
+        """
+        Комментарии меняются вместе с версией своего отзыва; версия
+        произведения меняется при удалении или правке отзыва.
+        """
+        return (
+            row_key(Title, self.kwargs['title_id']),
+            row_key(Review, self.kwargs['review_id']),
+            bulk_key(Review),
+            bulk_key(Comments),
+            AUTHOR_NAMES_KEY,
+        )
+
+    def get_count_versions(self):
+        return self.get_table_versions()
+
     def perform_create(self, serializer):
         review = self.get_review()
         serializer.save(
@@ -177,3 +502,32 @@ class CommentViewSet(viewsets.ModelViewSet):
         context = super().get_serializer_context()
         context['review'] = self.get_review()
         return context
+
+
+class SearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Базовый ViewSet полнотекстового поиска по параметру `q`.
+
+    Результаты упорядочены по релевантности.
+    """
+    permission_classes = (permissions.AllowAny,)
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '')
+        if not query.strip():
+            raise ValidationError({'q': ['Обязательный параметр.']})
+        return get_search_backend().search(
+            self.queryset.select_related('author'), query
+        )
+
+
+class ReviewSearchViewSet(SearchViewSet):
+    """GET /search/reviews/?q= - поиск по тексту отзывов."""
+    queryset = Review.objects.all()
+    serializer_class = ReviewSerializer
+
+
+class CommentSearchViewSet(SearchViewSet):
+    """GET /search/comments/?q= - поиск по тексту комментариев."""
+    queryset = Comments.objects.all()
+    serializer_class = CommentSerializer
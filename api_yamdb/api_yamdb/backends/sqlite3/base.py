@@ -0,0 +1,47 @@
+from django.db.backends.sqlite3 import base
+
+# Значения по умолчанию; переопределяются ключом PRAGMAS в DATABASES.
+DEFAULT_PRAGMAS = {
+    # Читатели не блокируют писателя и наоборот.
+    'journal_mode': 'WAL',
+    # В режиме WAL fsync только при контрольной точке.
+    'synchronous': 'NORMAL',
+    # Ожидание блокировки вместо немедленной ошибки "database is locked".
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настройкой соединения через PRAGMA и транзакциями
+    BEGIN IMMEDIATE.
+
+    Транзакция сразу берёт блокировку записи, поэтому параллельные
+    писатели ждут её в busy_timeout, а не получают ошибку при попытке
+    повысить блокировку чтения до блокировки записи.
+    """
+
+    def get_pragmas(self):
+        return {**DEFAULT_PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.get_pragmas().items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    @property
+    def transaction_mode(self):
+        return self.settings_dict.get('TRANSACTION_MODE', 'IMMEDIATE')
+
+    @property
+    def write_lock_on_begin(self):
+        """
+        Транзакция берёт блокировку записи в BEGIN, поэтому прочитанные в
+        ней данные не изменятся другими писателями до её конца.
+        """
+        return self.transaction_mode.upper() in ('IMMEDIATE', 'EXCLUSIVE')
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}'.strip())
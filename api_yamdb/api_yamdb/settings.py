@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -18,6 +19,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
+    'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
@@ -28,10 +30,20 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
+    # orjson, если установлен; иначе стандартный json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # JWT Settings
@@ -45,9 +57,17 @@ DEFAULT_FROM_EMAIL = 'admin@yamdb.com'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Очередь исходящих писем (команда send_emails)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # секунды, удваивается с каждой попыткой
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+# Сколько секунд письма, забранные воркером, недоступны другим воркерам
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 10 * 60
+
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,13 +98,61 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# База данных задаётся переменными окружения. По умолчанию — SQLite в режиме
+# WAL (api_yamdb.backends.sqlite3); для PostgreSQL с пулом соединений:
+# DB_ENGINE=api_yamdb.backends.postgresql_pool (нужен psycopg2).
+DB_ENGINE = os.getenv('DB_ENGINE', 'api_yamdb.backends.sqlite3')
+DB_POOLED = DB_ENGINE == 'api_yamdb.backends.postgresql_pool'
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        # Время жизни постоянного соединения, секунды; 0 — закрывать после
+        # каждого запроса. С postgresql_pool по умолчанию 0: закрытие
+        # возвращает соединение в пул, иначе его держит каждый поток.
+        'CONN_MAX_AGE': int(
+            os.getenv('DB_CONN_MAX_AGE', 0 if DB_POOLED else 60)
+        ),
+        # Используется api_yamdb.backends.postgresql_pool; TIMEOUT —
+        # сколько секунд ждать свободное соединение.
+        'POOL': {
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        },
     }
 }
 
+# Кэш списков API. Версии таблиц для ключей хранятся в базе (TableVersion),
+# поэтому запись из любого процесса сбрасывает кэш во всех; общий бэкенд
+# (Redis, Memcached) избавляет процессы только от своих копий ответов.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api_yamdb'),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+
+# Время жизни пользователя в кэше JWT-аутентификации, секунды; 0 —
+# не кэшировать. Пользователь сбрасывается из кэша только в процессе,
+# который его изменил, поэтому кэш нужен общий (Redis, Memcached):
+# с locmem проверка users.E001 не даёт запустить проект.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 0))
+
+# Байесовский рейтинг: априорная средняя оценка и её вес в отзывах
+RANKING_PRIOR_MEAN = 5.5
+RANKING_PRIOR_WEIGHT = 10
+# Период полураспада вклада отзыва в рейтинг «в тренде»
+TRENDING_HALF_LIFE = timedelta(days=7)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,3 +183,19 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -0,0 +1,90 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+from core.paginator import CachedCountPaginator
+
+# Верхняя граница диапазона для поиска по префиксу: больше любой строки
+# с этим префиксом.
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+class LargeTableAdminMixin:
+    """
+    Список объектов в админке, который не просматривает таблицу целиком.
+
+    Число строк без фильтров берётся из оценки СУБД, если она не меньше
+    count_estimate_threshold; с фильтрами считается COUNT(*), который
+    кэшируется до изменения таблиц. Полное число строк рядом с результатом
+    фильтрации не запрашивается.
+
+    Поиск выполняется только по индексам, префикс поля в search_fields
+    задаёт способ:
+    - '@поле' — полнотекстовый поиск: ключи найденных объектов
+      возвращает get_search_keys, который задаёт приложение с индексом;
+    - '=поле' — точное совпадение с учётом регистра;
+    - '^поле' — начало строки с учётом регистра, диапазоном по индексу.
+    Поля связанных моделей ищутся подзапросом ключей, поэтому каждое
+    условие проверяется по индексу своей таблицы.
+    """
+    show_full_result_count = False
+    count_estimate_threshold = 100000
+    count_cache_timeout = 60 * 5
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return CachedCountPaginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_timeout=self.count_cache_timeout,
+            estimate_threshold=self.count_estimate_threshold
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q()
+        for field in self.get_search_fields(request):
+            condition |= self.get_search_condition(
+                queryset, field, search_term
+            )
+        return queryset.filter(condition), False
+
+    def get_search_keys(self, model, search_term, using):
+        """Подзапрос ключей объектов model, найденных по search_term."""
+        raise ImproperlyConfigured(
+            f'{type(self).__name__}: для полей с префиксом '
+            "'@' переопределите get_search_keys."
+        )
+
+    def get_search_condition(self, queryset, field, search_term):
+        prefix, path = field[0], field[1:]
+        *relations, name = path.split(LOOKUP_SEP)
+        model = queryset.model
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        if prefix == '@':
+            keys = self.get_search_keys(model, search_term, queryset.db)
+            lookup = LOOKUP_SEP.join(relations) or 'pk'
+            return Q(**{f'{lookup}__in': keys})
+        if prefix == '=':
+            condition = {name: search_term}
+        elif prefix == '^':
+            condition = {
+                f'{name}__gte': search_term,
+                f'{name}__lt': search_term + PREFIX_UPPER_BOUND,
+            }
+        else:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__}.search_fields: поле {field} '
+                "должно начинаться с '@', '=' или '^'."
+            )
+        if not relations:
+            return Q(**condition)
+        keys = model._default_manager.using(queryset.db).filter(**condition)
+        return Q(**{
+            f'{LOOKUP_SEP.join(relations)}__in': keys.order_by().values('pk')
+        })
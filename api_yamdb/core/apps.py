@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+    verbose_name = 'Общие данные'
+
+    def ready(self):
+        import core.signals  # noqa: F401
@@ -0,0 +1,211 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import TableVersion
+
+CACHE_PREFIX = 'api'
+# Таблицы, версии которых увеличиваются сигналами записи моделей
+# (core.signals.watch_models). COUNT(*) по другим таблицам не кэшируется.
+WATCHED_TABLES = set()
+# Базы, где версии увеличиваются одним INSERT ... ON CONFLICT.
+UPSERT_VENDORS = {'sqlite', 'postgresql'}
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _read_table_versions(tables):
+    versions = {
+        table: (version, int(modified.timestamp()))
+        for table, version, modified in TableVersion.objects.filter(
+            table__in=tables
+        ).values_list('table', 'version', 'modified')
+    }
+    missing = tables - versions.keys()
+    # Строки версий ресурсов создаются первой записью: до неё ресурс не
+    # менялся, и его версия нулевая.
+    versions.update(
+        (key, (0, 0)) for key in missing if isinstance(key, RowKey)
+    )
+    missing -= versions.keys()
+    if missing:
+        _create_table_versions(missing, timezone.now())
+        versions.update(_read_table_versions(missing))
+    return versions
+
+
+def _create_table_versions(tables, modified):
+    # Новая версия начинается с текущего времени, а не с нуля: после
+    # очистки таблицы версий ключи не совпадут с ключами старых данных.
+    version = time.time_ns()
+    TableVersion.objects.bulk_create(
+        [
+            TableVersion(table=table, version=version, modified=modified)
+            for table in tables
+        ],
+        ignore_conflicts=True
+    )
+
+
+def get_table_versions(tables, known=None):
+    """
+    Возвращает версии таблиц: {таблица: (номер версии, время изменения в
+    секундах)}. Версии читаются из базы одним запросом, поэтому изменения
+    из других процессов видны сразу; уже прочитанные в этом запросе
+    версии передаются в known. Для таблицы, которая ещё не менялась,
+    создаётся строка с текущим временем.
+    """
+    tables = set(tables)
+    known = known or {}
+    # Прочитанную версию могут положить в ключ кэша, поэтому следующая
+    # запись в той же транзакции должна снова её увеличить.
+    for changed in _changed_tables(transaction.get_connection()):
+        changed.clear()
+    versions = {table: known[table] for table in tables & known.keys()}
+    if len(versions) < len(tables):
+        versions.update(_read_table_versions(tables - versions.keys()))
+    return versions
+
+
+def bump_table_versions(*tables):
+    """
+    Отмечает таблицы изменёнными, делая устаревшими зависящие ключи.
+    Вызывается в транзакции записи, поэтому новая версия становится видна
+    вместе с изменёнными данными.
+    """
+    if not tables:
+        return
+    tables = set(tables)
+    modified = timezone.now()
+    connection = transaction.get_connection()
+    if connection.vendor in UPSERT_VENDORS:
+        _upsert_table_versions(connection, tables, modified)
+        return
+    versions = TableVersion.objects.filter(table__in=tables)
+    changes = {'version': F('version') + 1, 'modified': modified}
+    if versions.update(**changes) < len(tables):
+        # Строку могли создать между UPDATE и INSERT, поэтому после
+        # создания недостающих строк версии увеличиваются ещё раз.
+        _create_table_versions(tables, modified)
+        versions.update(**changes)
+
+
+def _upsert_table_versions(connection, tables, modified):
+    # Одна вставка с ON CONFLICT создаёт строки ещё не менявшихся
+    # ресурсов и увеличивает версии остальных.
+    quote = connection.ops.quote_name
+    db_table = quote(TableVersion._meta.db_table)
+    version = time.time_ns()
+    modified = connection.ops.adapt_datetimefield_value(modified)
+    sql = (
+        f'INSERT INTO {db_table} '
+        f'({quote("table")}, {quote("version")}, {quote("modified")}) '
+        f'VALUES {", ".join(["(%s, %s, %s)"] * len(tables))} '
+        f'ON CONFLICT ({quote("table")}) DO UPDATE SET '
+        f'{quote("version")} = {db_table}.{quote("version")} + 1, '
+        f'{quote("modified")} = EXCLUDED.{quote("modified")}'
+    )
+    params = [
+        value for table in sorted(tables)
+        for value in (table, version, modified)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+class ChangedTables(set):
+    """
+    Таблицы, версии которых уже увеличены в текущей транзакции или точке
+    сохранения. Регистрируется колбэком on_commit: при откате Django
+    удаляет его вместе с колбэками отменённой точки сохранения, и
+    следующая запись снова увеличивает версию.
+    """
+
+    def __init__(self, savepoint_ids):
+        super().__init__()
+        self.savepoint_ids = set(savepoint_ids)
+
+    def __call__(self):
+        """После фиксации отметки больше не нужны."""
+
+
+def _changed_tables(connection):
+    return [
+        callback[1] for callback in connection.run_on_commit
+        if isinstance(callback[1], ChangedTables)
+    ]
+
+
+def mark_tables_changed(*tables):
+    """
+    Увеличивает версии изменённых таблиц. В транзакции версия таблицы
+    увеличивается один раз, пока её не прочитали, поэтому каскадное
+    удаление сотни строк стоит одного UPDATE на таблицу; вне транзакции
+    версии увеличиваются сразу.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        bump_table_versions(*tables)
+        return
+    changed = _changed_tables(connection)
+    tables = set(tables).difference(*changed)
+    if not tables:
+        return
+    savepoint_ids = set(connection.savepoint_ids)
+    current = next(
+        (item for item in changed if item.savepoint_ids == savepoint_ids),
+        None
+    )
+    if current is None:
+        current = ChangedTables(savepoint_ids)
+        transaction.on_commit(current)
+    bump_table_versions(*tables)
+    current.update(tables)
+
+
+class RowKey(str):
+    """
+    Ключ версии одного ресурса. Такой ключ всегда читается вместе с
+    bulk_key его таблицы, поэтому отсутствующая строка версии
+    читается как нулевая, без вставки.
+    """
+
+
+def row_key(model, pk):
+    """
+    Ключ версии одного ресурса — строки model с ключом pk вместе с
+    зависящими от неё строками других таблиц.
+    """
+    return RowKey(f'{model._meta.db_table}:{pk}')
+
+
+def bulk_key(model):
+    """
+    Ключ версии, которую увеличивают массовые изменения model в обход
+    сигналов; входит в ключи ресурсов вместе с row_key.
+    """
+    return f'{model._meta.db_table}:*'
+
+
+def invalidate_models(*models):
+    """Сбрасывает кэш для моделей, изменённых в обход сигналов."""
+    tables = set()
+    for model in models:
+        tables.update((model._meta.db_table, bulk_key(model)))
+        for field in model._meta.local_many_to_many:
+            tables.add(field.remote_field.through._meta.db_table)
+    bump_table_versions(*tables)
+
+
+def make_key(*parts):
+    digest = hashlib.md5(
+        ':'.join(map(str, parts)).encode('utf-8')
+    ).hexdigest()
+    return f'{CACHE_PREFIX}:{digest}'
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class TableVersion(models.Model):
+    """
+    Версия таблицы для ключей кэша API и заголовков ETag и Last-Modified.
+    Хранится в базе, чтобы запись из любого процесса — другого воркера,
+    админки или import_csv — была видна всем процессам сервера.
+    """
+    table = models.CharField(
+        max_length=128,
+        primary_key=True,
+        verbose_name='Таблица'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия'
+    )
+    modified = models.DateTimeField(verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Версия таблицы'
+        verbose_name_plural = 'Версии таблиц'
+
+    def __str__(self):
+        return f'{self.table}: {self.version}'
@@ -0,0 +1,87 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from core.cache import (WATCHED_TABLES, get_cache, get_table_versions,
+                        make_key)
+
+
+def get_queryset_tables(queryset):
+    """Таблицы, от которых зависит результат запроса."""
+    query = queryset.query
+    tables = {query.get_meta().db_table, *query.extra_tables}
+    tables.update(join.table_name for join in query.alias_map.values())
+    return sorted(tables)
+
+
+def estimate_count(queryset):
+    """
+    Быстрая оценка числа строк таблицы без условий: статистика
+    планировщика в PostgreSQL и максимальный rowid в SQLite.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}'
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который кэширует COUNT(*) до изменения таблиц запроса.
+    Если версии какой-то из таблиц не отслеживаются сигналами
+    (WATCHED_TABLES), COUNT(*) выполняется каждый раз. count_versions
+    заменяет версии таблиц, когда число строк зависит от более узких
+    версий, например версии одного ресурса.
+
+    Для запросов без условий при estimate_threshold берётся оценка
+    количества строк, если она не меньше порога.
+    """
+
+    def __init__(self, object_list, per_page, count_timeout=None,
+                 estimate_threshold=None, table_versions=None,
+                 count_versions=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_timeout = count_timeout
+        self.estimate_threshold = estimate_threshold
+        self.table_versions = table_versions
+        self.count_versions = count_versions
+
+    def get_uncached_count(self):
+        queryset = self.object_list
+        if self.estimate_threshold is not None and not queryset.query.where:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+    @cached_property
+    def count(self):
+        if not self.count_timeout:
+            return self.get_uncached_count()
+        queryset = self.object_list
+        sql, params = queryset.query.sql_with_params()
+        versions = self.count_versions
+        if versions is None:
+            tables = get_queryset_tables(queryset)
+            if not WATCHED_TABLES.issuperset(tables):
+                return self.get_uncached_count()
+            versions = get_table_versions(tables, self.table_versions)
+        key = make_key('count', sql, params, sorted(versions.items()))
+        cache = get_cache()
+        count = cache.get(key)
+        if count is None:
+            count = self.get_uncached_count()
+            cache.set(key, count, self.count_timeout)
+        return count
@@ -0,0 +1,70 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from core.cache import (WATCHED_TABLES, bulk_key, invalidate_models,
+                        mark_tables_changed, row_key)
+
+# Ключи версий ресурсов, которые изменяет запись строки модели:
+# {модель: функция(instance) -> ключи row_key и bulk_key}.
+ROW_KEYS = {}
+
+
+def invalidate_model_cache(sender, instance, **kwargs):
+    row_keys = ROW_KEYS.get(sender)
+    mark_tables_changed(
+        sender._meta.db_table, *(row_keys(instance) if row_keys else ())
+    )
+
+
+def invalidate_m2m_cache(sender, instance, action, reverse, model, pk_set,
+                         **kwargs):
+    """
+    Изменение связей ManyToManyField меняет и ресурсы владельца поля,
+    если для его модели ведутся версии ресурсов.
+    """
+    if not action.startswith('post_'):
+        return
+    owner = model if reverse else type(instance)
+    keys = []
+    if owner in ROW_KEYS:
+        if not reverse:
+            keys.append(row_key(owner, instance.pk))
+        elif pk_set is None:
+            # clear() с обратной стороны не сообщает затронутые ключи.
+            keys.append(bulk_key(owner))
+        else:
+            keys.extend(row_key(owner, pk) for pk in pk_set)
+    mark_tables_changed(sender._meta.db_table, *keys)
+
+
+def watch_models(*models, row_keys=None):
+    """
+    Подключает увеличение версий таблиц к записи перечисленных моделей.
+    Обработчики подключаются только к ним: модели без обработчиков
+    удаления Django удаляет каскадом одним DELETE, не загружая строк.
+
+    row_keys — {модель: функция(instance)}, возвращающая ключи версий
+    ресурсов, которые изменяет запись строки, вместе с версией таблицы.
+    """
+    row_keys = row_keys or {}
+    ROW_KEYS.update(row_keys)
+    for model in dict.fromkeys((*models, *row_keys)):
+        uid = f'core.watch_models:{model._meta.label}'
+        post_save.connect(
+            invalidate_model_cache, sender=model, dispatch_uid=uid
+        )
+        post_delete.connect(
+            invalidate_model_cache, sender=model, dispatch_uid=uid
+        )
+        # Для промежуточной модели ManyToManyField.
+        m2m_changed.connect(
+            invalidate_m2m_cache, sender=model, dispatch_uid=uid
+        )
+        WATCHED_TABLES.add(model._meta.db_table)
+
+
+@receiver(post_migrate)
+def invalidate_app_cache(sender, **kwargs):
+    """Миграции и flush меняют таблицы без сигналов моделей."""
+    invalidate_models(*sender.get_models())
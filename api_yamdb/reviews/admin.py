@@ -1,7 +1,33 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdminMixin
 from reviews.constants import TEXT_RESTRICTION
-from reviews.models import Category, Comments, Genre, GenreTitle, Review, Title
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title, TitleStats)
+from reviews.search import get_search_backend
+
+
+class ReviewsTableAdminMixin(LargeTableAdminMixin):
+    """Поля '@' в search_fields ищутся по индексу reviews.search."""
+
+    def get_search_keys(self, model, search_term, using):
+        return get_search_backend(using).search_keys(
+            model, search_term, using
+        )
+
+
+class ScoreListFilter(admin.SimpleListFilter):
+    """Фильтр по оценке без SELECT DISTINCT по всей таблице отзывов."""
+    title = 'оценка'
+    parameter_name = 'score'
+
+    def lookups(self, request, model_admin):
+        return [(str(score), score) for score in TitleStats.SCORES]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(score=self.value())
+        return queryset
 
 
 @admin.register(Category)
@@ -19,32 +45,49 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(ReviewsTableAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'year', 'category')
-    search_fields = ('name',)
+    list_select_related = ('category',)
+    search_fields = ('^name', '@name')
     list_filter = ('year', 'category')
+    autocomplete_fields = ('category',)
+    readonly_fields = ('rating_sum', 'rating_count')
 
 
 @admin.register(GenreTitle)
-class GenreTitleAdmin(admin.ModelAdmin):
+class GenreTitleAdmin(ReviewsTableAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'genre')
+    list_select_related = ('title', 'genre')
     list_filter = ('genre',)
+    search_fields = ('^title__name',)
+    autocomplete_fields = ('title', 'genre')
 
 
 @admin.register(Review)
-class ReviewsAdmin(admin.ModelAdmin):
+class ReviewsAdmin(ReviewsTableAdminMixin, admin.ModelAdmin):
     list_display = ('title_id', 'author', 'score', 'pub_date')
-    list_filter = ('score', 'pub_date')
-    search_fields = ('text', 'author__username', 'title__name')
+    list_filter = (ScoreListFilter, 'pub_date')
+    search_fields = ('@text', '=author__username', '^title__name')
+    autocomplete_fields = ('title', 'author')
     readonly_fields = ('pub_date',)
+    # Сортировка по ключу читает страницу по первичному индексу.
+    ordering = ('-id',)
+
+    def get_queryset(self, request):
+        # Название отзыва содержит автора и произведение: без join их
+        # читает каждая строка автодополнения у комментариев.
+        return super().get_queryset(request).select_related('author', 'title')
 
 
 @admin.register(Comments)
-class CommentsAdmin(admin.ModelAdmin):
+class CommentsAdmin(ReviewsTableAdminMixin, admin.ModelAdmin):
     list_display = ('review_id', 'author', 'pub_date', 'short_text')
-    list_filter = ('pub_date', 'author')
-    search_fields = ('text', 'author__username', 'review__text')
+    list_select_related = ('author',)
+    list_filter = ('pub_date',)
+    search_fields = ('@text', '=author__username', '@review__text')
+    autocomplete_fields = ('review', 'author')
     readonly_fields = ('pub_date',)
+    ordering = ('-id',)
 
     def short_text(self, obj):
         if len(obj.text) > TEXT_RESTRICTION:
@@ -0,0 +1,396 @@
+"""
+Массовая запись в обход ORM и параллельная загрузка больших CSV-файлов
+для import_csv.
+
+Главный процесс читает файл блоками по границам записей и отдаёт их
+пулу процессов. Процессы разбирают CSV, проверяют значения полями модели
+и возвращают готовые для базы кортежи. Записывает один главный процесс:
+блоки вставляются по порядку через executemany, каждый в своей
+транзакции. На время загрузки вторичные индексы удаляются (drop_indexes,
+create_indexes), а проверка внешних ключей откладывается до конца.
+"""
+import csv
+import io
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+# Индексы, которые можно удалить и построить заново: без уникальных,
+# их нарушение при загрузке должно сразу давать ошибку.
+INDEX_SQL = {
+    'sqlite': (
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+        "AND tbl_name = %s AND sql IS NOT NULL "
+        "AND sql NOT LIKE 'CREATE UNIQUE%%'"
+    ),
+    'postgresql': (
+        'SELECT i.relname, pg_get_indexdef(ix.indexrelid) '
+        'FROM pg_index ix '
+        'JOIN pg_class i ON i.oid = ix.indexrelid '
+        'JOIN pg_class t ON t.oid = ix.indrelid '
+        'WHERE t.relname = %s AND NOT ix.indisunique '
+        'AND NOT ix.indisprimary'
+    ),
+}
+
+INTEGER_TYPES = {
+    'AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField',
+    'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField',
+    'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+}
+# Преобразователи строк CSV в процессе пула по модели и заголовку.
+_converters = {}
+
+
+def drop_indexes(models, using='default'):
+    """
+    Удаляет неуникальные индексы таблиц моделей и возвращает команды для
+    их создания: построить индекс по готовой таблице быстрее, чем обновлять
+    его на каждой вставке. Для СУБД без INDEX_SQL ничего не удаляет.
+    """
+    connection = connections[using]
+    sql = INDEX_SQL.get(connection.vendor)
+    if not sql:
+        return []
+    indexes = []
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(sql, [model._meta.db_table])
+            indexes.extend(cursor.fetchall())
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    return [create for _, create in indexes]
+
+
+def create_indexes(statements, using='default'):
+    with connections[using].cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def update_rows(model, fields, objs, using='default'):
+    """
+    Обновляет поля строк одним UPDATE по id через executemany: bulk_update
+    собирает CASE по каждой строке, и на тысячах строк построение запроса
+    обходится дороже самого обновления.
+    """
+    if not objs:
+        return
+    connection = connections[using]
+    ops = connection.ops
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        ops.quote_name(model._meta.db_table),
+        ', '.join(f'{ops.quote_name(field.column)} = %s' for field in fields),
+        ops.quote_name(model._meta.pk.column)
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            tuple(
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+                for field in fields
+            ) + (obj.pk,)
+            for obj in objs
+        ])
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Отключает auto_now_add у полей модели, чтобы сохранить даты из CSV.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def reset_sequences(models, using='default'):
+    """Сдвигает счётчики id после вставки строк с явными id."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def read_blocks(path, block_size):
+    """
+    Отдаёт заголовок CSV и блоки текста по block_size записей.
+
+    Запись заканчивается на переводе строки при чётном числе кавычек с её
+    начала, поэтому многострочные значения в кавычках не разрываются, а
+    главный процесс не разбирает CSV сам.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        header = tuple(next(csv.reader([file.readline()])))
+        lines = []
+        records = quotes = 0
+        for line in file:
+            lines.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            quotes = 0
+            records += 1
+            if records >= block_size:
+                yield header, ''.join(lines), records
+                lines = []
+                records = 0
+        if lines:
+            yield header, ''.join(lines), records
+
+
+def integer_parser(field):
+    def parse(raw):
+        try:
+            return int(raw)
+        except ValueError:
+            raise ValidationError(
+                f'{field.name}: «{raw}» не целое число'
+            ) from None
+    return parse
+
+
+def datetime_parser(field):
+    def parse(raw):
+        try:
+            value = datetime.fromisoformat(raw)
+        except ValueError:
+            return field.to_python(raw)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+    return parse
+
+
+def checked_parser(field, parse):
+    """Добавляет к разбору пустое значение null-поля и валидаторы поля."""
+    validators = field.validators
+    null = field.null
+
+    def to_python(raw):
+        if null and raw == '':
+            return None
+        value = parse(raw)
+        for validator in validators:
+            validator(value)
+        return value
+    return to_python
+
+
+class RowConverter:
+    """
+    Превращает запись CSV в значения полей модели: parse — преобразование
+    и валидаторы поля, convert — ещё и подготовка значения для вставки в
+    базу. Колонки CSV называются как поля модели или их attname (author,
+    title_id). При вставке поля, которых нет в CSV, получают значение по
+    умолчанию.
+
+    Целые числа и даты разбираются напрямую, остальные поля — через
+    to_python и get_db_prep_save: на миллионах строк цепочка методов поля
+    обходится дороже самого разбора CSV.
+    """
+
+    def __init__(self, model, header, using='default'):
+        self.model = model
+        self.connection = connections[using]
+        self.fields = [model._meta.get_field(name) for name in header]
+        self.parsers, self.preparers = zip(
+            *(self.get_converter(field) for field in self.fields)
+        )
+
+    @cached_property
+    def missing(self):
+        return [
+            field for field in self.model._meta.concrete_fields
+            if field not in self.fields and not field.primary_key
+        ]
+
+    @cached_property
+    def defaults(self):
+        now = timezone.now()
+        defaults = []
+        for field in self.missing:
+            if getattr(field, 'auto_now_add', False):
+                value = now
+            elif field.has_default() or field.null:
+                value = field.get_default()
+            else:
+                raise ValueError(
+                    f'В CSV нет обязательной колонки {field.name}'
+                )
+            defaults.append(field.get_db_prep_save(value, self.connection))
+        return tuple(defaults)
+
+    def insert_sql(self):
+        ops = self.connection.ops
+        columns = [field.column for field in self.fields + self.missing]
+        return 'INSERT INTO {} ({}) VALUES ({})'.format(
+            ops.quote_name(self.model._meta.db_table),
+            ', '.join(ops.quote_name(column) for column in columns),
+            ', '.join(['%s'] * len(columns))
+        )
+
+    def get_converter(self, field):
+        target = field.target_field if field.is_relation else field
+        internal_type = target.get_internal_type()
+        if internal_type in INTEGER_TYPES:
+            parse, prepare = integer_parser(field), None
+        elif internal_type == 'DateTimeField':
+            parse = datetime_parser(field)
+            prepare = self.connection.ops.adapt_datetimefield_value
+        else:
+            parse = field.to_python
+
+            def prepare(value):
+                return field.get_db_prep_save(value, self.connection)
+        return checked_parser(field, parse), prepare
+
+    def parse(self, record):
+        return tuple(
+            parse(raw) for parse, raw in zip(self.parsers, record)
+        )
+
+    def convert(self, record):
+        return tuple(
+            prepare(value) if prepare else value
+            for prepare, value in zip(self.preparers, self.parse(record))
+        ) + self.defaults
+
+
+def setup_worker():
+    """При запуске процессов через spawn Django ещё не настроен."""
+    if not apps.ready:
+        django.setup()
+
+
+def convert_block(task):
+    """
+    Разбирает блок CSV в процессе пула. Возвращает кортежи для вставки и
+    процессорное время разбора. Ошибки передаются как ValueError с номером
+    записи.
+    """
+    model_label, using, header, text, first_record = task
+    started = time.process_time()
+    key = (model_label, using, header)
+    if key not in _converters:
+        _converters[key] = RowConverter(
+            apps.get_model(model_label), header, using
+        )
+    converter = _converters[key]
+    rows = []
+    for number, record in enumerate(
+        csv.reader(io.StringIO(text, newline='')), first_record
+    ):
+        if not record:
+            continue
+        if len(record) != len(header):
+            raise ValueError(
+                f'запись {number}: ожидалось {len(header)} колонок, '
+                f'получено {len(record)}'
+            )
+        try:
+            rows.append(converter.convert(record))
+        except ValidationError as error:
+            raise ValueError(
+                f'запись {number}: {"; ".join(error.messages)}'
+            ) from None
+    return rows, time.process_time() - started
+
+
+class StageTimer:
+    """Время и число строк по этапам загрузки."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.rows = {}
+
+    def add(self, stage, seconds, rows=0):
+        self.seconds[stage] = self.seconds.get(stage, 0) + seconds
+        self.rows[stage] = self.rows.get(stage, 0) + rows
+
+    @contextmanager
+    def measure(self, stage, rows=0):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started, rows)
+
+    def report(self):
+        for stage, seconds in self.seconds.items():
+            rows = self.rows[stage]
+            if rows:
+                yield (
+                    f'{stage}: {rows} строк за {seconds:.2f} с, '
+                    f'{rows / max(seconds, 1e-9):.0f} строк/с'
+                )
+            else:
+                yield f'{stage}: {seconds:.2f} с'
+
+
+def load_file(path, model, pool, workers, block_size, timer,
+              using='default', on_block=None):
+    """
+    Загружает файл: чтение блоков, разбор в пуле из workers процессов,
+    запись по порядку. В работе не больше двух блоков на процесс, поэтому
+    память не зависит от размера файла. Возвращает число загруженных строк.
+    """
+    connection = connections[using]
+    in_flight = deque()
+    inserts = {}
+    total = 0
+
+    def write():
+        nonlocal total
+        header, result = in_flight.popleft()
+        rows, seconds = result.get()
+        timer.add('Разбор (время процессов)', seconds, len(rows))
+        if not rows:
+            return
+        if header not in inserts:
+            inserts[header] = RowConverter(model, header, using).insert_sql()
+        with timer.measure('Запись', len(rows)):
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    cursor.executemany(inserts[header], rows)
+        total += len(rows)
+        if on_block:
+            on_block(total)
+
+    blocks = read_blocks(path, block_size)
+    record = 1
+    while True:
+        started = time.perf_counter()
+        block = next(blocks, None)
+        if block is None:
+            break
+        header, text, records = block
+        timer.add('Чтение', time.perf_counter() - started, records)
+        in_flight.append((header, pool.apply_async(
+            convert_block,
+            ((model._meta.label, using, header, text, record),)
+        )))
+        record += records
+        if len(in_flight) >= 2 * workers:
+            write()
+    while in_flight:
+        write()
+    return total
@@ -0,0 +1,58 @@
+"""
+Формат CSV-файлов static/data: порядок загрузки, колонки и построение
+объектов моделей из строк. Общий для import_csv, export_data и генератора
+синтетических данных.
+"""
+from django.contrib.auth.hashers import make_password
+
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title)
+from users.models import User
+
+
+def user_from_row(row):
+    return User(**row, password=make_password(None))
+
+
+def title_from_row(row):
+    category_id = row.pop('category') or None
+    return Title(**row, category_id=category_id)
+
+
+def review_from_row(row):
+    author_id = row.pop('author')
+    return Review(**row, author_id=author_id)
+
+
+def comment_from_row(row):
+    author_id = row.pop('author')
+    return Comments(**row, author_id=author_id)
+
+
+# Файлы перечислены в порядке зависимостей по внешним ключам.
+IMPORT_FILES = (
+    ('users.csv', User, user_from_row, 'Пользователи'),
+    ('category.csv', Category, lambda row: Category(**row), 'Категории'),
+    ('genre.csv', Genre, lambda row: Genre(**row), 'Жанры'),
+    ('titles.csv', Title, title_from_row, 'Произведения'),
+    (
+        'genre_title.csv',
+        GenreTitle,
+        lambda row: GenreTitle(**row),
+        'Связи жанров и произведений'
+    ),
+    ('review.csv', Review, review_from_row, 'Отзывы'),
+    ('comments.csv', Comments, comment_from_row, 'Комментарии'),
+)
+# Колонки CSV в формате static/data.
+COLUMNS = {
+    'users.csv': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
@@ -0,0 +1,110 @@
+"""
+Потоковая выгрузка таблиц в формате CSV-файлов static/data и в NDJSON.
+
+Строки читаются из базы iterator(chunk_size) — на PostgreSQL это
+серверный курсор, — и отдаются блоками байтов по chunk_size строк,
+поэтому память не зависит от размера таблицы. Заголовок CSV отдаётся до
+первого запроса к базе.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+
+from reviews.csv_layout import COLUMNS, IMPORT_FILES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+EXPORT_CHUNK_SIZE = 2000
+# Таблица выгрузки — имя CSV-файла без расширения: review, titles, ...
+EXPORT_TABLES = {
+    filename.rsplit('.', 1)[0]: (model, COLUMNS[filename])
+    for filename, model, _, _ in IMPORT_FILES
+}
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def format_datetime(value):
+    """
+    ISO 8601 в UTC, как в static/data: миллисекунды, если их достаточно
+    для точного значения, иначе микросекунды.
+    """
+    timespec = 'milliseconds' if value.microsecond % 1000 == 0 else 'auto'
+    return value.isoformat(timespec=timespec).replace('+00:00', 'Z')
+
+
+def dumps(row):
+    if orjson is not None:
+        return orjson.dumps(row)
+    return json.dumps(
+        row, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class TableExport:
+    """
+    Итератор по байтам выгрузки таблицы name в формате fmt. В rows
+    считаются уже выгруженные строки.
+    """
+
+    def __init__(self, name, fmt='csv', chunk_size=EXPORT_CHUNK_SIZE,
+                 using='default'):
+        if name not in EXPORT_TABLES:
+            raise ValueError(f'Неизвестная таблица {name}')
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Неизвестный формат {fmt}')
+        self.model, self.columns = EXPORT_TABLES[name]
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.using = using
+        self.rows = 0
+
+    def __iter__(self):
+        if self.fmt == 'csv':
+            yield self.encode_csv([self.columns])
+        fields = [self.model._meta.get_field(name) for name in self.columns]
+        dates = [
+            index for index, field in enumerate(fields)
+            if field.get_internal_type() == 'DateTimeField'
+        ]
+        rows = (
+            self.model.objects.using(self.using)
+            .order_by('pk')
+            .values_list(*(field.attname for field in fields))
+            .iterator(chunk_size=self.chunk_size)
+        )
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            if dates:
+                chunk = [self.format_dates(row, dates) for row in chunk]
+            self.rows += len(chunk)
+            if self.fmt == 'csv':
+                yield self.encode_csv(chunk)
+            else:
+                yield b''.join(
+                    dumps(dict(zip(self.columns, row))) + b'\n'
+                    for row in chunk
+                )
+
+    @staticmethod
+    def format_dates(row, dates):
+        row = list(row)
+        for index in dates:
+            if isinstance(row[index], datetime):
+                row[index] = format_datetime(row[index])
+        return row
+
+    @staticmethod
+    def encode_csv(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue().encode('utf-8')
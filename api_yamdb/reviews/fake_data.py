@@ -0,0 +1,382 @@
+"""
+Детерминированный генератор синтетических данных для нагрузочных замеров.
+
+Строки отдаются в формате CSV-файлов команды import_csv: те же имена
+файлов, колонки и явные id. Их можно записать в CSV (CSVWriter) или сразу
+в базу пачками (DatabaseWriter). Генератор не держит в памяти
+отзывы и комментарии: в памяти только веса и счётчики по произведениям и
+пользователям.
+"""
+import csv
+import itertools
+import math
+import os
+import random
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils.text import slugify
+
+from reviews.bulk_import import keep_auto_now_add
+from reviews.csv_layout import COLUMNS, IMPORT_FILES
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка',
+    'актёр', 'режиссёр', 'сцена', 'диалог', 'история', 'смысл', 'время',
+    'отличный', 'скучный', 'сильный', 'неожиданный', 'затянутый', 'яркий',
+    'глубокий', 'простой', 'красивый', 'странный', 'честный', 'лучший',
+    'очень', 'совсем', 'снова', 'почти', 'всегда', 'никогда', 'правда',
+    'понравился', 'удивил', 'разочаровал', 'советую', 'пересмотрю',
+    'прочитал', 'смотрел', 'ждал', 'понял', 'запомнил', 'и', 'но', 'а',
+)
+# Тексты собираются из двух фраз пула: 4096 фраз дают 16 млн вариантов
+# без подбора слов для каждой строки.
+PHRASE_POOL_BITS = 12
+# Доли произведений с одним, двумя и тремя жанрами.
+GENRES_PER_TITLE = (1, 2, 3)
+GENRES_PER_TITLE_WEIGHTS = (0.5, 0.35, 0.15)
+# Распределение оценок: высокие оценки ставят чаще.
+SCORE_WEIGHTS = tuple(itertools.accumulate((1, 1, 2, 3, 5, 8, 12, 15, 12, 8)))
+ROLE_WEIGHTS = (('user', 0.98), ('moderator', 0.015), ('admin', 0.005))
+# Отзывы и комментарии датируются последними REVIEWS_PERIOD до DATE_UNTIL.
+DATE_UNTIL = datetime(2024, 1, 1, tzinfo=timezone.utc)
+REVIEWS_PERIOD = timedelta(days=3 * 365)
+COMMENTS_DELAY = timedelta(days=30)
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса рангов 1..count по закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def zipf_counts(total, count, exponent, limit):
+    """
+    Раскладывает total по count рангам пропорционально 1 / rank**exponent,
+    не больше limit на ранг. Излишек над limit переходит следующим рангам.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, count + 1)]
+    remaining_weight = sum(weights)
+    remaining = total
+    counts = []
+    for weight in weights:
+        share = min(limit, remaining, round(
+            remaining * weight / remaining_weight
+        ) if remaining_weight else 0)
+        counts.append(share)
+        remaining -= share
+        remaining_weight -= weight
+    return counts
+
+
+def first_free_ids():
+    """Первый свободный id каждого файла для дозаписи в базу."""
+    return {
+        filename: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        for filename, model, _, _ in IMPORT_FILES
+    }
+
+
+def format_date(value):
+    return value.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class FakeDataGenerator:
+    """
+    Синтетический набор данных, одинаковый при одинаковых параметрах и seed.
+
+    - число отзывов на произведение распределено по Ципфу с показателем
+      title_skew: немногие популярные произведения собирают большую часть
+      отзывов;
+    - активность пользователей распределена по Ципфу с показателем
+      user_skew, один пользователь пишет не больше одного отзыва на
+      произведение;
+    - у произведения от одного до трёх жанров, популярные жанры и категории
+      встречаются чаще;
+    - число комментариев к отзыву распределено геометрически со средним
+      comments_per_review: у большинства отзывов их нет или мало.
+
+    first_ids задаёт первый id для файлов, например при дозаписи в
+    непустую базу; по умолчанию id начинаются с 1.
+    """
+
+    def __init__(self, users, titles, reviews, genres=20, categories=5,
+                 comments_per_review=1.0, title_skew=1.1, user_skew=1.0,
+                 seed=0, first_ids=None):
+        self.users = users
+        self.titles = titles
+        self.reviews = reviews
+        self.genres = genres
+        self.categories = categories
+        self.comments_per_review = comments_per_review
+        self.title_skew = title_skew
+        self.user_skew = user_skew
+        self.seed = seed
+        self.first_ids = {filename: 1 for filename in COLUMNS}
+        self.first_ids.update(first_ids or {})
+
+    def rows(self):
+        """Пары (имя файла, строка) в порядке зависимостей по ключам."""
+        rnd = random.Random(self.seed)
+        self.phrases = [
+            ' '.join(rnd.choices(WORDS, k=rnd.randint(2, 12)))
+            for _ in range(2 ** PHRASE_POOL_BITS)
+        ]
+        yield from self.user_rows(rnd)
+        yield from self.named_rows('category.csv', 'Категория',
+                                   self.categories)
+        yield from self.named_rows('genre.csv', 'Жанр', self.genres)
+        yield from self.title_rows(rnd)
+        yield from self.review_rows(rnd)
+
+    def ids(self, filename, count):
+        first = self.first_ids[filename]
+        return range(first, first + count)
+
+    def user_rows(self, rnd):
+        roles, weights = zip(*ROLE_WEIGHTS)
+        for user_id in self.ids('users.csv', self.users):
+            yield 'users.csv', {
+                'id': user_id,
+                'username': f'user{user_id}',
+                'email': f'user{user_id}@yamdb.fake',
+                'role': rnd.choices(roles, weights)[0],
+                'bio': '',
+                'first_name': '',
+                'last_name': '',
+            }
+
+    def named_rows(self, filename, name, count):
+        for row_id in self.ids(filename, count):
+            yield filename, {
+                'id': row_id,
+                'name': f'{name} {row_id}',
+                'slug': slugify(f'{filename[:-4]}-{row_id}'),
+            }
+
+    def title_rows(self, rnd):
+        category_ids = self.ids('category.csv', self.categories)
+        genre_ids = self.ids('genre.csv', self.genres)
+        category_weights = zipf_weights(self.categories, 1)
+        genre_weights = zipf_weights(self.genres, 1)
+        genre_title_ids = itertools.count(self.first_ids['genre_title.csv'])
+        for title_id in self.ids('titles.csv', self.titles):
+            yield 'titles.csv', {
+                'id': title_id,
+                'name': self.phrases[
+                    rnd.getrandbits(PHRASE_POOL_BITS)
+                ][:50].capitalize(),
+                'year': max(1900, 2023 - int(rnd.expovariate(1 / 15))),
+                'category': (
+                    rnd.choices(category_ids, cum_weights=category_weights)[0]
+                    if category_ids else None
+                ),
+            }
+            if not genre_ids:
+                continue
+            count = min(len(genre_ids), rnd.choices(
+                GENRES_PER_TITLE, GENRES_PER_TITLE_WEIGHTS
+            )[0])
+            chosen = set()
+            while len(chosen) < count:
+                chosen.add(
+                    rnd.choices(genre_ids, cum_weights=genre_weights)[0]
+                )
+            for genre_id in sorted(chosen):
+                yield 'genre_title.csv', {
+                    'id': next(genre_title_ids),
+                    'title_id': title_id,
+                    'genre_id': genre_id,
+                }
+
+    def review_rows(self, rnd):
+        user_ids = self.ids('users.csv', self.users)
+        title_ids = list(self.ids('titles.csv', self.titles))
+        # Популярность не связана с порядком id.
+        rnd.shuffle(title_ids)
+        counts = zipf_counts(
+            self.reviews, len(title_ids), self.title_skew, len(user_ids)
+        )
+        user_weights = zipf_weights(len(user_ids), self.user_skew)
+        review_ids = itertools.count(self.first_ids['review.csv'])
+        comment_ids = itertools.count(self.first_ids['comments.csv'])
+        score_total = SCORE_WEIGHTS[-1]
+        # Вероятность «успеха» геометрического распределения числа
+        # комментариев со средним comments_per_review.
+        comment_p = 1 / (1 + self.comments_per_review)
+        for title_id, count in zip(title_ids, counts):
+            for author in self.review_authors(
+                rnd, user_ids, user_weights, count
+            ):
+                review_id = next(review_ids)
+                pub_date = DATE_UNTIL - REVIEWS_PERIOD * rnd.random()
+                yield 'review.csv', {
+                    'id': review_id,
+                    'title_id': title_id,
+                    'text': self.text(rnd),
+                    'author': author,
+                    'score': bisect(SCORE_WEIGHTS, rnd.random() * score_total)
+                    + 1,
+                    'pub_date': pub_date,
+                }
+                comments = 0
+                if comment_p < 1:
+                    comments = int(
+                        math.log(1 - rnd.random()) / math.log(1 - comment_p)
+                    )
+                for _ in range(comments):
+                    yield 'comments.csv', {
+                        'id': next(comment_ids),
+                        'review_id': review_id,
+                        'text': self.text(rnd),
+                        'author': user_ids[bisect(
+                            user_weights, rnd.random() * user_weights[-1]
+                        )],
+                        'pub_date': pub_date + COMMENTS_DELAY * rnd.random(),
+                    }
+
+    @staticmethod
+    def review_authors(rnd, user_ids, user_weights, count):
+        """
+        count разных авторов с учётом активности. Когда нужна заметная
+        доля всех пользователей, авторы выбираются равномерно: иначе
+        выборка с весами долго ищет ещё не выбранных.
+        """
+        if not count:
+            return []
+        if count * 4 > len(user_ids):
+            return rnd.sample(user_ids, count)
+        chosen = {}
+        total = user_weights[-1]
+        while len(chosen) < count:
+            author = user_ids[bisect(user_weights, rnd.random() * total)]
+            chosen[author] = None
+        return list(chosen)
+
+    def text(self, rnd):
+        first = self.phrases[rnd.getrandbits(PHRASE_POOL_BITS)]
+        second = self.phrases[rnd.getrandbits(PHRASE_POOL_BITS)]
+        return f'{first.capitalize()}, {second}.'
+
+
+class CSVWriter:
+    """
+    Записывает строки в CSV-файлы в каталоге path. Ключи строк генератора
+    идут в порядке COLUMNS, поэтому значения пишутся без DictWriter.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.writers = {}
+
+    def __enter__(self):
+        os.makedirs(self.path, exist_ok=True)
+        for filename, columns in COLUMNS.items():
+            file = open(
+                os.path.join(self.path, filename), 'w',
+                encoding='utf-8', newline=''
+            )
+            self.files[filename] = file
+            self.writers[filename] = csv.writer(file)
+            self.writers[filename].writerow(columns)
+        return self
+
+    def write(self, filename, row):
+        self.writers[filename].writerow([
+            format_date(value) if isinstance(value, datetime) else value
+            for value in row.values()
+        ])
+
+    def __exit__(self, *exc_info):
+        for file in self.files.values():
+            file.close()
+
+
+class DatabaseWriter:
+    """
+    Записывает строки в базу пачками по batch_size, каждая пачка — в своей
+    транзакции. Перед записью пачки сохраняются неполные пачки файлов,
+    от которых она зависит.
+
+    Справочники, пользователи и произведения создаются через bulk_create
+    так же, как в import_csv. Отзывы и комментарии — почти весь объём —
+    вставляются через executemany готовыми кортежами: подготовка каждого
+    значения в bulk_create на таких объёмах занимает больше времени, чем
+    сама вставка.
+    """
+    raw_files = ('review.csv', 'comments.csv')
+
+    def __init__(self, batch_size=5000, using='default'):
+        self.batch_size = batch_size
+        self.connection = connections[using]
+        self.files = {
+            filename: (model, from_row)
+            for filename, model, from_row, _ in IMPORT_FILES
+        }
+        self.order = list(self.files)
+        self.batches = {filename: [] for filename in self.files}
+        self.inserts = {
+            filename: self.get_insert(self.files[filename][0], filename)
+            for filename in self.raw_files
+        }
+
+    def get_insert(self, model, filename):
+        """SQL вставки и преобразователи значений по колонкам CSV."""
+        fields = [model._meta.get_field(name) for name in COLUMNS[filename]]
+        ops = self.connection.ops
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            ops.quote_name(model._meta.db_table),
+            ', '.join(ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields))
+        )
+        adapters = [
+            ops.adapt_datetimefield_value
+            if field.get_internal_type() == 'DateTimeField' else None
+            for field in fields
+        ]
+        return sql, adapters
+
+    def __enter__(self):
+        return self
+
+    def write(self, filename, row):
+        batch = self.batches[filename]
+        if filename in self.inserts:
+            _, adapters = self.inserts[filename]
+            batch.append(tuple(
+                adapt(value) if adapt else value
+                for adapt, value in zip(adapters, row.values())
+            ))
+        else:
+            batch.append(self.files[filename][1](row))
+        if len(batch) >= self.batch_size:
+            for dependency in self.order[:self.order.index(filename) + 1]:
+                self.flush(dependency)
+
+    def flush(self, filename):
+        batch = self.batches[filename]
+        if not batch:
+            return
+        model, _ = self.files[filename]
+        if filename in self.inserts:
+            sql, _ = self.inserts[filename]
+            with transaction.atomic(using=self.connection.alias):
+                with self.connection.cursor() as cursor:
+                    cursor.executemany(sql, batch)
+        else:
+            with keep_auto_now_add(model), transaction.atomic(
+                using=self.connection.alias
+            ):
+                model.objects.using(self.connection.alias).bulk_create(
+                    batch, batch_size=self.batch_size
+                )
+        batch.clear()
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            for filename in self.order:
+                self.flush(filename)
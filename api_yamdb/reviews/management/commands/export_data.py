@@ -0,0 +1,57 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_TABLES,
+                            TableExport)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгрузка таблиц в CSV-файлы в формате static/data или в NDJSON '
+        'с постоянным расходом памяти'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', required=True,
+            help='Каталог для файлов <таблица>.<формат>'
+        )
+        parser.add_argument(
+            '--tables', nargs='+', choices=list(EXPORT_TABLES),
+            default=list(EXPORT_TABLES),
+            help='Таблицы для выгрузки; по умолчанию все'
+        )
+        parser.add_argument(
+            '--format', choices=list(EXPORT_FORMATS), default='csv'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше 0')
+        os.makedirs(options['output'], exist_ok=True)
+        fmt = options['format']
+        total = 0
+        started = time.monotonic()
+        for table in options['tables']:
+            table_started = time.monotonic()
+            export = TableExport(table, fmt, options['chunk_size'])
+            path = os.path.join(options['output'], f'{table}.{fmt}')
+            with open(path, 'wb') as file:
+                for chunk in export:
+                    file.write(chunk)
+            elapsed = max(time.monotonic() - table_started, 1e-9)
+            total += export.rows
+            self.stdout.write(
+                f'{path}: {export.rows} строк, '
+                f'{export.rows / elapsed:.0f} строк/с'
+            )
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено {total} строк за {elapsed:.1f} с'
+        ))
@@ -0,0 +1,117 @@
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import invalidate_models
+from reviews.bulk_import import reset_sequences
+from reviews.csv_layout import COLUMNS, IMPORT_FILES
+from reviews.fake_data import (CSVWriter, DatabaseWriter, FakeDataGenerator,
+                               first_free_ids)
+from reviews.management.commands.import_csv import PROGRESS_INTERVAL
+from reviews.models import TitleStats
+from reviews.ratings import rebuild_ratings, rebuild_title_stats
+from reviews.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация синтетических данных: запись в базу пачками или в '
+        'CSV-файлы для import_csv'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews', type=int, default=100000,
+            help='Общее количество отзывов'
+        )
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument(
+            '--comments-per-review', type=float, default=1.0,
+            help='Среднее число комментариев к отзыву'
+        )
+        parser.add_argument(
+            '--title-skew', type=float, default=1.1,
+            help=(
+                'Показатель распределения Ципфа для числа отзывов на '
+                'произведение; 0 — поровну'
+            )
+        )
+        parser.add_argument(
+            '--user-skew', type=float, default=1.0,
+            help=(
+                'Показатель распределения Ципфа для активности '
+                'пользователей; 0 — поровну'
+            )
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help=(
+                'Каталог для CSV-файлов в формате import_csv; без него '
+                'данные записываются в базу'
+            )
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной транзакции при записи в базу'
+        )
+
+    def handle(self, *args, **options):
+        for option in ('users', 'titles', 'reviews', 'genres', 'categories'):
+            if options[option] < 0:
+                raise CommandError(f'--{option} не может быть меньше 0')
+        to_database = not options['output']
+        first_ids = first_free_ids() if to_database else None
+        generator = FakeDataGenerator(
+            users=options['users'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            genres=options['genres'],
+            categories=options['categories'],
+            comments_per_review=options['comments_per_review'],
+            title_skew=options['title_skew'],
+            user_skew=options['user_skew'],
+            seed=options['seed'],
+            first_ids=first_ids,
+        )
+        writer = (
+            DatabaseWriter(options['batch_size']) if to_database
+            else CSVWriter(options['output'])
+        )
+        counts = dict.fromkeys(COLUMNS, 0)
+        started = last_report = time.monotonic()
+        # Полнотекстовый индекс перестраивается один раз после записи.
+        deferred = (
+            get_search_backend().deferred() if to_database
+            else nullcontext()
+        )
+        with deferred, writer:
+            for filename, row in generator.rows():
+                writer.write(filename, row)
+                counts[filename] += 1
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    total = sum(counts.values())
+                    self.stdout.write(
+                        f'{filename}: {counts[filename]} строк, всего '
+                        f'{total}, {total / (now - started):.0f} строк/с'
+                    )
+
+        if to_database:
+            models = [model for _, model, _, _ in IMPORT_FILES]
+            reset_sequences(models)
+            rebuild_ratings()
+            rebuild_title_stats()
+            invalidate_models(TitleStats, *models)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        for filename, count in counts.items():
+            self.stdout.write(f'{filename}: {count} строк')
+        self.stdout.write(self.style.SUCCESS(
+            f'Сгенерировано {sum(counts.values())} строк за {elapsed:.1f} с, '
+            f'{sum(counts.values()) / elapsed:.0f} строк/с'
+        ))
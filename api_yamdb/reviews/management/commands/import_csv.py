@@ -1,20 +1,204 @@
 import csv
 import os
+import time
+from collections import defaultdict
+from itertools import islice
+from multiprocessing import Pool
 
-from django.core.management.base import BaseCommand
 from django.conf import settings
-from reviews.models import Category, Genre, Title, GenreTitle
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.cache import invalidate_models
+from reviews.bulk_import import (RowConverter, StageTimer, create_indexes,
+                                 drop_indexes, keep_auto_now_add, load_file,
+                                 reset_sequences, setup_worker, update_rows)
+from reviews.csv_layout import IMPORT_FILES
+from reviews.models import Review, Title, TitleStats
+from reviews.ratings import (apply_review_changes, rebuild_ratings,
+                             rebuild_title_stats)
+from reviews.search import get_search_backend
+
+DEFAULT_BATCH_SIZE = 1000
+PROGRESS_INTERVAL = 1  # Секунды между сообщениями о прогрессе
+# Большие файлы, которые с --workers разбираются пулом процессов.
+PARALLEL_FILES = ('genre_title.csv', 'review.csv', 'comments.csv')
+
+
+def changed_fields(obj, fields, stored):
+    return tuple(
+        field for field, value in zip(fields, stored)
+        if getattr(obj, field.attname) != value
+    )
+
+
+def stored_values(model, fields, pks):
+    """
+    Значения полей уже сохранённых строк по id: один запрос на пачку,
+    не больше max_query_params id в условии.
+    """
+    size = connection.features.max_query_params
+    stored = {}
+    for start in range(0, len(pks), size):
+        rows = (
+            model.objects.filter(pk__in=pks[start:start + size])
+            .order_by()
+            .values_list('pk', *(field.attname for field in fields))
+        )
+        for pk, *values in rows:
+            stored[pk] = tuple(values)
+    return stored
+
+
+def diff_rows(parsed, stored, fields, from_row):
+    """
+    Сравнивает разобранные строки {pk: (строка CSV, значения fields)} с
+    сохранёнными. Возвращает новые объекты и изменённые, сгруппированные
+    по кортежу изменившихся полей; совпадающие строки пропускаются.
+    """
+    created = []
+    changed = defaultdict(list)
+    for pk, (row, values) in parsed.items():
+        if stored.get(pk) == values:
+            continue
+        obj = from_row(row)
+        obj.pk = pk
+        for field, value in zip(fields, values):
+            setattr(obj, field.attname, value)
+        if pk not in stored:
+            created.append(obj)
+        else:
+            changed[changed_fields(obj, fields, stored[pk])].append(obj)
+    return created, changed
+
+
+def apply_rating_changes(fields, created, updated, stored, rebuild):
+    """
+    Переносит новые и изменённые отзывы в рейтинги и сводки. Произведения
+    из rebuild пропускаются: они будут пересчитаны целиком. Туда же
+    попадают произведения отзывов с изменённой датой — вклад даты в
+    трендовый счёт не вычитается.
+    """
+    index = {field.attname: fields.index(field) for field in fields}
+    changes = [
+        (review.title_id, review.score, review.pub_date, None, None)
+        for review in created if review.title_id not in rebuild
+    ]
+    for review in updated:
+        old = stored[review.pk]
+        old_title_id = old[index['title_id']]
+        if old[index['pub_date']] != review.pub_date:
+            rebuild.update((old_title_id, review.title_id))
+        elif not rebuild.intersection((old_title_id, review.title_id)):
+            changes.append((
+                review.title_id,
+                review.score,
+                review.pub_date,
+                old_title_id,
+                old[index['score']]
+            ))
+    apply_review_changes(changes)
+
+
+def delete_missing(model, seen, batch_size):
+    """
+    Удаляет строки, id которых нет в seen, и возвращает их число.
+    Рейтинги при удалении отзывов поддерживают сигналы.
+    """
+    missing = [
+        pk for pk in model.objects.order_by('pk')
+        .values_list('pk', flat=True).iterator(chunk_size=batch_size)
+        if pk not in seen
+    ]
+    size = min(batch_size, connection.features.max_query_params)
+    deleted = 0
+    for start in range(0, len(missing), size):
+        with transaction.atomic():
+            _, per_model = model.objects.filter(
+                pk__in=missing[start:start + size]
+            ).delete()
+        deleted += per_model.get(model._meta.label, 0)
+    return deleted
+
+
+def read_batches(path, batch_size):
+    """Построчно читает CSV и отдаёт строки пачками по batch_size."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file)
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                return
+            yield batch
 
 
 class Command(BaseCommand):
     help = 'Импорт данных из CSV файлов'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static/data'),
+            help='Каталог с CSV файлами'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной транзакции'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Добавить новые и обновить изменённые строки уже '
+                'загруженной базы вместо загрузки с нуля'
+            )
+        )
+        parser.add_argument(
+            '--delete-missing',
+            action='store_true',
+            help='С --upsert удалить строки, которых нет в CSV файлах'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help=(
+                'Количество процессов для разбора связей жанров, отзывов '
+                'и комментариев; без параметра файлы загружаются '
+                'последовательно'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers должен быть больше 0')
+        if options['delete_missing'] and not options['upsert']:
+            raise CommandError('--delete-missing работает только с --upsert')
+        if options['upsert'] and options['workers']:
+            raise CommandError('--upsert нельзя совмещать с --workers')
         try:
-            self.import_categories()
-            self.import_genres()
-            self.import_titles()
-            self.import_genre_title()
+            # Произведения, рейтинги которых нужно пересчитать; None — все.
+            title_ids = None
+            if options['upsert']:
+                title_ids = self.import_upsert(options)
+            elif options['workers']:
+                self.import_parallel(options)
+            else:
+                for filename, model, from_row, label in IMPORT_FILES:
+                    self.import_file(
+                        os.path.join(options['path'], filename),
+                        model,
+                        from_row,
+                        label,
+                        options['batch_size']
+                    )
+            reset_sequences([model for _, model, _, _ in IMPORT_FILES])
+            rebuild_ratings(title_ids)
+            rebuild_title_stats(title_ids)
+            invalidate_models(
+                TitleStats, *(model for _, model, _, _ in IMPORT_FILES)
+            )
             self.stdout.write(
                 self.style.SUCCESS('Данные успешно импортированы')
             )
@@ -23,87 +207,185 @@ class Command(BaseCommand):
                 self.style.ERROR(f'Ошибка при импорте данных: {e}')
             )
 
-    def import_categories(self):
-        path = os.path.join(settings.BASE_DIR, 'static/data/category.csv')
-        try:
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                Category.objects.bulk_create(
-                    Category(**row) for row in reader
-                )
-                self.stdout.write(
-                    self.style.SUCCESS('Категории успешно импортированы')
-                )
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'Ошибка при импорте категорий: {e}')
-            )
-            raise e
+    def import_upsert(self, options):
+        """
+        Применяет CSV к уже загруженной базе: новые строки добавляет,
+        изменённые обновляет, совпадающие пропускает. Строки сравниваются
+        по id со значениями в базе, поэтому повторный импорт тех же файлов
+        ничего не пишет, а файл с изменениями за день стоит пропорционально
+        своему размеру. С --delete-missing удаляются строки, которых нет в
+        файлах, — файлы должны быть полным снимком.
 
-    def import_genres(self):
-        path = os.path.join(settings.BASE_DIR, 'static/data/genre.csv')
-        try:
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                Genre.objects.bulk_create(
-                    Genre(**row) for row in reader
-                )
-                self.stdout.write(
-                    self.style.SUCCESS('Жанры успешно импортированы')
-                )
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'Ошибка при импорте жанров: {e}')
+        Рейтинги новых и изменённых отзывов обновляются на месте;
+        возвращает id произведений, которые нужно пересчитать целиком.
+        """
+        title_ids = set()
+        seen = {}
+        for filename, model, from_row, label in IMPORT_FILES:
+            seen[model] = set()
+            self.upsert_file(
+                os.path.join(options['path'], filename),
+                model,
+                from_row,
+                label,
+                options['batch_size'],
+                seen[model],
+                title_ids
             )
-            raise e
+        if options['delete_missing']:
+            # Зависимые строки удаляются раньше тех, на которые ссылаются.
+            for _, model, _, label in reversed(IMPORT_FILES):
+                deleted = delete_missing(
+                    model, seen[model], options['batch_size']
+                )
+                self.stdout.write(f'{label}: удалено {deleted}')
+        return title_ids
 
-    def import_titles(self):
-        path = os.path.join(settings.BASE_DIR, 'static/data/titles.csv')
-        try:
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                titles = []
-                for row in reader:
-                    category_id = row.pop('category')
-                    titles.append(
-                        Title(
-                            **row,
-                            category_id=category_id
+    def upsert_file(self, path, model, from_row, label, batch_size, seen,
+                    title_ids):
+        started = time.monotonic()
+        created_count = updated_count = unchanged_count = 0
+        converter = None
+        with keep_auto_now_add(model):
+            for batch in read_batches(path, batch_size):
+                if converter is None:
+                    converter = RowConverter(model, tuple(batch[0]))
+                    pk_index = converter.fields.index(model._meta.pk)
+                    fields = [
+                        field for field in converter.fields
+                        if not field.primary_key
+                    ]
+                # Объекты моделей создаются только для новых и изменённых
+                # строк, остальные сравниваются разобранными значениями.
+                parsed = {}
+                for row in batch:
+                    values = converter.parse(row.values())
+                    parsed[values[pk_index]] = (
+                        row, values[:pk_index] + values[pk_index + 1:]
+                    )
+                seen.update(parsed)
+                stored = stored_values(model, fields, list(parsed))
+                created, changed = diff_rows(parsed, stored, fields, from_row)
+                updated = [obj for group in changed.values() for obj in group]
+                with transaction.atomic():
+                    model.objects.bulk_create(created, batch_size=batch_size)
+                    # Обновляются только изменившиеся колонки: индексы и
+                    # поисковый индекс по остальным не перестраиваются.
+                    for group_fields, group in changed.items():
+                        update_rows(model, group_fields, group)
+                    if model is Review:
+                        apply_rating_changes(
+                            fields, created, updated, stored, title_ids
                         )
+                if model is Title:
+                    title_ids.update(obj.pk for obj in created)
+                created_count += len(created)
+                updated_count += len(updated)
+                unchanged_count += len(parsed) - len(created) - len(updated)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        total = created_count + updated_count + unchanged_count
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}: добавлено {created_count}, обновлено '
+            f'{updated_count}, без изменений {unchanged_count}; '
+            f'{total / elapsed:.0f} строк/с'
+        ))
+
+    def import_parallel(self, options):
+        """
+        Маленькие файлы загружаются как обычно, большие (PARALLEL_FILES)
+        разбираются пулом процессов и пишутся одним процессом. Неуникальные
+        индексы этих таблиц и триггеры полнотекстового индекса на время
+        загрузки удаляются, внешние ключи проверяются один раз в конце.
+        Загрузка идёт одной транзакцией: если проверка ключей не прошла,
+        откатываются все таблицы, и строк с висячими ссылками никто не
+        увидит.
+        """
+        timer = StageTimer()
+        parallel = [
+            model for filename, model, _, _ in IMPORT_FILES
+            if filename in PARALLEL_FILES
+        ]
+        tables = [model._meta.db_table for _, model, _, _ in IMPORT_FILES]
+        # На SQLite проверку ключей отключает PRAGMA, которую нельзя
+        # выполнить внутри транзакции.
+        with connection.constraint_checks_disabled(), transaction.atomic():
+            with get_search_backend().deferred():
+                indexes = drop_indexes(parallel)
+                try:
+                    with Pool(options['workers'], setup_worker) as pool:
+                        self.load_files(options, pool, timer)
+                finally:
+                    with timer.measure('Индексы'):
+                        create_indexes(indexes)
+                # Выход из deferred перестраивает полнотекстовый индекс.
+                started = time.perf_counter()
+            timer.add('Полнотекстовый индекс', time.perf_counter() - started)
+            with timer.measure('Проверка внешних ключей'):
+                connection.check_constraints(table_names=tables)
+        for line in timer.report():
+            self.stdout.write(line)
+
+    def load_files(self, options, pool, timer):
+        for filename, model, from_row, label in IMPORT_FILES:
+            path = os.path.join(options['path'], filename)
+            if filename not in PARALLEL_FILES:
+                with timer.measure('Маленькие файлы'):
+                    self.import_file(
+                        path, model, from_row, label, options['batch_size']
                     )
-                Title.objects.bulk_create(titles)
-                self.stdout.write(
-                    self.style.SUCCESS('Произведения успешно импортированы')
-                )
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'Ошибка при импорте произведений: {e}')
+                continue
+            started = last_report = time.monotonic()
+
+            def report(total):
+                nonlocal last_report
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    self.stdout.write(
+                        f'{label}: {total} строк, '
+                        f'{total / (now - started):.0f} строк/с'
+                    )
+
+            total = load_file(
+                path, model, pool, options['workers'],
+                options['batch_size'], timer, on_block=report
             )
-            raise e
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(self.style.SUCCESS(
+                f'{label} успешно импортированы: {total} строк, '
+                f'{total / elapsed:.0f} строк/с'
+            ))
 
-    def import_genre_title(self):
-        path = os.path.join(settings.BASE_DIR, 'static/data/genre_title.csv')
+    def import_file(self, path, model, from_row, label, batch_size):
+        started = last_report = time.monotonic()
+        total = 0
         try:
-            with open(path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                genre_titles = []
-                for row in reader:
-                    genre_titles.append(
-                        GenreTitle(
-                            genre_id=row['genre_id'],
-                            title_id=row['title_id']
+            with keep_auto_now_add(model):
+                for batch in read_batches(path, batch_size):
+                    with transaction.atomic():
+                        model.objects.bulk_create(
+                            [from_row(row) for row in batch],
+                            batch_size=batch_size
                         )
-                    )
-                GenreTitle.objects.bulk_create(genre_titles)
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        'Связи жанров и произведений успешно импортированы'
-                    )
+                    total += len(batch)
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL:
+                        last_report = now
+                        self.stdout.write(
+                            f'{label}: {total} строк, '
+                            f'{total / (now - started):.0f} строк/с'
+                        )
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{label} успешно импортированы: {total} строк, '
+                    f'{total / elapsed:.0f} строк/с'
                 )
+            )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(
-                    f'Ошибка при импорте связей жанров и произведений: {e}'
+                    f'Ошибка при импорте файла {os.path.basename(path)}: {e}'
                 )
             )
             raise e
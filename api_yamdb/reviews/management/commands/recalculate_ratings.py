@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import invalidate_models
+from reviews.models import Title, TitleStats
+from reviews.ratings import (find_rating_mismatches, find_stats_mismatches,
+                             rebuild_ratings, rebuild_title_stats)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчёт и проверка сохранённых рейтингов и сводок отзывов '
+        'произведений'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = list(find_rating_mismatches())
+            for row in mismatches:
+                self.stdout.write(
+                    f'Произведение {row["pk"]}: сохранено '
+                    f'{row["rating_sum"]}/{row["rating_count"]}, '
+                    f'по отзывам {row["actual_sum"]}/{row["actual_count"]}'
+                )
+            stats_mismatches = find_stats_mismatches()
+            for title_id in stats_mismatches:
+                self.stdout.write(
+                    f'Произведение {title_id}: сводка отзывов расходится '
+                    f'с отзывами'
+                )
+            if mismatches or stats_mismatches:
+                raise CommandError(
+                    f'Рейтинг расходится у {len(mismatches)} произведений, '
+                    f'сводка отзывов — у {len(stats_mismatches)}'
+                )
+            self.stdout.write(self.style.SUCCESS('Рейтинги корректны'))
+            return
+        updated = rebuild_ratings()
+        stats = rebuild_title_stats()
+        invalidate_models(Title, TitleStats)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Рейтинги пересчитаны: {updated}, сводки отзывов: {stats}'
+            )
+        )
@@ -23,6 +23,9 @@ class Category(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='category_name_idx'),
+        ]
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
 
@@ -43,6 +46,9 @@ class Genre(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='genre_name_idx'),
+        ]
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
 
@@ -83,15 +89,117 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанры'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок'
+    )
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+            models.Index(
+                fields=['category', 'name'],
+                name='title_category_name_idx'
+            ),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым сумме и количеству оценок."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class TitleStats(models.Model):
+    """
+    Сводка отзывов произведения: количество оценок каждого балла,
+    общее число отзывов, дата последнего отзыва и счета для рейтингов
+    «лучшие» и «в тренде». Обновляется сигналами отзывов, поэтому
+    статистика читается одной строкой по ключу.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField(default=0, verbose_name='Оценок 1')
+    score_2 = models.PositiveIntegerField(default=0, verbose_name='Оценок 2')
+    score_3 = models.PositiveIntegerField(default=0, verbose_name='Оценок 3')
+    score_4 = models.PositiveIntegerField(default=0, verbose_name='Оценок 4')
+    score_5 = models.PositiveIntegerField(default=0, verbose_name='Оценок 5')
+    score_6 = models.PositiveIntegerField(default=0, verbose_name='Оценок 6')
+    score_7 = models.PositiveIntegerField(default=0, verbose_name='Оценок 7')
+    score_8 = models.PositiveIntegerField(default=0, verbose_name='Оценок 8')
+    score_9 = models.PositiveIntegerField(default=0, verbose_name='Оценок 9')
+    score_10 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 10'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    last_review_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата последнего отзыва'
+    )
+    bayesian_rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Байесовский рейтинг'
+    )
+    trending_score = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Трендовый счёт'
+    )
+
+    SCORES = range(1, 11)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['bayesian_rating', 'title'],
+                name='title_stats_bayesian_idx'
+            ),
+            models.Index(
+                fields=['trending_score', 'title'],
+                name='title_stats_trending_idx'
+            ),
+        ]
+        verbose_name = 'Статистика отзывов'
+        verbose_name_plural = 'Статистика отзывов'
+
+    def __str__(self):
+        return f'Статистика отзывов {self.title_id}'
+
+    @staticmethod
+    def score_field(score):
+        return f'score_{score}'
+
+    @property
+    def scores(self):
+        """Количество оценок по баллам от 1 до 10."""
+        return {
+            score: getattr(self, self.score_field(score))
+            for score in self.SCORES
+        }
+
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(
@@ -150,10 +258,25 @@ class Review(models.Model):
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ['-pub_date']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении
+        # пересчитать рейтинг произведения по разнице оценок.
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
     def __str__(self):
         return (f"Отзыв {self.author.username} на {self.title.name} "
                 f"({self.score}/10)")
@@ -179,9 +302,23 @@ class Comments(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['pub_date']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем отзыв, чтобы при переносе комментария сбросить
+        # версии обоих отзывов.
+        instance._loaded_review_id = instance.__dict__.get('review_id')
+        return instance
+
     def __str__(self):
         return f'Комментарий {self.author.username} к отзыву {self.review.id}'
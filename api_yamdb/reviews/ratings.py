@@ -0,0 +1,458 @@
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              IntegerField, Max, OuterRef, Q, Subquery, Sum,
+                              Value)
+from django.db.models.functions import Abs, Coalesce, Exp, Greatest, Ln
+
+from reviews.bulk_import import update_rows
+from reviews.models import Review, Title, TitleStats
+
+STATS_BATCH_SIZE = 1000
+# Начало отсчёта для трендового счёта; менять нельзя без пересчёта сводок.
+TRENDING_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Отзывы старше этого числа периодов полураспада не влияют на счёт.
+TRENDING_HORIZON_HALF_LIVES = 40
+
+
+def apply_score_delta(title_id, score_delta, count_delta):
+    """Атомарно изменяет сохранённые сумму и количество оценок."""
+    if not title_id or not (score_delta or count_delta):
+        return
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta
+    )
+
+
+def _actual_rating_subqueries():
+    reviews = (
+        Review.objects
+        .filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    actual_sum = Coalesce(
+        Subquery(
+            reviews.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+    actual_count = Coalesce(
+        Subquery(
+            reviews.annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+    return actual_sum, actual_count
+
+
+def rebuild_ratings(title_ids=None):
+    """
+    Пересчитывает сумму и количество оценок по таблице отзывов.
+
+    Без аргументов пересчитывает все произведения, иначе только
+    переданные. Возвращает количество обновлённых произведений.
+    """
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    actual_sum, actual_count = _actual_rating_subqueries()
+    return titles.update(rating_sum=actual_sum, rating_count=actual_count)
+
+
+def find_rating_mismatches():
+    """
+    Возвращает произведения, у которых сохранённый рейтинг
+    расходится с отзывами.
+    """
+    actual_sum, actual_count = _actual_rating_subqueries()
+    return (
+        Title.objects
+        .annotate(actual_sum=actual_sum, actual_count=actual_count)
+        .filter(
+            ~Q(rating_sum=F('actual_sum'))
+            | ~Q(rating_count=F('actual_count'))
+        )
+        .order_by('pk')
+        .values(
+            'pk', 'rating_sum', 'rating_count', 'actual_sum', 'actual_count'
+        )
+    )
+
+
+def get_ranking_prior():
+    """Априорные средняя оценка и её вес для байесовского рейтинга."""
+    return (
+        getattr(settings, 'RANKING_PRIOR_MEAN', 5.5),
+        getattr(settings, 'RANKING_PRIOR_WEIGHT', 10),
+    )
+
+
+def get_trending_half_life():
+    return getattr(settings, 'TRENDING_HALF_LIFE', timedelta(days=7))
+
+
+def trending_exponent(pub_date):
+    """
+    Вклад отзыва в трендовый счёт в логарифмической шкале.
+
+    Счёт произведения — логарифм суммы 2 ** (t / период полураспада) по
+    его отзывам. Затухание со временем умножает все суммы на один и тот же
+    множитель, поэтому порядок произведений не зависит от текущего момента
+    и сохранённый счёт не нужно пересчитывать по расписанию.
+    """
+    return (
+        (pub_date - TRENDING_EPOCH) / get_trending_half_life() * math.log(2)
+    )
+
+
+def logaddexp(left, right):
+    if left is None:
+        return right
+    high = max(left, right)
+    return high + math.log1p(math.exp(-abs(left - right)))
+
+
+def bayesian_rating(scores):
+    """Байесовский рейтинг по количеству оценок каждого балла."""
+    count = sum(scores.values())
+    if not count:
+        return None
+    mean, weight = get_ranking_prior()
+    total = sum(score * number for score, number in scores.items())
+    return (mean * weight + total) / (weight + count)
+
+
+def _bayesian_rating_expression(bucket_deltas):
+    """Байесовский рейтинг по значениям корзин после обновления."""
+    mean, weight = get_ranking_prior()
+    total = Value(float(mean * weight))
+    count = Value(float(weight))
+    for score in TitleStats.SCORES:
+        field = TitleStats.score_field(score)
+        bucket = F(field) + bucket_deltas.get(field, 0)
+        total = total + bucket * score
+        count = count + bucket
+    return ExpressionWrapper(total / count, output_field=FloatField())
+
+
+def _logaddexp_expression(field, exponent):
+    value = Value(exponent)
+    return Coalesce(
+        ExpressionWrapper(
+            Greatest(F(field), value)
+            + Ln(Value(1.0) + Exp(-Abs(F(field) - value))),
+            output_field=FloatField()
+        ),
+        value
+    )
+
+
+def recent_review_activity(title_id):
+    """
+    Дата последнего отзыва и трендовый счёт произведения по его отзывам.
+    Отзывы читаются по индексу (title, -pub_date) от новых к старым, пока
+    их вклад не станет пренебрежимо мал.
+    """
+    horizon = get_trending_half_life() * TRENDING_HORIZON_HALF_LIVES
+    last_review_at = score = None
+    dates = (
+        Review.objects
+        .filter(title_id=title_id)
+        .order_by('-pub_date')
+        .values_list('pub_date', flat=True)
+        .iterator(chunk_size=500)
+    )
+    for pub_date in dates:
+        if last_review_at is None:
+            last_review_at = pub_date
+        elif pub_date < last_review_at - horizon:
+            break
+        score = logaddexp(score, trending_exponent(pub_date))
+    return last_review_at, score
+
+
+def _bucket_updates(added, removed):
+    """Изменения счётчиков оценок и байесовского рейтинга."""
+    bucket_deltas = {}
+    if added != removed:
+        if added is not None:
+            bucket_deltas[TitleStats.score_field(added)] = 1
+        if removed is not None:
+            bucket_deltas[TitleStats.score_field(removed)] = -1
+    updates = {
+        field: F(field) + delta for field, delta in bucket_deltas.items()
+    }
+    if bucket_deltas:
+        updates['bayesian_rating'] = _bayesian_rating_expression(
+            bucket_deltas
+        )
+    return updates
+
+
+def _activity_updates(title_id, count_delta, pub_date):
+    """Изменения даты последнего отзыва и трендового счёта."""
+    if count_delta < 0:
+        # Вычесть вклад из логарифма суммы численно ненадёжно, поэтому
+        # счёт пересчитывается по недавним отзывам произведения.
+        last_review_at, trending_score = recent_review_activity(title_id)
+        return {
+            'last_review_at': last_review_at,
+            'trending_score': trending_score,
+        }
+    if pub_date is None:
+        return {}
+    return {
+        'last_review_at': Coalesce(
+            Greatest(F('last_review_at'), Value(pub_date)), Value(pub_date)
+        ),
+        'trending_score': _logaddexp_expression(
+            'trending_score', trending_exponent(pub_date)
+        ),
+    }
+
+
+def apply_stats_delta(title_id, added=None, removed=None, pub_date=None):
+    """
+    Обновляет сводку отзывов произведения: added и removed — оценки
+    добавленного и удалённого отзыва, pub_date — дата нового отзыва.
+    Байесовский рейтинг и трендовый счёт пересчитываются в том же
+    UPDATE. Если сводки ещё нет, при добавлении она строится по отзывам.
+    """
+    if not title_id:
+        return
+    updates = _bucket_updates(added, removed)
+    count_delta = (added is not None) - (removed is not None)
+    if count_delta:
+        updates['review_count'] = F('review_count') + count_delta
+    updates.update(_activity_updates(title_id, count_delta, pub_date))
+    if not updates:
+        return
+    updated = TitleStats.objects.filter(title_id=title_id).update(**updates)
+    if not updated and added is not None:
+        rebuild_title_stats([title_id])
+
+
+def apply_review_change(title_id, score, pub_date, old_title_id=None,
+                        old_score=None):
+    """
+    Обновляет рейтинг и сводку после создания отзыва или, если переданы
+    прежние произведение и оценка, после его правки.
+    """
+    if old_title_id is None:
+        apply_score_delta(title_id, score, 1)
+        apply_stats_delta(title_id, added=score, pub_date=pub_date)
+    elif old_title_id != title_id:
+        apply_score_delta(old_title_id, -old_score, -1)
+        apply_score_delta(title_id, score, 1)
+        apply_stats_delta(old_title_id, removed=old_score)
+        apply_stats_delta(title_id, added=score, pub_date=pub_date)
+    else:
+        apply_score_delta(title_id, score - old_score, 0)
+        apply_stats_delta(title_id, added=score, removed=old_score)
+
+
+def _collect_review_changes(changes):
+    """
+    Складывает изменения отзывов по произведениям: сумма и число оценок,
+    изменения счётчиков баллов, даты новых отзывов и произведения, у
+    которых отзывы убыли.
+    """
+    ratings = defaultdict(lambda: [0, 0])
+    buckets = defaultdict(Counter)
+    dates = defaultdict(list)
+    shrunk = set()
+    for title_id, score, pub_date, old_title_id, old_score in changes:
+        if old_title_id is not None:
+            ratings[old_title_id][0] -= old_score
+            ratings[old_title_id][1] -= 1
+            buckets[old_title_id][old_score] -= 1
+        ratings[title_id][0] += score
+        ratings[title_id][1] += 1
+        buckets[title_id][score] += 1
+        if old_title_id != title_id:
+            dates[title_id].append(pub_date)
+            if old_title_id is not None:
+                shrunk.add(old_title_id)
+    return ratings, buckets, dates, shrunk
+
+
+def _apply_stats_changes(row, buckets, dates, shrunk):
+    """Применяет сложенные изменения к прочитанной сводке."""
+    for score, delta in buckets.items():
+        field = TitleStats.score_field(score)
+        setattr(row, field, getattr(row, field) + delta)
+    row.review_count += sum(buckets.values())
+    row.bayesian_rating = bayesian_rating(row.scores)
+    if shrunk:
+        # Вычесть вклад из логарифма суммы численно ненадёжно: счёт
+        # пересчитывается по уже записанным отзывам.
+        row.last_review_at, row.trending_score = (
+            recent_review_activity(row.title_id)
+        )
+        return
+    for pub_date in dates:
+        if row.last_review_at is None or pub_date > row.last_review_at:
+            row.last_review_at = pub_date
+        row.trending_score = logaddexp(
+            row.trending_score, trending_exponent(pub_date)
+        )
+
+
+def apply_review_changes(changes):
+    """
+    Пакетный вариант apply_review_change для массовой загрузки. changes —
+    кортежи (title_id, score, pub_date, old_title_id, old_score), у новых
+    отзывов old_title_id и old_score равны None; сами отзывы уже записаны.
+
+    Изменения складываются по произведениям, рейтинги и сводки читаются с
+    блокировкой одним запросом на пачку, пересчитываются в Python и
+    записываются через executemany: собирать выражение байесовского
+    рейтинга на каждый отзыв дороже, чем обновить тысячи строк.
+    """
+    ratings, buckets, dates, shrunk = _collect_review_changes(changes)
+    title_ids = list(ratings)
+    stats_fields = [
+        TitleStats._meta.get_field(name) for name in (
+            'review_count', 'last_review_at', 'bayesian_rating',
+            'trending_score',
+            *(TitleStats.score_field(score) for score in TitleStats.SCORES)
+        )
+    ]
+    with transaction.atomic():
+        titles = []
+        stats = []
+        for start in range(0, len(title_ids), STATS_BATCH_SIZE):
+            chunk = title_ids[start:start + STATS_BATCH_SIZE]
+            for title in (
+                Title.objects.select_for_update().filter(pk__in=chunk)
+                .only('rating_sum', 'rating_count').order_by()
+            ):
+                title.rating_sum += ratings[title.pk][0]
+                title.rating_count += ratings[title.pk][1]
+                titles.append(title)
+            stats.extend(
+                TitleStats.objects.select_for_update()
+                .filter(title_id__in=chunk).order_by()
+            )
+        for row in stats:
+            _apply_stats_changes(
+                row, buckets[row.title_id], dates[row.title_id],
+                row.title_id in shrunk
+            )
+        update_rows(
+            Title,
+            [Title._meta.get_field('rating_sum'),
+             Title._meta.get_field('rating_count')],
+            titles
+        )
+        update_rows(TitleStats, stats_fields, stats)
+    missing = set(title_ids) - {row.title_id for row in stats}
+    if missing:
+        rebuild_title_stats(missing)
+
+
+def _actual_title_stats(title_ids=None):
+    """Сводки отзывов, посчитанные по таблице отзывов, по id произведения."""
+    reviews = Review.objects.order_by()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    rows = reviews.values('title_id').annotate(
+        review_count=Count('pk'),
+        last_review_at=Max('pub_date'),
+        **{
+            TitleStats.score_field(score): Count('pk', filter=Q(score=score))
+            for score in TitleStats.SCORES
+        }
+    )
+    stats = {}
+    for row in rows:
+        row['bayesian_rating'] = bayesian_rating({
+            score: row[TitleStats.score_field(score)]
+            for score in TitleStats.SCORES
+        })
+        row['trending_score'] = None
+        stats[row.pop('title_id')] = row
+    for title_id, pub_date in reviews.values_list(
+        'title_id', 'pub_date'
+    ).iterator():
+        stats[title_id]['trending_score'] = logaddexp(
+            stats[title_id]['trending_score'], trending_exponent(pub_date)
+        )
+    return stats
+
+
+def rebuild_title_stats(title_ids=None):
+    """
+    Пересоздаёт сводки отзывов по таблице отзывов для всех или
+    переданных произведений. Возвращает количество сводок.
+    """
+    titles = Title.objects.order_by('pk')
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    actual = _actual_title_stats(title_ids)
+    with transaction.atomic():
+        stats = TitleStats.objects.all()
+        if title_ids is not None:
+            stats = stats.filter(title_id__in=title_ids)
+        stats.delete()
+        created = TitleStats.objects.bulk_create(
+            (
+                TitleStats(title_id=title_id, **actual.get(title_id, {}))
+                for title_id in titles.values_list('pk', flat=True).iterator()
+            ),
+            batch_size=STATS_BATCH_SIZE,
+            # Параллельный первый отзыв мог уже создать сводку.
+            ignore_conflicts=True
+        )
+    return len(created)
+
+
+def _stats_match(stored, expected):
+    for field, value in expected.items():
+        if field in ('bayesian_rating', 'trending_score'):
+            # Рейтинги хранятся как float; у произведений без отзывов
+            # они не участвуют в ранжировании и не сравниваются.
+            if not expected['review_count']:
+                continue
+            if stored[field] is None or not math.isclose(
+                stored[field], value, rel_tol=1e-9
+            ):
+                return False
+        elif stored[field] != value:
+            return False
+    return True
+
+
+def find_stats_mismatches():
+    """
+    Возвращает id произведений, у которых сводка отзывов отсутствует
+    или расходится с отзывами.
+    """
+    actual = _actual_title_stats()
+    fields = [
+        'review_count', 'last_review_at', 'bayesian_rating', 'trending_score'
+    ] + [TitleStats.score_field(score) for score in TitleStats.SCORES]
+    stored = {
+        row.pop('title_id'): row
+        for row in TitleStats.objects.values('title_id', *fields)
+    }
+    empty = dict.fromkeys(fields, 0)
+    empty.update(
+        last_review_at=None, bayesian_rating=None, trending_score=None
+    )
+    mismatches = []
+    for title_id in Title.objects.order_by('pk').values_list('pk', flat=True):
+        # Отсутствующая сводка допустима у произведения без отзывов.
+        if not _stats_match(
+            stored.get(title_id, empty), actual.get(title_id, empty)
+        ):
+            mismatches.append(title_id)
+    return mismatches
@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from reviews.models import Comments, Review, Title
+
+# Модели и поля, по которым строится полнотекстовый индекс.
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+    Comments: ('text',),
+}
+
+
+def split_terms(query):
+    return [term for term in query.split() if term]
+
+
+class BaseSearchBackend:
+    """
+    Интерфейс поискового бэкенда.
+
+    search() возвращает queryset, отфильтрованный по запросу и
+    отсортированный по релевантности; search_keys() — подзапрос ключей
+    найденных объектов для условия pk__in; install() и rebuild() создают
+    и перестраивают индекс для всех моделей из SEARCH_FIELDS; deferred()
+    откладывает обновление индекса на время массовой записи.
+    """
+
+    def install(self, using='default'):
+        pass
+
+    def rebuild(self, using='default'):
+        pass
+
+    @contextmanager
+    def deferred(self, using='default'):
+        yield
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def search_keys(self, model, query, using='default'):
+        queryset = model._default_manager.using(using)
+        return self.search(queryset, query).order_by().values('pk')
+
+
+class ContainsSearchBackend(BaseSearchBackend):
+    """Запасной бэкенд без индекса: все слова запроса через icontains."""
+
+    def search(self, queryset, query):
+        terms = split_terms(query)
+        if not terms:
+            return queryset.none()
+        fields = SEARCH_FIELDS[queryset.model]
+        for term in terms:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Инвертированный индекс на SQLite FTS5.
+
+    Для каждой модели создаётся виртуальная таблица FTS5 с внешним
+    содержимым (content=таблица модели) и триггеры, которые синхронизируют
+    индекс при любой записи в таблицу — через ORM, bulk_create,
+    QuerySet.update() или сырой SQL.
+    """
+    tokenizer = 'unicode61 remove_diacritics 2'
+
+    @staticmethod
+    def fts_table(model):
+        return f'{model._meta.db_table}_fts'
+
+    def get_install_sql(self, model, fields):
+        table = model._meta.db_table
+        fts = self.fts_table(model)
+        columns = ', '.join(fields)
+        new_values = ', '.join(f'new.{field}' for field in fields)
+        old_values = ', '.join(f'old.{field}' for field in fields)
+        delete_old = (
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = (
+            f'INSERT INTO {fts}(rowid, {columns}) '
+            f'VALUES (new.id, {new_values});'
+        )
+        return [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+            f"content='{table}', content_rowid='id', "
+            f"tokenize='{self.tokenizer}')",
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} '
+            f'BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} '
+            f'BEGIN {delete_old} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au '
+            f'AFTER UPDATE OF {columns} ON {table} '
+            f'BEGIN {delete_old} {insert_new} END',
+        ]
+
+    def install(self, using='default'):
+        connection = connections[using]
+        existing = set(connection.introspection.table_names())
+        with connection.cursor() as cursor:
+            for model, fields in SEARCH_FIELDS.items():
+                fts = self.fts_table(model)
+                if fts in existing:
+                    continue
+                for sql in self.get_install_sql(model, fields):
+                    cursor.execute(sql)
+                cursor.execute(
+                    f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                )
+
+    def rebuild(self, using='default'):
+        with connections[using].cursor() as cursor:
+            for model in SEARCH_FIELDS:
+                fts = self.fts_table(model)
+                cursor.execute(
+                    f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                )
+
+    @contextmanager
+    def deferred(self, using='default'):
+        """
+        Удаляет триггеры индекса на время массовой записи, затем создаёт
+        их заново и перестраивает индекс одним проходом: это быстрее, чем
+        обновлять индекс триггером на каждую строку.
+        """
+        connection = connections[using]
+        existing = set(connection.introspection.table_names())
+        installed = {
+            model: fields for model, fields in SEARCH_FIELDS.items()
+            if self.fts_table(model) in existing
+        }
+        with connection.cursor() as cursor:
+            for model in installed:
+                fts = self.fts_table(model)
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                for model, fields in installed.items():
+                    # Первая команда создаёт саму таблицу индекса.
+                    for sql in self.get_install_sql(model, fields)[1:]:
+                        cursor.execute(sql)
+                    fts = self.fts_table(model)
+                    cursor.execute(
+                        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"
+                    )
+
+    @staticmethod
+    def to_match_query(query):
+        # Каждое слово берётся в кавычки, чтобы пользовательский ввод
+        # не интерпретировался как синтаксис FTS5.
+        return ' '.join(
+            '"{}"'.format(term.replace('"', '""'))
+            for term in split_terms(query)
+        )
+
+    def search(self, queryset, query):
+        match = self.to_match_query(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        fts = self.fts_table(queryset.model)
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'{fts}.rank'},
+        ).order_by('search_rank', 'pk')
+
+    def search_keys(self, model, query, using='default'):
+        # Ключи читаются из индекса без таблицы модели: в подзапросе
+        # Django переименовывает её, и условия search() не подходят.
+        match = self.to_match_query(query)
+        if not match:
+            return model._default_manager.none().values('pk')
+        fts = self.fts_table(model)
+        return RawSQL(
+            f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match]
+        )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(using='default'):
+    """
+    Бэкенд из настройки SEARCH_BACKEND; по умолчанию FTS5 для SQLite
+    и поиск через icontains для остальных СУБД.
+    """
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connections[using].vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    return ContainsSearchBackend()
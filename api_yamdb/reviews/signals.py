@@ -0,0 +1,84 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title, TitleStats
+from reviews.ratings import (apply_review_change, apply_score_delta,
+                             apply_stats_delta, rebuild_ratings,
+                             rebuild_title_stats)
+from reviews.search import get_search_backend
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw=False, **kwargs):
+    """Создаёт пустую сводку отзывов вместе с произведением."""
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw=False,
+                                 **kwargs):
+    """
+    Поддерживает рейтинг и сводку отзывов произведения при создании
+    и правке отзыва.
+    """
+    if raw:
+        return
+    if created:
+        apply_review_change(
+            instance.title_id, instance.score, instance.pub_date
+        )
+    else:
+        old_title_id = getattr(instance, '_loaded_title_id', None)
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_title_id is None or old_score is None:
+            # Исходная оценка неизвестна: пересчитываем по отзывам.
+            rebuild_ratings([instance.title_id])
+            rebuild_title_stats([instance.title_id])
+        else:
+            apply_review_change(
+                instance.title_id,
+                instance.score,
+                instance.pub_date,
+                old_title_id,
+                old_score
+            )
+    instance._loaded_title_id = instance.title_id
+    instance._loaded_score = instance.score
+
+
+def loaded_value(instance, attname):
+    """
+    Значение поля на момент загрузки из базы или, если его не
+    загружали, текущее; None — значение неизвестно без запроса к базе.
+    """
+    value = getattr(instance, f'_loaded_{attname}', None)
+    if value is None:
+        value = instance.__dict__.get(attname)
+    return value
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """
+    Вычитает оценку удалённого отзыва из рейтинга и сводки, в том числе
+    при каскадном удалении вместе с пользователем.
+    """
+    title_id = loaded_value(instance, 'title_id')
+    score = loaded_value(instance, 'score')
+    if title_id is None or score is None:
+        # Отзыв загружен с отложенными полями, а строки в базе уже нет:
+        # пересчитываем по оставшимся отзывам.
+        title_ids = None if title_id is None else [title_id]
+        rebuild_ratings(title_ids)
+        rebuild_title_stats(title_ids)
+        return
+    apply_score_delta(title_id, -score, -1)
+    apply_stats_delta(title_id, removed=score)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using='default', **kwargs):
+    """Создаёт поисковый индекс после создания таблиц приложения."""
+    if sender.name == 'reviews':
+        get_search_backend(using).install(using)
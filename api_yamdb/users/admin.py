@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from users.models import User
+from core.admin import LargeTableAdminMixin
+from users.models import OutgoingEmail, User
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = (
         'username',
         'email',
@@ -14,7 +15,7 @@ class CustomUserAdmin(UserAdmin):
         'role',
         'is_staff'
     )
-    search_fields = ('username', 'email')
+    search_fields = ('^username', '=email')
     list_filter = ('role',)
     empty_value_display = '-пусто-'
     list_editable = ('role',)
@@ -35,3 +36,18 @@ class CustomUserAdmin(UserAdmin):
         }),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient',
+        'subject',
+        'status',
+        'attempts',
+        'next_attempt_at',
+        'sent_at'
+    )
+    list_filter = ('status',)
+    search_fields = ('=recipient',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
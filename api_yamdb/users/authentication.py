@@ -0,0 +1,53 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import get_cache
+
+USER_CACHE_EPOCH_KEY = 'auth:user:epoch'
+
+
+def user_cache_key(user_id):
+    cache = get_cache()
+    epoch = cache.get(USER_CACHE_EPOCH_KEY)
+    if epoch is None:
+        cache.add(USER_CACHE_EPOCH_KEY, 0, None)
+        epoch = cache.get(USER_CACHE_EPOCH_KEY, 0)
+    return f'auth:user:{epoch}:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    get_cache().delete(user_cache_key(user_id))
+
+
+def invalidate_all_cached_users():
+    cache = get_cache()
+    cache.add(USER_CACHE_EPOCH_KEY, 0, None)
+    try:
+        cache.incr(USER_CACHE_EPOCH_KEY)
+    except ValueError:
+        cache.set(USER_CACHE_EPOCH_KEY, 1, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая хранит пользователя в кэше.
+
+    Пользователь кэшируется по id на AUTH_USER_CACHE_TIMEOUT секунд и
+    удаляется из кэша при сохранении или удалении модели (API, /users/me/,
+    админка), поэтому смена роли или блокировка действуют сразу во всех
+    процессах, если кэш общий (см. users.checks).
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        if user_id is None or timeout <= 0:
+            return super().get_user(validated_token)
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout)
+        return user
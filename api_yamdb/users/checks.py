@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_auth_user_cache(app_configs, **kwargs):
+    """
+    Кэш JWT-аутентификации сбрасывается только в процессе, который
+    изменил пользователя: с кэшем в памяти процесса остальные воркеры
+    пускали бы заблокированного пользователя до истечения таймаута.
+    """
+    if getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0) <= 0:
+        return []
+    alias = getattr(settings, 'API_CACHE_ALIAS', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [
+        Error(
+            f'Кэш {alias!r} хранится в памяти процесса, а пользователи '
+            'JWT-аутентификации должны кэшироваться в общем кэше.',
+            hint=(
+                'Задайте общий бэкенд кэша (Redis, Memcached) или '
+                'AUTH_USER_CACHE_TIMEOUT = 0.'
+            ),
+            id='users.E001',
+        )
+    ]
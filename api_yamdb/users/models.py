@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -34,6 +35,13 @@ class User(AbstractUser):
         verbose_name='Confirmation code'
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Смена username меняет ответы с отзывами и комментариями автора.
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_superuser
@@ -49,3 +57,70 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку воркером send_emails."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='Subject'
+    )
+    body = models.TextField(verbose_name='Body')
+    from_email = models.EmailField(
+        max_length=254,
+        verbose_name='From'
+    )
+    recipient = models.EmailField(
+        max_length=254,
+        verbose_name='Recipient'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Status'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Attempts'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Next attempt at'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Last error'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created at'
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Sent at'
+    )
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoing_email_queue_idx'
+            ),
+        ]
+        verbose_name = 'Outgoing email'
+        verbose_name_plural = 'Outgoing emails'
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    """
+    Ставит письмо в очередь. Вызывается в транзакции вместе с изменением
+    данных, поэтому письмо уходит только после её фиксации.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient=recipient
+    )
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60)
+    limit = getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 60 * 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), limit))
+
+
+def claim_pending(batch_size):
+    """
+    Забирает пачку писем в короткой транзакции: next_attempt_at
+    сдвигается на EMAIL_OUTBOX_CLAIM_TIMEOUT, поэтому другие воркеры их не
+    берут, а письма упавшего воркера вернутся в очередь сами.
+    """
+    now = timezone.now()
+    timeout = getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 10 * 60)
+    with transaction.atomic():
+        queue = OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=now
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            # Несколько воркеров разбирают разные пачки.
+            queue = queue.select_for_update(skip_locked=True)
+        emails = list(queue[:batch_size])
+        if emails:
+            OutgoingEmail.objects.filter(
+                pk__in=[email.pk for email in emails]
+            ).update(next_attempt_at=now + timedelta(seconds=timeout))
+    return emails
+
+
+def record_failure(email, error):
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = (
+            timezone.now() + get_retry_delay(email.attempts)
+        )
+
+
+def record_success(email):
+    email.attempts += 1
+    email.status = OutgoingEmail.SENT
+    email.sent_at = timezone.now()
+    email.last_error = ''
+
+
+def send_claimed(emails, mail_connection):
+    """Отправляет письма через открытое соединение."""
+    sent = 0
+    for email in emails:
+        message = EmailMessage(
+            email.subject,
+            email.body,
+            email.from_email,
+            [email.recipient],
+            connection=mail_connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            record_failure(email, error)
+        else:
+            record_success(email)
+            sent += 1
+    return sent
+
+
+def deliver_pending(batch_size=100):
+    """
+    Отправляет одну пачку писем через одно SMTP-соединение.
+
+    Возвращает количество отправленных и неотправленных писем. Письма
+    забираются и результаты записываются в отдельных коротких
+    транзакциях, а отправка идёт вне транзакции и не держит блокировку
+    записи базы. Если соединение не открылось, попытка засчитывается всей
+    пачке. Неудачные письма откладываются с экспоненциальной задержкой,
+    после EMAIL_OUTBOX_MAX_ATTEMPTS попыток получают статус failed.
+    """
+    emails = claim_pending(batch_size)
+    if not emails:
+        return 0, 0
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for email in emails:
+            record_failure(email, error)
+        sent = 0
+    else:
+        try:
+            sent = send_claimed(emails, mail_connection)
+        finally:
+            try:
+                mail_connection.close()
+            except Exception:
+                # Письма уже отправлены, ошибка закрытия не важна.
+                pass
+
+    with transaction.atomic():
+        OutgoingEmail.objects.bulk_update(
+            emails,
+            ('status', 'attempts', 'next_attempt_at', 'last_error',
+             'sent_at')
+        )
+    return sent, len(emails) - sent
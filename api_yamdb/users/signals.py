@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from users.authentication import (invalidate_all_cached_users,
+                                  invalidate_cached_user)
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_migrate)
+def invalidate_users_cache(sender, **kwargs):
+    if sender.name == 'users':
+        invalidate_all_cached_users()
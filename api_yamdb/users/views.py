@@ -1,6 +1,6 @@
 import uuid
 
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
@@ -10,6 +10,7 @@ from rest_framework_simplejwt.tokens import AccessToken
 from api.permissions import IsAdmin
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
 from users.models import User
+from users.outbox import enqueue_email
 from users.serializers import (TokenSerializer, UserCreateSerializer,
                                UserEditSerializer, UserSerializer)
 
@@ -40,19 +41,20 @@ def signup(request):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    user, _ = User.objects.get_or_create(username=username, email=email)
+    with transaction.atomic():
+        user, _ = User.objects.get_or_create(username=username, email=email)
 
-    code = str(uuid.uuid4())
-    user.confirmation_code = code
-    user.save()
+        code = str(uuid.uuid4())
+        user.confirmation_code = code
+        user.save()
 
-    send_mail(
-        'Код подтверждения YaMDb',
-        f'Код подтверждения: {code}',
-        DEFAULT_FROM_EMAIL,
-        [email],
-        fail_silently=False,
-    )
+        # Письмо отправляет воркер send_emails, signup не ждёт SMTP.
+        enqueue_email(
+            'Код подтверждения YaMDb',
+            f'Код подтверждения: {code}',
+            email,
+            from_email=DEFAULT_FROM_EMAIL
+        )
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -84,6 +86,7 @@ class UserViewSet(viewsets.ModelViewSet):
     """Вьюсет для обработки запросов к модели User."""
 
     queryset = User.objects.all()
+    count_estimate_threshold = 100000
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
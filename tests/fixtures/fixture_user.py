@@ -109,3 +109,9 @@ def user_client(token_user):
     client = APIClient()
     client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
     return client
+
+
+@pytest.fixture
+def auth_user_cache(settings):
+    # Тесты идут в одном процессе, поэтому кэш в памяти для них общий.
+    settings.AUTH_USER_CACHE_TIMEOUT = 60
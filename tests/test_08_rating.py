@@ -0,0 +1,183 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, client, admin,
+                                       user_client, user, moderator_client,
+                                       moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения учитывает новые отзывы.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None, (
+            'Проверьте, что у произведения без отзывов рейтинг равен `None`.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin,
+                                            user_client, user):
+        from reviews.models import Title
+
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        call_command('recalculate_ratings', '--check')
+
+        Title.objects.filter(pk=titles[0]['id']).update(rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+
+        call_command('recalculate_ratings')
+        call_command('recalculate_ratings', '--check')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'сумму и количество оценок по отзывам.'
+        )
+
+    def test_03_title_stats(self, admin_client, client, admin, user_client,
+                            user, moderator_client, django_assert_num_queries):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        url += 'stats/'
+        # Версии таблиц для ETag и одна строка сводки.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` доступен без авторизации '
+            'и читает одну строку сводки.'
+        )
+        stats = response.json()
+        assert stats['review_count'] == 2
+        assert stats['scores']['5'] == 2
+        assert sum(stats['scores'].values()) == 2
+        assert stats['rating'] == 5
+        assert stats['last_review_at'] is not None
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        stats = client.get(url).json()
+        assert (stats['scores']['5'], stats['scores']['9']) == (1, 1), (
+            'Проверьте, что при изменении оценки сводка переносит отзыв '
+            'в другой балл.'
+        )
+
+        moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        user.delete()
+        stats = client.get(url).json()
+        assert stats['review_count'] == 0
+        assert stats['last_review_at'] is None, (
+            'Проверьте, что после удаления всех отзывов дата последнего '
+            'отзыва сбрасывается.'
+        )
+        assert stats['rating'] is None
+        call_command('recalculate_ratings', '--check')
+
+        empty = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+            + 'stats/'
+        )
+        assert empty.status_code == HTTPStatus.OK
+        assert empty.json()['review_count'] == 0
+        assert client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=10 ** 6) + 'stats/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_recalculate_title_stats(self, admin_client, admin,
+                                        user_client, user):
+        from reviews.models import TitleStats
+
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        TitleStats.objects.all().delete()
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+        call_command('recalculate_ratings')
+        call_command('recalculate_ratings', '--check')
+        stats = TitleStats.objects.get(title_id=titles[0]['id'])
+        assert (stats.review_count, stats.score_5) == (2, 2), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'сводку отзывов.'
+        )
+
+    def test_05_delete_deferred_review(self, admin_client, admin,
+                                       user_client, user):
+        from reviews.models import Review, TitleStats
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        Review.objects.only('id').get(pk=reviews[0]['id']).delete()
+        Review.objects.only('id', 'title').get(pk=reviews[1]['id']).delete()
+        stats = TitleStats.objects.get(title_id=titles[0]['id'])
+        assert stats.review_count == 0, (
+            'Проверьте, что удаление отзыва с отложенными полями '
+            'обновляет сводку отзывов.'
+        )
+        assert self.get_rating(admin_client, titles[0]['id']) is None
+        call_command('recalculate_ratings', '--check')
@@ -0,0 +1,164 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_comment, create_single_review
+
+
+def create_catalog(titles_count):
+    from reviews.models import Category, Genre, GenreTitle, Title
+    from reviews.ratings import rebuild_title_stats
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(titles_count)
+    )
+    titles = Title.objects.order_by('pk')
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles
+        for genre in genres
+    )
+    # bulk_create не вызывает сигналов: сводки строятся, как в import_csv.
+    rebuild_title_stats()
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Queries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('titles_count', (1, 10))
+    @pytest.mark.parametrize(
+        'query', ('', '?genre=drama', '?category=films', '?year=2000')
+    )
+    def test_01_title_list_query_count(self, client, titles_count, query,
+                                       django_assert_num_queries):
+        create_catalog(titles_count)
+        client.get(self.TITLES_URL + query)
+        # Версии таблиц, COUNT для пагинации взят из кэша: выборка
+        # произведений с категориями и один запрос для жанров всей страницы.
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL + query)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == titles_count
+        assert all(
+            len(title['genre']) == 2 and title['category']
+            for title in results
+        ), (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит категорию и жанры произведений.'
+        )
+
+    def test_02_title_detail_query_count(self, client,
+                                         django_assert_num_queries):
+        title = create_catalog(1)[0]
+        with django_assert_num_queries(3):
+            response = client.get(f'{self.TITLES_URL}{title.pk}/')
+        assert response.status_code == HTTPStatus.OK
+
+    @pytest.mark.usefixtures('auth_user_cache')
+    def test_03_review_and_comment_create_query_count(
+            self, user_client, django_assert_num_queries):
+        title = create_catalog(1)[0]
+        # Первый запрос кладёт пользователя в кэш аутентификации.
+        user_client.get('/api/v1/users/me/')
+        # Произведение, проверка повторного отзыва, вставка отзыва,
+        # обновление рейтинга, сводки отзывов и версии таблицы.
+        with django_assert_num_queries(6):
+            review = create_single_review(user_client, title.pk, 'Отзыв', 7)
+        # Отзыв вместе с проверкой произведения, проверка повторного
+        # комментария, вставка и версия таблицы.
+        with django_assert_num_queries(4):
+            create_single_comment(
+                user_client, title.pk, review.json()['id'], 'Комментарий'
+            )
+
+    def test_04_comment_of_other_title_not_found(self, user_client):
+        first, second = create_catalog(2)
+        review = create_single_review(user_client, first.pk, 'Отзыв', 7)
+        response = user_client.get(
+            f'{self.TITLES_URL}{second.pk}/reviews/'
+            f'{review.json()["id"]}/comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву недоступны по адресу '
+            'другого произведения.'
+        )
+
+
+def find_full_scans(sql):
+    """
+    Возвращает таблицы, которые запрос читает полным перебором.
+
+    Перебор таблицы в порядке первичного ключа без условий и сортировки
+    (список с LIMIT) полным сканированием не считается.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        plan = [row[-1] for row in cursor.fetchall()]
+    sorts = any('USE TEMP B-TREE FOR ORDER BY' in line for line in plan)
+    filtered = ' WHERE ' in sql
+    return [
+        match.group(1)
+        for match in map(re.compile(r'^SCAN (\w+)$').match, plan)
+        if match and (sorts or filtered)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryPlans:
+
+    def get_urls(self, title, review, comment, username):
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        comments_url = f'{reviews_url}{review.pk}/comments/'
+        return (
+            '/api/v1/titles/',
+            '/api/v1/titles/?genre=drama',
+            '/api/v1/titles/?category=films',
+            '/api/v1/titles/?year=2000',
+            '/api/v1/titles/?year=2000&genre=drama&category=films',
+            f'/api/v1/titles/{title.pk}/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            reviews_url,
+            f'{reviews_url}?pagination=cursor',
+            f'{reviews_url}{review.pk}/',
+            comments_url,
+            f'{comments_url}?pagination=cursor',
+            f'{comments_url}{comment.pk}/',
+            '/api/v1/users/',
+            f'/api/v1/users/{username}/',
+            '/api/v1/users/me/',
+        )
+
+    def test_01_no_full_table_scans(self, admin_client, admin):
+        from reviews.models import Comments, Review
+
+        title = create_catalog(3)[0]
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5
+        )
+        comment = Comments.objects.create(
+            review=review, author=admin, text='Комментарий'
+        )
+        for url in self.get_urls(title, review, comment, admin.username):
+            with CaptureQueriesContext(connection) as captured:
+                response = admin_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            for query in captured.captured_queries:
+                scans = find_full_scans(query['sql'])
+                assert not scans, (
+                    f'Запрос эндпоинта `{url}` полностью сканирует '
+                    f'таблицы {scans}: {query["sql"]}'
+                )
@@ -0,0 +1,46 @@
+import csv
+import os
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ImportCSV:
+
+    def test_01_import_all_files(self, django_user_model):
+        from reviews.models import (Category, Comments, Genre, GenreTitle,
+                                    Review, Title)
+
+        call_command('import_csv', '--batch-size', '7')
+
+        expected = (
+            ('users.csv', django_user_model),
+            ('category.csv', Category),
+            ('genre.csv', Genre),
+            ('titles.csv', Title),
+            ('genre_title.csv', GenreTitle),
+            ('review.csv', Review),
+            ('comments.csv', Comments),
+        )
+        for filename, model in expected:
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{filename}`.'
+            )
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что команда `import_csv` сохраняет дату публикации '
+            'отзыва из CSV.'
+        )
+        call_command('recalculate_ratings', '--check')
@@ -0,0 +1,290 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+
+from tests.utils import create_categories
+
+
+def other_process_cache():
+    """
+    Запись как из другого процесса: у него свой локальный кэш, общего с
+    сервером только база.
+    """
+    return override_settings(
+        CACHES={
+            **settings.CACHES,
+            'other': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'other-process',
+            },
+        },
+        API_CACHE_ALIAS='other'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ListCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    STATS_URL = '/api/v1/stats/cache/'
+
+    def test_01_list_served_from_cache(self, admin_client, client,
+                                       django_assert_num_queries):
+        create_categories(admin_client)
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        # Только чтение версий таблиц.
+        with django_assert_num_queries(1):
+            cached = client.get(self.CATEGORY_URL)
+        assert cached['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'обслуживается из кэша.'
+        )
+        assert cached.json() == response.json()
+
+        response = client.get(self.CATEGORY_URL, {'search': 'Фильм'})
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
+
+    def test_02_cache_invalidated_on_write(self, admin_client, client):
+        from reviews.models import Category
+
+        categories = create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+
+        response = admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кэш списка.'
+        )
+
+        admin_client.delete(f'{self.CATEGORY_URL}{categories[0]["slug"]}/')
+        assert client.get(self.CATEGORY_URL).json()['count'] == 2, (
+            'Проверьте, что удаление категории сбрасывает кэш списка.'
+        )
+
+        Category.objects.filter(slug='music').get().delete()
+        assert client.get(self.CATEGORY_URL).json()['count'] == 1, (
+            'Проверьте, что удаление категории в обход API сбрасывает кэш.'
+        )
+
+        call_command('import_csv')
+        assert client.get(self.CATEGORY_URL).json()['count'] == 4, (
+            'Проверьте, что команда `import_csv` сбрасывает кэш списков.'
+        )
+
+    def test_03_cache_stats(self, admin_client, user_client, client):
+        client.get(self.CATEGORY_URL)
+        client.get(self.CATEGORY_URL)
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()['categories']
+        assert stats['hits'] >= 1 and stats['misses'] >= 1
+
+    def test_04_invalidated_from_other_process(self, admin_client, client):
+        from reviews.models import Category
+
+        create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+        assert client.get(self.CATEGORY_URL)['X-Cache'] == 'HIT'
+        with other_process_cache():
+            category = Category.objects.get(slug='films')
+            category.name = 'Переименовано'
+            category.save()
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что версии таблиц общие для всех процессов и '
+            'запись из другого процесса сбрасывает кэш списка.'
+        )
+        assert 'Переименовано' in [
+            item['name'] for item in response.json()['results']
+        ]
+
+    def test_05_cascade_delete_bumps_each_table_once(
+            self, admin, django_assert_num_queries):
+        from core.cache import get_table_versions
+        from reviews.models import Comments, Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5
+        )
+        Comments.objects.bulk_create(
+            Comments(review=review, author=admin, text=f'Комментарий {idx}')
+            for idx in range(50)
+        )
+        tables = (Review._meta.db_table, Comments._meta.db_table)
+        before = get_table_versions(tables)
+        # BEGIN, выборка и удаление комментариев, удаление отзыва, три
+        # запроса пересчёта рейтинга и сводки и по UPDATE версии на таблицу
+        # вместо UPDATE на каждый комментарий.
+        with django_assert_num_queries(9):
+            review.delete()
+        after = get_table_versions(tables)
+        assert all(after[table][0] > before[table][0] for table in tables), (
+            'Проверьте, что каскадное удаление сбрасывает версии таблиц.'
+        )
+
+    def test_06_versions_bumped_once_per_transaction(
+            self, django_assert_num_queries):
+        from django.db import IntegrityError, transaction
+
+        from core.cache import get_table_versions
+        from reviews.models import Category
+
+        table = Category._meta.db_table
+
+        def version():
+            return get_table_versions([table])[table][0]
+
+        with transaction.atomic():
+            with django_assert_num_queries(3):
+                Category.objects.create(name='Фильм', slug='films')
+                Category.objects.create(name='Книга', slug='books')
+            read = version()
+            Category.objects.create(name='Музыка', slug='music')
+            assert version() > read, (
+                'Проверьте, что запись после чтения версии в той же '
+                'транзакции снова увеличивает версию.'
+            )
+            read = version()
+            with pytest.raises(IntegrityError):
+                with transaction.atomic():
+                    Category.objects.create(name='Игры', slug='games')
+                    Category.objects.create(name='Игры', slug='games')
+            Category.objects.create(name='Игры', slug='games')
+        assert version() > read, (
+            'Проверьте, что откат точки сохранения не отменяет увеличение '
+            'версии при следующей записи.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('auth_user_cache')
+class Test11UserCache:
+
+    ME_URL = '/api/v1/users/me/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_authenticated_user_cached(self, user_client,
+                                          django_assert_num_queries):
+        user_client.get(self.ME_URL)
+        with django_assert_num_queries(0):
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь JWT-токена берётся из кэша.'
+        )
+
+    def test_02_role_change_applies_immediately(self, admin_client,
+                                                user_client, user):
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли сбрасывает пользователя в кэше '
+            'аутентификации.'
+        )
+
+    def test_03_blocked_and_deleted_users_rejected(self, user_client, user):
+        user_client.get(self.ME_URL)
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что заблокированный пользователь сбрасывается из кэша.'
+
+        user.is_active = True
+        user.save()
+        assert user_client.get(self.ME_URL).status_code == HTTPStatus.OK
+        user.delete()
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что удалённый пользователь сбрасывается из кэша.'
+
+    def test_04_local_cache_rejected(self, settings):
+        from users.checks import check_auth_user_cache
+
+        errors = check_auth_user_cache(None)
+        assert [error.id for error in errors] == ['users.E001'], (
+            'Проверьте, что кэш пользователей в памяти процесса '
+            'не проходит системную проверку.'
+        )
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            }
+        }
+        assert check_auth_user_cache(None) == []
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        }
+        settings.AUTH_USER_CACHE_TIMEOUT = 0
+        assert check_auth_user_cache(None) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CountCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def count_queries(self, captured):
+        return sum(
+            'COUNT(' in query['sql'] for query in captured.captured_queries
+        )
+
+    def test_01_count_cached_until_write(self, admin_client, client,
+                                         django_assert_num_queries):
+        from tests.utils import create_titles
+
+        create_titles(admin_client)
+        assert client.get(self.TITLES_URL).json()['count'] == 2
+        with django_assert_num_queries(3) as captured:
+            response = client.get(self.TITLES_URL)
+        assert self.count_queries(captured) == 0, (
+            f'Проверьте, что COUNT для `{self.TITLES_URL}` берётся из кэша.'
+        )
+        assert response.json()['count'] == 2
+
+        title_id = response.json()['results'][0]['id']
+        admin_client.delete(f'{self.TITLES_URL}{title_id}/')
+        assert client.get(self.TITLES_URL).json()['count'] == 1, (
+            'Проверьте, что кэш COUNT сбрасывается при изменении таблицы.'
+        )
+
+    def test_02_estimated_count(self, admin_client, client, monkeypatch):
+        from api.views import TitleViewSet
+        from reviews.models import Title
+        from tests.utils import create_titles
+
+        monkeypatch.setattr(
+            TitleViewSet, 'count_cache_timeout', 0, raising=False
+        )
+        monkeypatch.setattr(TitleViewSet, 'count_estimate_threshold', 2)
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        response = client.get(self.TITLES_URL)
+        # Оценка по максимальному id не учитывает удалённую строку.
+        assert response.json()['count'] == titles[1]['id'], (
+            'Проверьте, что для больших таблиц без фильтров используется '
+            'оценка количества строк.'
+        )
+        response = client.get(self.TITLES_URL, {'year': titles[1]['year']})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что для запросов с фильтрами считается точный COUNT.'
+        )
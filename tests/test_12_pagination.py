@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def create_title_with_reviews(django_user_model, reviews_count):
+    from reviews.models import Comments, Review, Title
+
+    title = Title.objects.create(name='Произведение', year=2000)
+    users = [
+        django_user_model.objects.create_user(
+            username=f'reviewer{idx}', email=f'reviewer{idx}@yamdb.fake'
+        )
+        for idx in range(reviews_count)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=title, author=user, text=f'Отзыв {idx}', score=5
+        )
+        for idx, user in enumerate(users)
+    ]
+    for idx, user in enumerate(users):
+        Comments.objects.create(
+            review=reviews[0], author=user, text=f'Комментарий {idx}'
+        )
+    return title, reviews
+
+
+def collect_pages(client, url):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        results.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return results, data
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_cursor_mode_matches_page_mode(self, client,
+                                              django_user_model):
+        title, reviews = create_title_with_reviews(django_user_model, 23)
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title.id, review_id=reviews[0].id
+            ),
+        )
+        for url in urls:
+            page_ids, page_data = collect_pages(client, url)
+            assert 'count' in page_data, (
+                f'Проверьте, что по умолчанию `{url}` возвращает ответ '
+                'постраничной пагинации с ключом `count`.'
+            )
+            cursor_ids, cursor_data = collect_pages(
+                client, url + '?pagination=cursor'
+            )
+            assert 'count' not in cursor_data, (
+                f'Проверьте, что параметр `pagination=cursor` включает '
+                f'курсорную пагинацию для `{url}`.'
+            )
+            assert cursor_ids == page_ids and len(set(cursor_ids)) == 23, (
+                f'Проверьте, что курсорная пагинация `{url}` возвращает те '
+                'же объекты в том же порядке без повторов.'
+            )
+
+    def test_02_cursor_mode_skips_count(self, client, django_user_model,
+                                        django_assert_num_queries):
+        title, _ = create_title_with_reviews(django_user_model, 3)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        with django_assert_num_queries(3) as captured:
+            client.get(url, {'pagination': 'cursor'})
+        assert not any(
+            'COUNT(' in query['sql'] for query in captured.captured_queries
+        )
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Search:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEW_SEARCH_URL = '/api/v1/search/reviews/'
+    COMMENT_SEARCH_URL = '/api/v1/search/comments/'
+
+    def search_titles(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_title_search(self, admin_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        assert self.search_titles(client, 'терминатор') == ['Терминатор'], (
+            f'Проверьте, что параметр `q` эндпоинта `{self.TITLES_URL}` '
+            'ищет по названию произведения без учёта регистра.'
+        )
+        assert self.search_titles(client, 'yippie') == ['Крепкий орешек'], (
+            f'Проверьте, что параметр `q` эндпоинта `{self.TITLES_URL}` '
+            'ищет по описанию произведения.'
+        )
+
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'name': 'Чужой'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.search_titles(client, 'терминатор') == []
+        assert self.search_titles(client, 'чужой') == ['Чужой'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+
+        Title.objects.filter(pk=titles[1]['id']).delete()
+        assert self.search_titles(client, 'yippie') == []
+
+    def test_02_title_search_ranking(self, admin_client, client):
+        create_titles(admin_client)
+        for name, description in (
+            ('Орешек', 'Орешек орешек орешек'),
+            ('Щелкунчик', 'Балет про орешек'),
+        ):
+            admin_client.post(self.TITLES_URL, data={
+                'name': name,
+                'year': 1990,
+                'genre': ['drama'],
+                'category': 'films',
+                'description': description,
+            })
+        found = self.search_titles(client, 'орешек')
+        assert sorted(found) == ['Крепкий орешек', 'Орешек', 'Щелкунчик']
+        assert found[0] == 'Орешек', (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+
+    def test_03_review_and_comment_search(self, admin_client, client,
+                                          admin, user_client, user):
+        create_reviews(admin_client, {admin: admin_client, user: user_client})
+        response = client.get(self.REVIEW_SEARCH_URL, {'q': 'number 2'})
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [review['text'] for review in results] == ['review number 2'], (
+            f'Проверьте, что эндпоинт `{self.REVIEW_SEARCH_URL}` ищет по '
+            'тексту отзывов.'
+        )
+        response = client.get(self.REVIEW_SEARCH_URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.get(self.COMMENT_SEARCH_URL, {'q': 'comment'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0
@@ -0,0 +1,119 @@
+from http import HTTPStatus
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+
+class FailingEmailBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise SMTPException('SMTP недоступен')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Соединение не открыто')
+
+
+class TransactionCheckingEmailBackend(BaseEmailBackend):
+    in_transaction = []
+
+    def send_messages(self, email_messages):
+        self.in_transaction.append(connection.in_atomic_block)
+        return len(email_messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    SIGNUP_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import OutgoingEmail
+
+        response = client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что signup не отправляет письмо во время запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == self.SIGNUP_DATA['email']
+        assert email.status == OutgoingEmail.PENDING
+
+        call_command('send_emails', '--once')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.SENT
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [self.SIGNUP_DATA['email']]
+
+    def test_02_failed_delivery_retried_with_backoff(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_email_outbox.FailingEmailBackend'
+        )
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+
+        call_command('send_emails', '--once')
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.attempts == 1
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается.'
+        )
+        assert 'SMTP' in email.last_error
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_emails', '--once')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после исчерпания попыток письмо получает '
+            'статус failed.'
+        )
+
+    def test_03_unreachable_server(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_email_outbox.UnreachableEmailBackend'
+        )
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        client.post(
+            self.URL_SIGNUP,
+            data={'email': 'second@yamdb.fake', 'username': 'second'}
+        )
+        call_command('send_emails', '--once')
+        for email in OutgoingEmail.objects.all():
+            assert email.status == OutgoingEmail.PENDING
+            assert email.attempts == 1, (
+                'Проверьте, что недоступный SMTP-сервер засчитывается как '
+                'неудачная попытка для всей пачки.'
+            )
+            assert email.next_attempt_at > timezone.now()
+            assert 'refused' in email.last_error
+
+    def test_04_sent_outside_transaction(self, client, settings):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_14_email_outbox.TransactionCheckingEmailBackend'
+        )
+        TransactionCheckingEmailBackend.in_transaction.clear()
+        client.post(self.URL_SIGNUP, data=self.SIGNUP_DATA)
+        call_command('send_emails', '--once')
+        assert TransactionCheckingEmailBackend.in_transaction == [False], (
+            'Проверьте, что письма отправляются вне транзакции и не держат '
+            'блокировку базы.'
+        )
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.SENT
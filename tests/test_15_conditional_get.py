@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.test_11_cache import other_process_cache
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_etag_not_modified(self, admin_client, client,
+                                  django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        urls = (
+            self.TITLES_URL,
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response.get('ETag')
+            assert etag and response.get('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            # Только чтение версий таблиц.
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            assert response['ETag'] == etag
+
+    def test_02_etag_changes_on_write(self, admin_client, client,
+                                      user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        response = client.get(url)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag произведения, '
+            'так как меняется его рейтинг.'
+        )
+        assert response.json()['rating'] == 8
+        assert response['ETag'] != etag
+
+    def test_03_etag_changes_on_write_from_other_process(self, admin_client,
+                                                         client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        with other_process_cache():
+            title = Title.objects.get(pk=titles[0]['id'])
+            title.name = 'RENAMED'
+            title.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag вычисляется по общим для всех процессов '
+            'версиям таблиц.'
+        )
+        assert response.json()['name'] == 'RENAMED'
+
+    def test_04_etag_per_resource(self, admin_client, client, user_client,
+                                  moderator_client, user,
+                                  django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        review = create_single_review(
+            user_client, titles[0]['id'], 'А', 5
+        ).json()
+        other = create_single_review(
+            moderator_client, titles[0]['id'], 'Б', 6
+        ).json()
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        other_comments_url = f'{reviews_url}{other["id"]}/comments/'
+        urls = (title_url, reviews_url, comments_url, other_comments_url)
+
+        def etags():
+            return {url: client.get(url)['ETag'] for url in urls}
+
+        before = etags()
+        create_single_review(
+            user_client, titles[1]['id'], 'Другое произведение', 9
+        )
+        django_user_model.objects.create(
+            username='newbie', email='newbie@yamdb.fake'
+        )
+        user.bio = 'Новая биография'
+        user.save()
+        assert etags() == before, (
+            'Проверьте, что ETag зависит от версий ресурса, а не от версий '
+            'всей таблицы: отзыв на другое произведение и новые '
+            'пользователи его не меняют.'
+        )
+
+        response = user_client.post(comments_url, data={'text': 'Ответ'})
+        assert response.status_code == HTTPStatus.CREATED
+        after = etags()
+        assert after[other_comments_url] == before[other_comments_url], (
+            'Проверьте, что комментарий к отзыву не меняет ETag '
+            'комментариев другого отзыва.'
+        )
+        assert after[comments_url] != before[comments_url]
+
+        response = user_client.patch(
+            f'{reviews_url}{review["id"]}/', data={'text': 'Правка'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        before, after = after, etags()
+        assert after[reviews_url] != before[reviews_url], (
+            'Проверьте, что правка отзыва меняет ETag списка отзывов.'
+        )
+
+        user.username = 'renamed'
+        user.save()
+        before, after = after, etags()
+        assert after[reviews_url] != before[reviews_url], (
+            'Проверьте, что смена username автора меняет ETag отзывов.'
+        )
+        assert after[comments_url] != before[comments_url]
@@ -0,0 +1,106 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.middleware import QueryRecorder
+from reviews.models import Category
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16RequestMetrics:
+
+    STATS_URL = '/api/v1/stats/requests/'
+
+    def test_01_server_timing(self, admin_client, caplog):
+        create_titles(admin_client)
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            response = admin_client.get('/api/v1/titles/')
+        timing = response.get('Server-Timing', '')
+        for metric in (
+            'sql;dur=', 'serializer;dur=', 'render;dur=', 'total;dur='
+        ):
+            assert metric in timing, (
+                'Проверьте, что заголовок `Server-Timing` содержит '
+                f'метрику `{metric[:-5]}`.'
+            )
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.requests'
+        ]
+        assert records and records[-1]['endpoint'] == 'TitleViewSet.list', (
+            'Проверьте, что замеры запроса пишутся в лог `api.requests` '
+            'с именем вьюсета и действия.'
+        )
+        assert records[-1]['queries'] > 0
+        assert records[-1]['status'] == HTTPStatus.OK
+
+    def test_02_duplicate_queries(self, admin_client):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(Category.objects.filter(slug='a'))
+            list(Category.objects.filter(slug='a'))
+            list(Category.objects.filter(slug='b'))
+        assert recorder.count == 3
+        assert recorder.duplicates == 1, (
+            'Проверьте, что повтором считается только запрос с тем же SQL '
+            'и теми же параметрами.'
+        )
+
+    def test_03_stats_endpoint(self, admin_client, user_client, client):
+        assert admin_client.delete(
+            self.STATS_URL
+        ).status_code == HTTPStatus.NO_CONTENT
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/titles/1000/')
+
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Проверьте, что статистика запросов доступна только админу.'
+
+        stats = admin_client.get(self.STATS_URL).json()
+        assert stats['CategoryViewSet.list']['count'] == 2
+        assert stats['TitleViewSet.retrieve']['count'] == 1
+        total = stats['CategoryViewSet.list']['total_ms']
+        assert sum(total['buckets'].values()) == 2, (
+            'Проверьте, что каждый запрос попадает в одну корзину '
+            'гистограммы.'
+        )
+        assert total['p95'] is not None
+        assert 'queries' in stats['CategoryViewSet.list']
+
+    def test_04_serializer_timing(self, admin_client, caplog, monkeypatch):
+        import time
+
+        from api.serializers import TitleListSerializer
+
+        create_titles(admin_client)
+        to_representation = TitleListSerializer.to_representation
+
+        def slow(self, instance):
+            time.sleep(0.05)
+            return to_representation(self, instance)
+
+        monkeypatch.setattr(TitleListSerializer, 'to_representation', slow)
+        with caplog.at_level(logging.INFO, logger='api.requests'):
+            response = admin_client.get('/api/v1/titles/')
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['serializer_ms'] >= 100, (
+            'Проверьте, что время `to_representation` сериализаторов '
+            'попадает в метрику `serializer_ms`.'
+        )
+        assert record['render_ms'] < 100, (
+            'Проверьте, что время сериализации не учитывается во времени '
+            'рендеринга.'
+        )
+        assert 'serializer;dur=' in response['Server-Timing']
+        stats = admin_client.get(self.STATS_URL).json()
+        assert 'serializer_ms' in stats['TitleViewSet.list']
@@ -0,0 +1,218 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17BulkCreate:
+
+    @pytest.mark.usefixtures('auth_user_cache')
+    def test_01_bulk_categories_and_genres(self, admin_client,
+                                           django_assert_num_queries):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Книги', slug='books')
+        data = [
+            {'name': 'Фильмы', 'slug': 'movies'},
+            {'name': 'Книги', 'slug': 'books'},
+            {'name': 'Дубль', 'slug': 'movies'},
+            {'name': 'Плохой', 'slug': ':-)'},
+            {'name': 'Музыка', 'slug': 'music'},
+        ]
+        admin_client.get('/api/v1/users/me/')
+        for url, model in (
+            ('/api/v1/categories/bulk/', Category),
+            ('/api/v1/genres/bulk/', Genre),
+        ):
+            # Проверка slug одним запросом, одна вставка и версия таблицы
+            # в транзакции.
+            with django_assert_num_queries(4):
+                response = admin_client.post(url, data=data, format='json')
+            assert response.status_code == HTTPStatus.CREATED, (
+                f'Проверьте, что POST-запрос администратора к `{url}` '
+                'создаёт корректные объекты и возвращает статус 201.'
+            )
+            result = response.json()
+            assert [item['slug'] for item in result['created']] == [
+                'movies', 'music'
+            ]
+            assert [error['index'] for error in result['errors']] == [
+                1, 2, 3
+            ], (
+                'Проверьте, что ошибки возвращаются для каждого элемента '
+                'с его индексом в запросе.'
+            )
+            assert model.objects.count() == 3
+
+    def test_02_bulk_titles(self, admin_client):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        data = [
+            {
+                'name': 'Первое', 'year': 2000, 'category': 'books',
+                'genre': ['drama', 'comedy', 'drama'],
+            },
+            {
+                'name': 'Нет категории', 'year': 2000, 'category': 'none',
+                'genre': ['drama'],
+            },
+            {
+                'name': 'Нет жанра', 'year': 2000, 'category': 'books',
+                'genre': ['horror'],
+            },
+            {'name': 'Без года', 'category': 'books', 'genre': []},
+            {
+                'name': 'Второе', 'year': 1999, 'category': 'books',
+                'genre': [], 'description': 'Описание',
+            },
+        ]
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        result = response.json()
+        assert [error['index'] for error in result['errors']] == [1, 2, 3]
+        assert 'category' in result['errors'][0]['errors']
+        assert 'genre' in result['errors'][1]['errors']
+        assert 'year' in result['errors'][2]['errors']
+        assert len(result['created']) == 2
+        first = Title.objects.get(name='Первое')
+        assert result['created'][0]['id'] == first.id
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }, 'Проверьте, что произведения создаются вместе со связями жанров.'
+        assert GenreTitle.objects.count() == 2
+
+        response = admin_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что после массовой загрузки кэш списков сброшен.'
+        )
+
+    def test_03_bulk_errors_and_permissions(self, admin_client,
+                                            user_client, client):
+        url = '/api/v1/categories/bulk/'
+        data = [{'name': 'Фильмы', 'slug': 'movies'}]
+        assert client.post(
+            url, data=json.dumps(data), content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            url, data=data, format='json'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая загрузка доступна только админу.'
+        )
+        response = admin_client.post(
+            url, data={'name': 'Фильмы', 'slug': 'movies'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.post(
+            url, data=[{'name': 'Плохой', 'slug': ':-)'}], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что запрос без корректных элементов возвращает 400.'
+        )
+        assert not Category.objects.exists()
+
+    @pytest.mark.usefixtures('auth_user_cache')
+    def test_04_bulk_titles_query_count(self, admin_client,
+                                        django_assert_num_queries):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Title.objects.create(name='Старое', year=2000)
+        data = [
+            {
+                'name': f'Произведение {number}', 'year': 2000,
+                'category': 'books', 'genre': ['drama'],
+            }
+            for number in range(50)
+        ]
+        admin_client.get('/api/v1/users/me/')
+        # Категории, жанры, BEGIN, MAX(id), вставки произведений, сводок
+        # и жанров, версии таблиц — независимо от размера пачки.
+        with django_assert_num_queries(8):
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data=data, format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        ids = [item['id'] for item in response.json()['created']]
+        assert sorted(
+            Title.objects.filter(pk__in=ids).values_list('name', flat=True)
+        ) == sorted(item['name'] for item in data), (
+            'Проверьте, что в ответе возвращаются id созданных произведений.'
+        )
+        assert GenreTitle.objects.filter(title_id__in=ids).count() == 50
+        assert Title.objects.create(name='Новое', year=2000).id > max(ids), (
+            'Проверьте, что после массовой загрузки новые произведения '
+            'получают следующие id.'
+        )
+
+    def test_05_bulk_titles_without_write_lock(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('Режим BEGIN задаётся только для SQLite.')
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        data = [
+            {
+                'name': f'Произведение {number}', 'year': 2000,
+                'category': 'books', 'genre': ['drama'],
+            }
+            for number in range(3)
+        ]
+        connection.settings_dict['TRANSACTION_MODE'] = 'DEFERRED'
+        try:
+            with CaptureQueriesContext(connection) as captured:
+                response = admin_client.post(
+                    '/api/v1/titles/bulk/', data=data, format='json'
+                )
+        finally:
+            del connection.settings_dict['TRANSACTION_MODE']
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            'MAX(' in query['sql'] for query in captured.captured_queries
+        ), (
+            'Проверьте, что id не назначаются по MAX(id), если транзакция '
+            'не берёт блокировку записи в BEGIN.'
+        )
+        for item in response.json()['created']:
+            title = Title.objects.get(pk=item['id'])
+            assert title.name == item['name']
+            assert list(title.genre.values_list('slug', flat=True)) == [
+                'drama'
+            ]
+
+    def test_06_concurrent_slug(self, admin_client, monkeypatch):
+        from api.views import CategoryViewSet
+
+        validate_bulk = CategoryViewSet.validate_bulk
+
+        def insert_concurrently(self, items, errors):
+            items = validate_bulk(self, items, errors)
+            # Параллельный запрос вставил тот же slug после проверки.
+            Category.objects.get_or_create(
+                slug='music', defaults={'name': 'Чужая'}
+            )
+            return items
+
+        monkeypatch.setattr(
+            CategoryViewSet, 'validate_bulk', insert_concurrently
+        )
+        response = admin_client.post(
+            '/api/v1/categories/bulk/',
+            data=[
+                {'name': 'Фильмы', 'slug': 'movies'},
+                {'name': 'Музыка', 'slug': 'music'},
+            ],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что конфликт с параллельной вставкой возвращается '
+            'как ошибка элемента, а не как ошибка сервера.'
+        )
+        result = response.json()
+        assert [item['slug'] for item in result['created']] == ['movies']
+        assert [error['index'] for error in result['errors']] == [1]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.pagination import RankingPagination
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.ratings import logaddexp, trending_exponent
+
+
+def create_ranked_catalog(django_user_model):
+    books = Category.objects.create(name='Книги', slug='books')
+    films = Category.objects.create(name='Фильмы', slug='films')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    users = [
+        django_user_model.objects.create_user(
+            username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+        )
+        for idx in range(4)
+    ]
+    titles = {}
+    # Одна оценка 10 весит меньше, чем четыре оценки 9.
+    for name, category, scores in (
+        ('Одна десятка', books, [10]),
+        ('Четыре девятки', books, [9, 9, 9, 9]),
+        ('Средний фильм', films, [5, 6]),
+        ('Без отзывов', films, []),
+    ):
+        title = Title.objects.create(name=name, year=2000, category=category)
+        titles[name] = title
+        for user, score in zip(users, scores):
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=score
+            )
+    GenreTitle.objects.create(title=titles['Средний фильм'], genre=drama)
+    return titles, users
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Rankings:
+
+    TOP_URL = '/api/v1/titles/top/'
+    TRENDING_URL = '/api/v1/titles/trending/'
+
+    def test_01_top(self, client, django_user_model):
+        create_ranked_catalog(django_user_model)
+        response = client.get(self.TOP_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{self.TOP_URL}` доступен без авторизации.'
+        )
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Четыре девятки', 'Одна десятка', 'Средний фильм'], (
+            'Проверьте, что лучшие произведения упорядочены по байесовскому '
+            'рейтингу, а произведения без отзывов не попадают в список.'
+        )
+        assert response.json()['results'][0]['score'] == pytest.approx(
+            (5.5 * 10 + 36) / 14
+        )
+
+        response = client.get(self.TOP_URL, {'category': 'films'})
+        assert [t['name'] for t in response.json()['results']] == [
+            'Средний фильм'
+        ], 'Проверьте фильтрацию рейтинга по slug категории.'
+        response = client.get(self.TOP_URL, {'genre': 'drama'})
+        assert len(response.json()['results']) == 1, (
+            'Проверьте фильтрацию рейтинга по slug жанра.'
+        )
+
+    def test_02_cursor_pages(self, client, django_user_model, monkeypatch):
+        create_ranked_catalog(django_user_model)
+        names = [
+            title['name']
+            for title in client.get(self.TOP_URL).json()['results']
+        ]
+        monkeypatch.setattr(RankingPagination, 'page_size', 1)
+        seen = []
+        url = self.TOP_URL
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что рейтинги используют курсорную пагинацию '
+                'без COUNT(*).'
+            )
+            seen.extend(title['name'] for title in data['results'])
+            url = data['next']
+        assert seen == names, (
+            'Проверьте, что курсорные страницы рейтинга не теряют и не '
+            'повторяют произведения.'
+        )
+
+    def test_03_trending(self, client, user_client, django_user_model):
+        titles, users = create_ranked_catalog(django_user_model)
+        old = timezone.now() - timedelta(days=60)
+        Review.objects.filter(
+            title=titles['Четыре девятки']
+        ).update(pub_date=old)
+        call_command('recalculate_ratings')
+
+        response = client.get(self.TRENDING_URL)
+        assert response.status_code == HTTPStatus.OK
+        names = [title['name'] for title in response.json()['results']]
+        assert names[-1] == 'Четыре девятки', (
+            'Проверьте, что старые отзывы весят меньше свежих в рейтинге '
+            '«в тренде».'
+        )
+        review = Review.objects.filter(title=titles['Средний фильм']).first()
+        expected = None
+        for pub_date in Review.objects.filter(
+            title=titles['Средний фильм']
+        ).values_list('pub_date', flat=True):
+            expected = logaddexp(expected, trending_exponent(pub_date))
+        score = next(
+            title['score'] for title in response.json()['results']
+            if title['name'] == 'Средний фильм'
+        )
+        assert score == pytest.approx(expected)
+
+        review.delete()
+        call_command('recalculate_ratings', '--check')
@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Database:
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_01_sqlite_pragmas(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Настройки PRAGMA относятся только к SQLite.')
+        assert self.pragma('synchronous') == 1, (
+            'Проверьте, что бэкенд SQLite включает `synchronous=NORMAL`.'
+        )
+        assert self.pragma('busy_timeout') == 5000, (
+            'Проверьте, что бэкенд SQLite задаёт `busy_timeout`.'
+        )
+
+    def test_02_pragmas_override(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Настройки PRAGMA относятся только к SQLite.')
+        connection.settings_dict['PRAGMAS'] = {'busy_timeout': 1234}
+        try:
+            pragmas = connection.get_pragmas()
+        finally:
+            del connection.settings_dict['PRAGMAS']
+        assert pragmas['busy_timeout'] == 1234, (
+            'Проверьте, что ключ `PRAGMAS` в DATABASES переопределяет '
+            'значения по умолчанию.'
+        )
+        assert pragmas['journal_mode'] == 'WAL'
+
+    def test_03_pool_keeps_idle_connections(self, monkeypatch):
+        psycopg2 = pytest.importorskip('psycopg2')
+        from psycopg2 import extensions
+
+        from api_yamdb.backends.postgresql_pool.base import (
+            BlockingConnectionPool)
+
+        class FakeConnection:
+            closed = 0
+
+            def __init__(self):
+                self.info = type('Info', (), {
+                    'transaction_status': extensions.TRANSACTION_STATUS_IDLE
+                })()
+
+            def get_transaction_status(self):
+                return self.info.transaction_status
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                self.closed = 1
+
+        opened = []
+
+        def connect(*args, **kwargs):
+            opened.append(FakeConnection())
+            return opened[-1]
+
+        monkeypatch.setattr(psycopg2, 'connect', connect)
+        pool = BlockingConnectionPool(1, 5, 1)
+        for _ in range(2):
+            connections = [pool.getconn() for _ in range(5)]
+            for conn in connections:
+                pool.putconn(conn)
+        assert len(opened) == 5 and not any(conn.closed for conn in opened), (
+            'Проверьте, что пул держит открытыми до MAX_SIZE свободных '
+            'соединений, а не закрывает всё сверх MIN_SIZE.'
+        )
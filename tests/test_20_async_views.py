@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20AsyncViews:
+
+    def get(self, url, **extra):
+        async def fetch():
+            return await AsyncClient().get(url, **extra)
+        return async_to_sync(fetch)()
+
+    def test_01_async_matches_sync(self, admin_client, client, admin,
+                                   user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        for path in (
+            'titles/',
+            f'titles/{title_id}/',
+            f'titles/{title_id}/reviews/',
+            f'titles/{title_id}/reviews/{review_id}/comments/',
+            'titles/?genre=drama',
+        ):
+            expected = client.get(f'/api/v1/{path}')
+            response = self.get(f'/api/async/v1/{path}')
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `/api/async/v1/{path}` '
+                'возвращает статус 200.'
+            )
+            assert response.json() == expected.json(), (
+                f'Проверьте, что `/api/async/v1/{path}` отдаёт те же данные, '
+                f'что и `/api/v1/{path}`.'
+            )
+            assert 'sql;dur=' in response['Server-Timing']
+
+    def test_02_async_not_found_and_not_modified(self, admin_client):
+        assert self.get(
+            '/api/async/v1/titles/1000/'
+        ).status_code == HTTPStatus.NOT_FOUND
+        response = self.get('/api/async/v1/titles/')
+        # AsyncClient в Django 3.2 передаёт extra как имена заголовков.
+        response = self.get(
+            '/api/async/v1/titles/', **{'If-None-Match': response['ETag']}
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что асинхронные эндпоинты поддерживают условные '
+            'GET-запросы.'
+        )
@@ -0,0 +1,124 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.renderers import FastJSONParser, FastJSONRenderer
+from api.serializers import (CommentListSerializer, CommentSerializer,
+                             ReviewListSerializer, ReviewSerializer,
+                             TitleListSerializer, TitleReadSerializer)
+from reviews.models import Comments, Review, Title
+from tests.utils import create_comments
+
+SAMPLE = {
+    'text': 'Строка с разделителями \u2028 и \u2029',
+    'decimal': Decimal('1.50'),
+    'date': datetime.datetime(
+        2021, 5, 1, 12, 30, tzinfo=datetime.timezone.utc
+    ),
+    'uuid': uuid.UUID(int=1),
+    'lazy': gettext_lazy('Обязательное поле.'),
+    'nested': [1, 2.5, None, True, {'ключ': 'значение'}],
+}
+
+ORJSON_MODES = [False] + ([True] if renderers.orjson is not None else [])
+
+
+@pytest.fixture(params=ORJSON_MODES, ids=lambda on: f'orjson={on}')
+def orjson_mode(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(renderers, 'orjson', None)
+    return request.param
+
+
+class Test21FastJSON:
+
+    def test_01_renderer_matches_drf(self, orjson_mode):
+        expected = JSONRenderer().render(SAMPLE)
+        rendered = FastJSONRenderer().render(SAMPLE)
+        assert isinstance(rendered, bytes)
+        assert rendered == expected, (
+            'Проверьте, что FastJSONRenderer отдаёт те же байты, '
+            'что и JSONRenderer.'
+        )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_renderer_indent(self, orjson_mode):
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(SAMPLE, media_type) == (
+            JSONRenderer().render(SAMPLE, media_type)
+        ), 'Проверьте, что форматированный вывод совпадает с JSONRenderer.'
+
+    def test_03_parser(self, orjson_mode):
+        data = FastJSONParser().parse(
+            io.BytesIO('{"name": "Имя", "year": [1, 2.5]}'.encode())
+        )
+        assert data == {'name': 'Имя', 'year': [1, 2.5]}
+        for body in (b'{"name": ', b'NaN'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21LeanSerializers:
+
+    def check_same(self, lean, full, queryset):
+        expected = JSONRenderer().render(full(queryset, many=True).data)
+        assert JSONRenderer().render(
+            lean(queryset, many=True).data
+        ) == expected, (
+            f'Проверьте, что {lean.__name__} отдаёт те же данные '
+            f'в том же порядке ключей, что и {full.__name__}.'
+        )
+
+    def test_01_same_output(self, admin_client, admin, user_client, user):
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        Title.objects.create(name='Без категории', year=2000)
+
+        titles = (
+            Title.objects.select_related('category')
+            .prefetch_related('genre').order_by('name')
+        )
+        self.check_same(TitleListSerializer, TitleReadSerializer, titles)
+        self.check_same(
+            ReviewListSerializer, ReviewSerializer,
+            Review.objects.select_related('author')
+        )
+        self.check_same(
+            CommentListSerializer, CommentSerializer,
+            Comments.objects.select_related('author')
+        )
+
+    def test_02_list_endpoints(self, admin_client, admin, user_client, user,
+                               client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0] == client.get(
+            f'/api/v1/titles/{response.json()["results"][0]["id"]}/'
+        ).json(), (
+            'Проверьте, что элемент списка произведений совпадает '
+            'с ответом на запрос произведения.'
+        )
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        review = response.json()['results'][0]
+        assert review == client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        ).json()
+        response = client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        )
+        comment = response.json()['results'][0]
+        assert comment == client.get(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{comment["id"]}/'
+        ).json()
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.admin import ReviewsAdmin
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Admin:
+
+    def create_reviews(self, django_user_model, count, start=0):
+        title = Title.objects.create(
+            name=f'Произведение {start}', year=2000
+        )
+        reviews = []
+        for idx in range(start, start + count):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, score=idx % 10 + 1,
+                text=f'Отзыв номер{idx}'
+            )
+            Comments.objects.create(
+                review=review, author=author, text=f'Комментарий номер{idx}'
+            )
+            reviews.append(review)
+        return reviews
+
+    def changelist(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что страница `{url}` открывается.'
+        )
+        return response.context['cl'], len(queries)
+
+    def test_01_constant_queries(self, client, user_superuser,
+                                 django_user_model):
+        client.force_login(user_superuser)
+        self.create_reviews(django_user_model, 2)
+        urls = (
+            '/admin/reviews/review/',
+            '/admin/reviews/comments/',
+            '/admin/reviews/title/',
+            '/admin/reviews/genretitle/',
+            '/admin/users/user/',
+        )
+        before = {url: self.changelist(client, url)[1] for url in urls}
+        self.create_reviews(django_user_model, 8, start=2)
+        for url in urls:
+            assert self.changelist(client, url)[1] == before[url], (
+                f'Проверьте, что число запросов страницы `{url}` не зависит '
+                'от количества строк.'
+            )
+
+    def test_02_indexed_search(self, client, user_superuser,
+                               django_user_model):
+        client.force_login(user_superuser)
+        reviews = self.create_reviews(django_user_model, 3)
+        cl, _ = self.changelist(client, '/admin/reviews/review/?q=номер1')
+        assert list(cl.result_list) == [reviews[1]], (
+            'Проверьте, что поиск отзывов в админке идёт по '
+            'полнотекстовому индексу.'
+        )
+        cl, _ = self.changelist(client, '/admin/reviews/review/?q=author2')
+        assert list(cl.result_list) == [reviews[2]], (
+            'Проверьте, что отзывы ищутся по точному имени автора.'
+        )
+        cl, _ = self.changelist(
+            client, '/admin/reviews/review/?q=Произведение'
+        )
+        assert len(cl.result_list) == 3, (
+            'Проверьте, что отзывы ищутся по началу названия произведения.'
+        )
+        cl, _ = self.changelist(client, '/admin/reviews/comments/?q=Отзыв')
+        assert len(cl.result_list) == 3, (
+            'Проверьте, что комментарии ищутся по тексту отзыва.'
+        )
+        cl, _ = self.changelist(client, '/admin/users/user/?q=author')
+        assert len(cl.result_list) == 3
+        assert cl.full_result_count is None
+
+    def test_03_estimated_count(self, client, user_superuser,
+                                django_user_model, monkeypatch):
+        client.force_login(user_superuser)
+        reviews = self.create_reviews(django_user_model, 3)
+        reviews[0].delete()
+        monkeypatch.setattr(ReviewsAdmin, 'count_estimate_threshold', 1)
+        cl, _ = self.changelist(client, '/admin/reviews/review/')
+        # Оценка для SQLite — максимальный rowid таблицы.
+        assert cl.result_count == reviews[-1].pk != 2, (
+            'Проверьте, что без фильтров админка берёт оценку числа строк.'
+        )
+        cl, _ = self.changelist(client, '/admin/reviews/review/?score=2')
+        assert cl.result_count == 1, (
+            'Проверьте, что с фильтрами число строк считается точно.'
+        )
+
+    def test_04_autocomplete(self, client, user_superuser,
+                             django_user_model):
+        client.force_login(user_superuser)
+        reviews = self.create_reviews(django_user_model, 3)
+        response = client.get('/admin/autocomplete/', {
+            'term': 'author',
+            'app_label': 'reviews',
+            'model_name': 'review',
+            'field_name': 'author',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 3, (
+            'Проверьте, что автор отзыва выбирается автодополнением.'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/admin/autocomplete/', {
+                'term': 'Отзыв',
+                'app_label': 'reviews',
+                'model_name': 'comments',
+                'field_name': 'review',
+            })
+        assert response.status_code == HTTPStatus.OK
+        assert {
+            int(result['id']) for result in response.json()['results']
+        } == {review.pk for review in reviews}
+        assert len(queries) <= 5, (
+            'Проверьте, что автодополнение отзывов не загружает автора и '
+            'произведение для каждой строки отдельно.'
+        )
@@ -0,0 +1,79 @@
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+
+from reviews.fake_data import FakeDataGenerator
+
+SIZE = ('--users', '30', '--titles', '20', '--reviews', '150',
+        '--genres', '5', '--categories', '3', '--seed', '7')
+
+
+def generated_rows(**options):
+    generator = FakeDataGenerator(users=30, titles=20, reviews=150, **options)
+    return list(generator.rows())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23FakeData:
+
+    def test_01_deterministic(self):
+        assert generated_rows(seed=1) == generated_rows(seed=1), (
+            'Проверьте, что генератор с одинаковым seed выдаёт одинаковые '
+            'строки.'
+        )
+        assert generated_rows(seed=1) != generated_rows(seed=2)
+
+    def test_02_csv_output_imports(self, tmp_path, django_user_model):
+        from reviews.models import Comments, Review, Title
+
+        call_command('generate_fake_data', *SIZE, '--output', str(tmp_path))
+        call_command('import_csv', '--path', str(tmp_path))
+        rows = Counter(filename for filename, _ in generated_rows(
+            seed=7, genres=5, categories=3
+        ))
+        for filename, model in (
+            ('users.csv', django_user_model),
+            ('titles.csv', Title),
+            ('review.csv', Review),
+            ('comments.csv', Comments),
+        ):
+            assert model.objects.count() == rows[filename], (
+                f'Проверьте, что файл `{filename}` генератора загружается '
+                'командой `import_csv`.'
+            )
+        call_command('recalculate_ratings', '--check')
+
+    def test_03_database_output(self, django_user_model):
+        from reviews.models import Review, Title
+        from reviews.search import get_search_backend
+
+        django_user_model.objects.create_user(
+            username='existing', email='existing@yamdb.fake'
+        )
+        call_command('generate_fake_data', *SIZE)
+        assert django_user_model.objects.count() == 31
+        assert Review.objects.count() == 150, (
+            'Проверьте, что генератор записывает в базу заданное число '
+            'отзывов.'
+        )
+        pairs = Review.objects.values_list('title_id', 'author_id')
+        assert len(set(pairs)) == len(pairs), (
+            'Проверьте, что генератор не создаёт двух отзывов одного автора '
+            'на одно произведение.'
+        )
+        per_title = Counter(title_id for title_id, _ in pairs)
+        assert max(per_title.values()) > 150 / 20, (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно.'
+        )
+        call_command('recalculate_ratings', '--check')
+
+        review = Review.objects.order_by('pk').last()
+        word = review.text.split()[0]
+        found = get_search_backend().search(Review.objects.all(), word)
+        assert review in found, (
+            'Проверьте, что после генерации работает полнотекстовый поиск.'
+        )
+        # Последовательности id сброшены: новые записи не конфликтуют.
+        Title.objects.create(name='Новое произведение', year=2020)
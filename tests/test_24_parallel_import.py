@@ -0,0 +1,121 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from tests.test_10_import_csv import DATA_DIR, count_rows
+
+
+def schema_objects():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')"
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def import_data(path, *args):
+    out = StringIO()
+    call_command('import_csv', '--path', str(path), *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ParallelImport:
+
+    def copy_data(self, tmp_path, filename=None, change=None):
+        for name in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, name), tmp_path)
+        if filename:
+            path = tmp_path / filename
+            with open(path, encoding='utf-8', newline='') as file:
+                rows = list(csv.reader(file))
+            change(rows)
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                csv.writer(file).writerows(rows)
+        return tmp_path
+
+    def test_01_same_result_as_sequential(self, tmp_path):
+        from reviews.models import Comments, GenreTitle, Review
+        from reviews.search import get_search_backend
+
+        before = schema_objects()
+        output = import_data(
+            self.copy_data(tmp_path), '--workers', '2', '--batch-size', '10'
+        )
+        assert 'Данные успешно импортированы' in output, output
+        for filename, model in (
+            ('genre_title.csv', GenreTitle),
+            ('review.csv', Review),
+            ('comments.csv', Comments),
+        ):
+            assert model.objects.count() == count_rows(filename), (
+                'Проверьте, что `import_csv --workers` загружает все строки '
+                f'файла `{filename}`.'
+            )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019
+        assert '\n' in review.text, (
+            'Проверьте, что многострочные значения в кавычках не '
+            'разрываются на блоки.'
+        )
+        assert schema_objects() == before, (
+            'Проверьте, что индексы и триггеры восстанавливаются после '
+            'загрузки.'
+        )
+        assert get_search_backend().search(
+            Review.objects.all(), 'Шоушенке'
+        ).filter(pk=1).exists(), (
+            'Проверьте, что полнотекстовый индекс перестраивается после '
+            'загрузки.'
+        )
+        for stage in ('Чтение', 'Разбор', 'Запись', 'Индексы'):
+            assert stage in output, (
+                'Проверьте, что команда выводит скорость каждого этапа.'
+            )
+        call_command('recalculate_ratings', '--check')
+
+    def test_02_invalid_value(self, tmp_path):
+        from reviews.models import Review
+
+        def set_score(rows):
+            rows[3][4] = '11'
+
+        before = schema_objects()
+        output = import_data(
+            self.copy_data(tmp_path, 'review.csv', set_score),
+            '--workers', '2'
+        )
+        assert 'Ошибка при импорте' in output and 'запись 3' in output, (
+            'Проверьте, что ошибка проверки значения указывает номер '
+            'записи.'
+        )
+        assert not Review.objects.filter(score=11).exists()
+        assert schema_objects() == before
+
+    def test_03_missing_foreign_key(self, tmp_path):
+        from reviews.models import Comments, Review
+
+        def set_review(rows):
+            rows[1][1] = '100000'
+
+        before = schema_objects()
+        output = import_data(
+            self.copy_data(tmp_path, 'comments.csv', set_review),
+            '--workers', '1'
+        )
+        assert 'Ошибка при импорте' in output and '100000' in output, (
+            'Проверьте, что после загрузки проверяются внешние ключи.'
+        )
+        assert not Comments.objects.filter(review_id=100000).exists(), (
+            'Проверьте, что строки с висячими внешними ключами не '
+            'остаются в базе после неудачной проверки.'
+        )
+        assert not Review.objects.exists(), (
+            'Проверьте, что неудачная загрузка откатывается целиком.'
+        )
+        assert schema_objects() == before
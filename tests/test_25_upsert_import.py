@@ -0,0 +1,101 @@
+import csv
+import os
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.test_10_import_csv import DATA_DIR
+from tests.test_24_parallel_import import import_data
+
+
+def edit_csv(path, change):
+    with open(path, encoding='utf-8', newline='') as file:
+        rows = list(csv.reader(file))
+    change(rows)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UpsertImport:
+
+    @pytest.fixture
+    def data(self, tmp_path):
+        for name in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, name), tmp_path)
+        import_data(tmp_path)
+        return tmp_path
+
+    def test_01_repeat_is_noop(self, data):
+        output = import_data(data, '--upsert')
+        assert 'Данные успешно импортированы' in output, (
+            'Проверьте, что `import_csv --upsert` можно повторить на уже '
+            'загруженной базе.'
+        )
+        assert 'Отзывы: добавлено 0, обновлено 0, без изменений 72' in output
+        assert 'Категории: добавлено 0, обновлено 0' in output
+
+    def test_02_changes(self, data):
+        from reviews.models import Category, Review, Title
+        from reviews.search import get_search_backend
+
+        def change_reviews(rows):
+            rows[2][2] = 'Пересмотрел обновлённый отзыв'
+            rows[3][4] = str(int(rows[3][4]) % 10 + 1)
+            rows.append([
+                '1000', '1', 'Новый отзыв', '103', '7',
+                '2021-05-01T10:00:00.000Z'
+            ])
+
+        def change_categories(rows):
+            rows[1][1] = 'Новое название'
+
+        edit_csv(data / 'review.csv', change_reviews)
+        edit_csv(data / 'category.csv', change_categories)
+        old_score = Review.objects.get(pk=3).score
+        output = import_data(data, '--upsert')
+        expected = 'Отзывы: добавлено 1, обновлено 2, без изменений 70'
+        assert expected in output, (
+            'Проверьте, что `import_csv --upsert` сообщает, сколько строк '
+            'добавлено, обновлено и пропущено.'
+        )
+        assert 'Категории: добавлено 0, обновлено 1' in output
+        assert Category.objects.get(pk=1).name == 'Новое название'
+        assert Review.objects.get(pk=3).score == old_score % 10 + 1
+        assert Review.objects.get(pk=1000).pub_date.year == 2021
+        assert get_search_backend().search(
+            Review.objects.all(), 'Пересмотрел'
+        ).filter(pk=2).exists(), (
+            'Проверьте, что изменённый текст попадает в поисковый индекс.'
+        )
+        assert Title.objects.get(pk=1).rating_count == (
+            Review.objects.filter(title_id=1).count()
+        )
+        call_command('recalculate_ratings', '--check')
+
+    def test_03_delete_missing(self, data):
+        from reviews.models import Comments, Review
+
+        def drop_last(rows):
+            rows.pop()
+
+        edit_csv(data / 'comments.csv', drop_last)
+        edit_csv(data / 'review.csv', drop_last)
+        import_data(data, '--upsert')
+        assert Review.objects.count() == 72, (
+            'Проверьте, что без `--delete-missing` строки не удаляются.'
+        )
+        output = import_data(data, '--upsert', '--delete-missing')
+        assert 'Отзывы: удалено 1' in output
+        assert 'Комментарии: удалено 1' in output
+        assert Review.objects.count() == 71
+        assert Comments.objects.count() == 2
+        call_command('recalculate_ratings', '--check')
+
+    def test_04_options(self, data):
+        with pytest.raises(CommandError):
+            call_command('import_csv', '--delete-missing')
+        with pytest.raises(CommandError):
+            call_command('import_csv', '--upsert', '--workers', '2')
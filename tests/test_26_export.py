@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+
+from tests.test_10_import_csv import DATA_DIR
+
+EXPORT_URL = '/api/v1/export/{}'
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        header, *rows = csv.reader(file)
+    return header, sorted(rows, key=lambda row: int(row[0]))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Export:
+
+    def test_01_command_round_trip(self, tmp_path):
+        call_command('import_csv')
+        out = io.StringIO()
+        call_command('export_data', '--output', str(tmp_path), stdout=out)
+        assert 'Выгружено' in out.getvalue()
+        for name in os.listdir(DATA_DIR):
+            assert read_csv(tmp_path / name) == read_csv(
+                os.path.join(DATA_DIR, name)
+            ), (
+                'Проверьте, что `export_data` выгружает таблицу в формате '
+                f'`static/data/{name}`.'
+            )
+
+    def test_02_command_ndjson(self, tmp_path):
+        from reviews.models import Review
+
+        call_command('import_csv')
+        call_command(
+            'export_data', '--output', str(tmp_path), '--format', 'ndjson',
+            '--tables', 'review', '--chunk-size', '10',
+            stdout=io.StringIO()
+        )
+        assert os.listdir(tmp_path) == ['review.ndjson']
+        with open(tmp_path / 'review.ndjson', encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        assert len(rows) == Review.objects.count()
+        assert set(rows[0]) == {
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        }
+        assert rows[0]['pub_date'].endswith('Z')
+
+    def test_03_endpoint_streams_csv(self, admin_client, admin):
+        from reviews.models import Category
+
+        Category.objects.create(name='Фильм, "новый"', slug='film')
+        response = admin_client.get(
+            EXPORT_URL.format('category.csv'), HTTP_ACCEPT='text/csv'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что администратор может выгрузить таблицу.'
+        )
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком '
+            '(`StreamingHttpResponse`).'
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'category.csv' in response['Content-Disposition']
+        content = b''.join(response.streaming_content).decode('utf-8')
+        assert list(csv.reader(io.StringIO(content))) == [
+            ['id', 'name', 'slug'],
+            [str(Category.objects.get().pk), 'Фильм, "новый"', 'film'],
+        ]
+
+        response = admin_client.get(EXPORT_URL.format('users.ndjson'))
+        assert response.status_code == 200
+        lines = b''.join(response.streaming_content).splitlines()
+        assert json.loads(lines[0])['username'] == admin.username
+
+    def test_04_endpoint_permissions(self, client, user_client,
+                                     admin_client):
+        url = EXPORT_URL.format('review.csv')
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору.'
+        )
+        for name in ('secret.csv', 'review.xml'):
+            assert admin_client.get(
+                EXPORT_URL.format(name)
+            ).status_code == 404